@@ -39,7 +39,8 @@ run_test() {
     echo "=========================================="
 
     # Clean up previous output
-    rm -f "$output_json" "$output_md"
+    local output_json_glob="${output_json%.json}.*.json"
+    rm -f $output_json_glob "$output_md"
 
     # Run the tool
     if poetry run hcl-processor --config_file "$config_file" --debug; then
@@ -55,10 +56,10 @@ run_test() {
     echo ""
     echo "Checking output files..."
 
-    if [ -f "$output_json" ]; then
-        echo "  [OK] $(basename "$output_json") generated"
+    if ls $output_json_glob > /dev/null 2>&1; then
+        echo "  [OK] $(basename "$output_json_glob") generated"
     else
-        echo "  [FAIL] $(basename "$output_json") not found"
+        echo "  [FAIL] $(basename "$output_json_glob") not found"
         return 1
     fi
 
@@ -67,15 +67,21 @@ def run_hcl_processor(config_file: Path, timeout: int = 300):
     return result
 
 
-def validate_json_output(output_file: Path, min_items: int = 1):
-    """Validate JSON output file."""
-    assert output_file.exists(), f"{output_file.name} was not created"
+def load_json_outputs(json_path: Path) -> list:
+    """Load and concatenate the per-file JSON results kept for json_path."""
+    data = []
+    for output_file in sorted(json_path.parent.glob(f"{json_path.stem}.*.json")):
+        with open(output_file) as f:
+            content = json.load(f)
+        assert isinstance(content, list), "JSON output should be an array"
+        data.extend(content)
+    return data
 
-    with open(output_file) as f:
-        content = f.read()
 
-    data = json.loads(content)
-    assert isinstance(data, list), "JSON output should be an array"
+def validate_json_output(json_path: Path, min_items: int = 1):
+    """Validate the per-file JSON output files."""
+    data = load_json_outputs(json_path)
+    assert data or min_items == 0, f"No {json_path.stem}.*.json files were created"
     assert (
         len(data) >= min_items
     ), f"Expected at least {min_items} items, got {len(data)}"
@@ -269,11 +275,10 @@ class TestE2EMonitorContent:
     @pytest.fixture(scope="class")
     def basic_output(self, ensure_aws_credentials):
         """Load basic output if available."""
-        output_file = OUTPUT_DIR / "output.json"
-        if not output_file.exists():
+        data = load_json_outputs(OUTPUT_DIR / "output.json")
+        if not data:
             pytest.skip("Basic output not available")
-        with open(output_file) as f:
-            return json.load(f)
+        return data
 
     def test_monitor_names_not_empty(self, basic_output):
         """Test that monitor names are populated."""
@@ -0,0 +1,301 @@
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from .logger_config import get_logger
+
+logger = get_logger("batch_backend")
+
+DEFAULT_POLL_INTERVAL_SECONDS = 60
+DEFAULT_TIMEOUT_HOURS = 24
+DEFAULT_LOCAL_PATH = ".hcl_processor_batch"
+# Bedrock rejects model invocation jobs with fewer records than this
+BEDROCK_MIN_RECORDS = 100
+
+# Bedrock model invocation job statuses
+COMPLETED_STATUSES = ("Completed", "PartiallyCompleted")
+FAILED_STATUSES = ("Failed", "Stopped", "Expired")
+
+
+class BatchJobError(Exception):
+    """Raised when a batch job ends without producing results."""
+
+
+def _parse_output_lines(lines) -> dict:
+    """
+    Map recordId to modelOutput for batch output JSONL lines (internal function)
+    Records that failed are mapped to None.
+    """
+    results = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if "error" in record or "modelOutput" not in record:
+            logger.warning(
+                f"Batch record {record.get('recordId')} failed: {record.get('error')}"
+            )
+            results[record.get("recordId")] = None
+        else:
+            results[record["recordId"]] = record["modelOutput"]
+    return results
+
+
+class BatchBackend(ABC):
+    """
+    Abstract Base Class for batch inference backends.
+    A job takes records of the form {"recordId": str, "modelInput": dict}.
+    """
+
+    # Smallest number of records the service accepts in one job
+    min_records = 1
+
+    def __init__(
+        self,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        timeout_hours: float = DEFAULT_TIMEOUT_HOURS,
+    ):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.timeout_seconds = timeout_hours * 60 * 60
+
+    @abstractmethod
+    def submit(self, records: list) -> str:
+        """
+        Submits a batch job.
+        Returns:
+            str: Identifier of the job.
+        """
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        """
+        Returns the job status (Bedrock model invocation job status names).
+        """
+
+    @abstractmethod
+    def fetch_results(self, job_id: str) -> dict:
+        """
+        Returns:
+            dict: modelOutput per recordId (None for failed records).
+        """
+
+    def run(self, records: list) -> dict:
+        """
+        Submits a job, polls until it finishes and returns its results.
+        Returns:
+            dict: modelOutput per recordId; records missing from the output
+            are absent from the result.
+        Raises:
+            BatchJobError: If the job fails, stops or expires.
+            TimeoutError: If the job does not finish within the timeout.
+        """
+        job_id = self.submit(records)
+        logger.info(f"Submitted batch job {job_id} with {len(records)} records")
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            status = self.status(job_id)
+            if status in COMPLETED_STATUSES:
+                logger.info(f"Batch job {job_id} finished: {status}")
+                return self.fetch_results(job_id)
+            if status in FAILED_STATUSES:
+                raise BatchJobError(f"Batch job {job_id} ended with status {status}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch job {job_id} still {status} after timeout")
+            logger.debug(f"Batch job {job_id} is {status}")
+            time.sleep(self.poll_interval_seconds)
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Filesystem stand-in for a batch service. Each job is a directory holding
+    input.jsonl; the job completes once output.jsonl exists next to it. With
+    a responder, output.jsonl is produced on submit by calling it for every
+    modelInput.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        responder: Callable[[dict], dict] | None = None,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        timeout_hours: float = DEFAULT_TIMEOUT_HOURS,
+    ):
+        super().__init__(poll_interval_seconds, timeout_hours)
+        self.directory = directory
+        self.responder = responder
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def submit(self, records: list) -> str:
+        job_id = f"job-{uuid.uuid4().hex[:12]}"
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, "input.jsonl"), "w", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in records
+            )
+
+        if self.responder is not None:
+            with open(
+                os.path.join(job_dir, "output.jsonl"), "w", encoding="utf-8"
+            ) as f:
+                for record in records:
+                    output = dict(record)
+                    try:
+                        output["modelOutput"] = self.responder(record["modelInput"])
+                    except (ClientError, BotoCoreError) as e:
+                        output["error"] = {"errorMessage": str(e)}
+                    f.write(json.dumps(output, ensure_ascii=False) + "\n")
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        if os.path.exists(os.path.join(self._job_dir(job_id), "output.jsonl")):
+            return "Completed"
+        return "InProgress"
+
+    def fetch_results(self, job_id: str) -> dict:
+        with open(
+            os.path.join(self._job_dir(job_id), "output.jsonl"), encoding="utf-8"
+        ) as f:
+            return _parse_output_lines(f)
+
+
+def _parse_s3_uri(uri: str) -> tuple[str, str]:
+    """
+    Split s3://bucket/prefix into (bucket, prefix) (internal function)
+    """
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Invalid S3 URI: {uri}")
+    bucket, _, prefix = uri[len("s3://") :].partition("/")
+    return bucket, prefix.strip("/")
+
+
+class BedrockBatchBackend(BatchBackend):
+    """
+    Bedrock batch inference: the input JSONL is uploaded to S3 and run as a
+    model invocation job whose output is read back from S3.
+    """
+
+    min_records = BEDROCK_MIN_RECORDS
+
+    def __init__(
+        self,
+        bedrock_client,
+        s3_client,
+        model_id: str,
+        role_arn: str,
+        s3_input_uri: str,
+        s3_output_uri: str,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        timeout_hours: float = DEFAULT_TIMEOUT_HOURS,
+    ):
+        super().__init__(poll_interval_seconds, timeout_hours)
+        self.bedrock_client = bedrock_client
+        self.s3_client = s3_client
+        self.model_id = model_id
+        self.role_arn = role_arn
+        self.s3_input_uri = s3_input_uri
+        self.s3_output_uri = s3_output_uri
+
+    def submit(self, records: list) -> str:
+        job_name = (
+            f"hcl-processor-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        )
+        bucket, prefix = _parse_s3_uri(self.s3_input_uri)
+        key = f"{prefix}/{job_name}.jsonl" if prefix else f"{job_name}.jsonl"
+        body = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+        self.s3_client.put_object(Bucket=bucket, Key=key, Body=body.encode("utf-8"))
+
+        response = self.bedrock_client.create_model_invocation_job(
+            jobName=job_name,
+            roleArn=self.role_arn,
+            modelId=self.model_id,
+            inputDataConfig={
+                "s3InputDataConfig": {
+                    "s3Uri": f"s3://{bucket}/{key}",
+                    "s3InputFormat": "JSONL",
+                }
+            },
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": self.s3_output_uri}},
+        )
+        return response["jobArn"]
+
+    def status(self, job_id: str) -> str:
+        response = self.bedrock_client.get_model_invocation_job(jobIdentifier=job_id)
+        if response.get("message"):
+            logger.debug(f"Batch job message: {response['message']}")
+        return response["status"]
+
+    def fetch_results(self, job_id: str) -> dict:
+        # Output is written under <output uri>/<job id>/<input file>.out
+        bucket, prefix = _parse_s3_uri(self.s3_output_uri)
+        job_prefix = f"{prefix}/{job_id.split('/')[-1]}/".lstrip("/")
+        results = {}
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=job_prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith(".jsonl.out"):
+                    continue
+                body = self.s3_client.get_object(Bucket=bucket, Key=obj["Key"])["Body"]
+                results.update(
+                    _parse_output_lines(body.read().decode("utf-8").splitlines())
+                )
+        return results
+
+
+def create_batch_backend(config: dict, provider) -> BatchBackend:
+    """
+    Create the batch backend configured in provider_config.settings.batch.
+    Args:
+        config (dict): Configuration
+        provider: The run's LLM provider, supplying AWS clients and the model id
+    Returns:
+        BatchBackend: The configured backend
+    Raises:
+        ValueError: If the configuration is incomplete or unsupported
+    """
+    settings = config["provider_config"]["settings"].get("batch", {})
+    poll_interval = settings.get("poll_interval_seconds", DEFAULT_POLL_INTERVAL_SECONDS)
+    timeout_hours = settings.get("timeout_hours", DEFAULT_TIMEOUT_HOURS)
+
+    backend = settings.get("backend", "bedrock")
+    if backend == "local":
+        return LocalBatchBackend(
+            settings.get("local_path", DEFAULT_LOCAL_PATH),
+            poll_interval_seconds=poll_interval,
+            timeout_hours=timeout_hours,
+        )
+
+    if config["provider_config"]["name"] != "bedrock":
+        raise ValueError(
+            f"Batch mode is not supported for provider: {config['provider_config']['name']}"
+        )
+    missing = [
+        key
+        for key in ("role_arn", "s3_input_uri", "s3_output_uri")
+        if not settings.get(key)
+    ]
+    if missing:
+        raise ValueError(
+            "Batch mode requires provider settings: "
+            + ", ".join(f"batch.{key}" for key in missing)
+        )
+    return BedrockBatchBackend(
+        provider.create_aws_client("bedrock"),
+        provider.create_aws_client("s3"),
+        model_id=provider.model_id,
+        role_arn=settings["role_arn"],
+        s3_input_uri=settings["s3_input_uri"],
+        s3_output_uri=settings["s3_output_uri"],
+        poll_interval_seconds=poll_interval,
+        timeout_hours=timeout_hours,
+    )
@@ -1,16 +1,58 @@
+import asyncio
 import json
 import os
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
 
 import boto3
+import jsonschema
 from botocore.config import Config
 from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
 
-from .llm_provider import LLMProvider, PayloadTooLargeError
+from .json_stream import ArrayItemStream, salvage_array_items
+from .llm_provider import LLMProvider, PartialOutputError, PayloadTooLargeError
 from .logger_config import get_logger, log_exception
-from .utils import measure_time
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+from .token_estimator import (
+    estimate_request_tokens,
+    estimate_tokens,
+    get_input_token_limit,
+)
+from .utils import measure_time, validate_json_schema
 
 logger = get_logger("bedrock_provider")
 
+# botocore's default urllib3 pool size; only raised, never lowered
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+THROTTLING_ERROR_CODES = ("ThrottlingException", "TooManyRequestsException")
+THROTTLE_BACKOFF_SECONDS = 1
+
+# Marks the end of a cacheable prompt prefix in a converse request
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+USAGE_KEYS = (
+    "inputTokens",
+    "outputTokens",
+    "cacheReadInputTokens",
+    "cacheWriteInputTokens",
+)
+
+DEFAULT_MAX_CONTINUATIONS = 2
+# Tool result asking for the rest of an array output cut off at maxTokens
+CONTINUATION_PROMPT = (
+    "The output was cut off at the token limit after the {count} items above. "
+    "Call the tool again with only the remaining items, continuing after the last one."
+)
+# Tool result asking for the items missing from a rejected partial output
+REMAINING_ITEMS_INSTRUCTION = (
+    "The output was rejected because of:\n{issues}\n"
+    "The valid items above are kept. Call the tool again with only the items "
+    "that are missing from them, with the invalid ones corrected."
+)
+
 
 class BedrockProvider(LLMProvider):
     """
@@ -18,7 +60,13 @@ class BedrockProvider(LLMProvider):
     Handles Bedrock-specific API calls, configuration, and error translation.
     """
 
-    def __init__(self, config: dict, system_config: dict):
+    def __init__(
+        self,
+        config: dict,
+        system_config: dict,
+        concurrency: int = 1,
+        response_cache: ResponseCache | None = None,
+    ):
         super().__init__(
             config, system_config
         )  # Call super with full config and system_config
@@ -29,11 +77,56 @@ class BedrockProvider(LLMProvider):
         self.provider_settings = config["provider_config"][
             "settings"
         ]  # Store specific provider settings
+        self.concurrency = concurrency
+        self.response_cache = response_cache
         self.bedrock_client = self._setup_bedrock_client()
         self._output_schema = self.provider_settings[
             "output_json"
         ]  # Extract output_json from provider_settings
         self._schema_wrapped = False  # Track if array schema was wrapped in object
+        self._async_semaphore = None  # Created on first ainvoke_single
+        # Shared by every call of this provider, i.e. by the whole run
+        self.rate_limiter = RateLimiter.from_settings(
+            self.provider_settings.get("rate_limit"), max(concurrency, 1)
+        )
+        self.prompt_caching = self.provider_settings.get("prompt_caching", False)
+        self.streaming = self.provider_settings.get("streaming", False)
+        self.max_continuations = self.provider_settings.get(
+            "max_continuations", DEFAULT_MAX_CONTINUATIONS
+        )
+        self.usage = dict.fromkeys(USAGE_KEYS, 0)
+        self._usage_lock = threading.Lock()
+
+        # Request-invariant parts, built once and shared by every request.
+        # They are never mutated after construction.
+        self._system_prompt_template = (
+            self.system_config["system_prompt"]
+            + "\n"
+            + self.provider_settings["system_prompt"]  # Use provider_settings
+        )
+        self._modules_enabled = self.config.get("modules", {}).get(
+            "enabled", True
+        )  # Keep self.config for global modules config
+        tool_config = self._build_tool_config()
+        self._tool_config_tokens = estimate_tokens(
+            json.dumps(tool_config, ensure_ascii=False)
+        )
+        self._request_template = {
+            "modelId": self.model_id,
+            "inferenceConfig": self._build_inference_config(),
+            "toolConfig": tool_config,
+        }
+        self._input_token_limit = get_input_token_limit(
+            self.model_id,
+            self.system_config,
+            self.provider_settings.get("input_token_limit"),
+        )
+        # (modules_data, system prompt, system blocks) of the last modules payload
+        self._system_cache = None
+        # Schema of each array item, validated as items arrive when streaming
+        self._item_schema = (
+            self.output_schema.get("items") if self._schema_wrapped else None
+        )
 
     @property
     def output_schema(self) -> dict:
@@ -42,6 +135,21 @@ class BedrockProvider(LLMProvider):
         """
         return self._output_schema
 
+    async def ainvoke_single(
+        self, prompt: str, modules_data: str | None, cache_prefix: str | None = None
+    ) -> str:
+        """
+        Awaitable invoke_single. boto3 has no async client, so the call runs in
+        a worker thread; in-flight calls are bounded by the connection pool
+        size so they never queue inside urllib3.
+        """
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(
+                max(self.concurrency, DEFAULT_MAX_POOL_CONNECTIONS)
+            )
+        async with self._async_semaphore:
+            return await super().ainvoke_single(prompt, modules_data, cache_prefix)
+
     def _setup_bedrock_client(self):
         """
         Sets up and returns a boto3 Bedrock runtime client.
@@ -69,7 +177,11 @@ class BedrockProvider(LLMProvider):
                 },
             ),
         }
-        bedrock_config = Config(**timeout_config)
+        # Size the connection pool so concurrent workers do not queue on it
+        bedrock_config = Config(
+            **timeout_config,
+            max_pool_connections=max(self.concurrency, DEFAULT_MAX_POOL_CONNECTIONS),
+        )
 
         session = None
         if (
@@ -117,12 +229,33 @@ class BedrockProvider(LLMProvider):
         logger.info(
             f"Using AWS region: {self.provider_settings.get('aws_region', 'us-east-1')}"  # Use provider_settings
         )
+        self._session = session  # Reused for other AWS clients (e.g. batch inference)
         return session.client(
             "bedrock-runtime",
             region_name=self.provider_settings.get("aws_region", "us-east-1"),
             config=bedrock_config,  # Use provider_settings
         )
 
+    @property
+    def model_id(self) -> str:
+        """
+        Returns the Bedrock model id used for requests.
+        """
+        return self.provider_settings.get(
+            "model_id",
+            self.system_config["constants"]["bedrock"]["default_model_id"],
+        )  # Use provider_settings
+
+    def create_aws_client(self, service_name: str):
+        """
+        Creates a boto3 client for another AWS service with the provider's
+        credentials and region (e.g. "bedrock" and "s3" for batch inference).
+        """
+        return self._session.client(
+            service_name,
+            region_name=self.provider_settings.get("aws_region", "us-east-1"),
+        )
+
     def _build_tool_config(self) -> dict:
         """
         Builds the Bedrock-specific toolConfig for structured output.
@@ -163,29 +296,11 @@ class BedrockProvider(LLMProvider):
         }
         return tool_config
 
-    def invoke_single(self, prompt: str, modules_data: str | None) -> str:
+    def _build_inference_config(self) -> dict:
         """
-        Performs a single API call to the AWS Bedrock converse API.
-        Translates size-related ClientErrors into PayloadTooLargeError.
+        Builds the converse inferenceConfig from the payload settings.
         """
-        modules_enabled = self.config.get("modules", {}).get(
-            "enabled", True
-        )  # Keep self.config for global modules config
-        modules_data_str = modules_data if (modules_data is not None) else ""
-
-        final_system_prompt = (
-            self.system_config["system_prompt"]
-            + "\n"
-            + self.provider_settings["system_prompt"]  # Use provider_settings
-        )
-        final_system_prompt = final_system_prompt.replace(
-            "{modules_data}", modules_data_str if modules_enabled else ""
-        )
-        logger.debug(f"Prompt: {prompt}")
-        messages = [{"role": "user", "content": [{"text": prompt}]}]
-        system = [{"text": final_system_prompt}]
-
-        inference_config = {
+        return {
             "maxTokens": self.provider_settings["payload"].get(  # Use provider_settings
                 "max_tokens",
                 self.system_config["default_bedrock"]["payload"]["max_tokens"],
@@ -201,59 +316,563 @@ class BedrockProvider(LLMProvider):
             ),
         }
 
-        tool_config = self._build_tool_config()
+    def _system_for(self, modules_data: str | None) -> tuple[str, list]:
+        """
+        Returns the system prompt and system blocks for a modules payload.
+        Every request of a run carries the same modules file, so the result
+        for the last payload is kept instead of substituting it again.
+        """
+        cached = self._system_cache
+        if cached is not None and cached[0] == modules_data:
+            return cached[1], cached[2]
 
-        try:
-            model_id = self.provider_settings.get(
-                "model_id",
-                self.system_config["constants"]["bedrock"]["default_model_id"],
-            )  # Use provider_settings
-            with measure_time(f"AWS Bedrock API call: {model_id}", logger):
-                response = self.bedrock_client.converse(
-                    modelId=model_id,
-                    messages=messages,
-                    system=system,
-                    inferenceConfig=inference_config,
-                    toolConfig=tool_config,
-                )
-            logger.debug(f"Bedrock response:\n {response}")
+        modules_data_str = modules_data if (modules_data is not None) else ""
+        system_prompt = self._system_prompt_template.replace(
+            "{modules_data}", modules_data_str if self._modules_enabled else ""
+        )
+        system = [{"text": system_prompt}]
+        if self.prompt_caching and self._is_cache_worthy(system_prompt):
+            system.append(CACHE_POINT)
+        self._system_cache = (modules_data, system_prompt, system)
+        return system_prompt, system
 
-            # --- Response Parsing (from original bedrock_client.py) ---
-            output = response.get("output", {})
-            message = output.get("message", {})
-            if message is None:
-                logger.error(f"Response structure: {response}")
-                raise AttributeError("Response message is None")
-            content = message.get("content", [{}])[0]
-
-            if "toolUse" in content:
-                tool_use = content["toolUse"]
-                logger.debug(
-                    f"Tool use response: {json.dumps(tool_use, indent=2, ensure_ascii=False)}"
-                )
+    def _parse_response(self, response: dict) -> str:
+        """
+        Extracts the structured output from a converse API response.
+        Returns:
+            str: The JSON string produced by the tool call (or plain text fallback).
+        """
+        output = response.get("output", {})
+        message = output.get("message", {})
+        if message is None:
+            logger.error(f"Response structure: {response}")
+            raise AttributeError("Response message is None")
+        content = message.get("content", [{}])[0]
+
+        if "toolUse" in content:
+            tool_use = content["toolUse"]
+            logger.debug(
+                f"Tool use response: {json.dumps(tool_use, indent=2, ensure_ascii=False)}"
+            )
+            if (
+                tool_use["name"]
+                == self.system_config["constants"]["bedrock"]["tool_name"]
+            ):
+                result = tool_use["input"]
+                # Unwrap if schema was wrapped for Bedrock API compatibility
                 if (
-                    tool_use["name"]
-                    == self.system_config["constants"]["bedrock"]["tool_name"]
+                    self._schema_wrapped
+                    and isinstance(result, dict)
+                    and "data" in result
                 ):
-                    result = tool_use["input"]
-                    # Unwrap if schema was wrapped for Bedrock API compatibility
+                    result = result["data"]
+                    logger.debug("Unwrapping array data from object wrapper")
+                return json.dumps(result, ensure_ascii=False)
+
+        if "text" in content:
+            # Fallback to plain text if toolUse is not present
+            return content.get("text", "")
+
+        raise json.JSONDecodeError(
+            "Invalid response format: missing text or toolUse", "", 0
+        )
+
+    def _is_cacheable(self, result: str) -> bool:
+        """
+        Only responses that parse and match the output schema are cached,
+        so malformed answers are retried on the next run.
+        """
+        try:
+            validate_json_schema(json.loads(result), self.output_schema)
+            return True
+        except (json.JSONDecodeError, jsonschema.ValidationError):
+            logger.debug("Response does not match output schema, not caching it")
+            return False
+
+    def _converse_stream(self, request: dict) -> dict:
+        """
+        Calls the converse_stream API and assembles the events into the shape
+        of a converse response. Array items of the tool input are validated
+        as soon as they are complete; the stream is abandoned at the first
+        invalid item.
+        Raises:
+            PartialOutputError: If a streamed item is not valid, with the items preceding it.
+        """
+        started = time.monotonic()
+        stream = self.bedrock_client.converse_stream(**request)["stream"]
+        items = ArrayItemStream() if self._item_schema is not None else None
+        valid_items = []
+        tool_use = None
+        text = []
+        response = {"stopReason": None, "usage": {}}
+        try:
+            for event in stream:
+                if "contentBlockStart" in event:
+                    start = event["contentBlockStart"].get("start", {})
+                    if "toolUse" in start:
+                        tool_use = {**start["toolUse"], "input": []}
+                elif "contentBlockDelta" in event:
+                    delta = event["contentBlockDelta"].get("delta", {})
+                    if "toolUse" in delta and tool_use is not None:
+                        chunk = delta["toolUse"].get("input", "")
+                        tool_use["input"].append(chunk)
+                        if items is None:
+                            continue
+                        for item in items.feed(chunk):
+                            item = json.loads(item)
+                            validate_json_schema(item, self._item_schema)
+                            valid_items.append(item)
+                            if len(valid_items) == 1:
+                                logger.debug(
+                                    f"First item streamed after {time.monotonic() - started:.2f}s"
+                                )
+                    elif "text" in delta:
+                        text.append(delta["text"])
+                elif "messageStop" in event:
+                    response["stopReason"] = event["messageStop"].get("stopReason")
+                elif "metadata" in event:
+                    response["usage"] = event["metadata"].get("usage", {})
+        except (json.JSONDecodeError, jsonschema.ValidationError) as e:
+            message = e.message if isinstance(e, jsonschema.ValidationError) else e.msg
+            logger.warning(
+                f"Abandoning streamed response after {len(valid_items)} valid items "
+                f"({time.monotonic() - started:.2f}s): {message}"
+            )
+            stream.close()
+            issue = f"item {len(valid_items)} is invalid: {message}"
+            raise PartialOutputError(
+                f"Streamed response abandoned: {issue}", valid_items, [issue]
+            ) from e
+
+        content = []
+        if tool_use is not None:
+            tool_input = "".join(tool_use["input"])
+            if response["stopReason"] != "max_tokens":
+                tool_input = json.loads(tool_input)
+            # A truncated input is kept as text for _truncated_items
+            content.append({"toolUse": {**tool_use, "input": tool_input}})
+        if text:
+            content.append({"text": "".join(text)})
+        response["output"] = {"message": {"role": "assistant", "content": content}}
+        return response
+
+    def _truncated_items(self, response: dict) -> list:
+        """
+        Returns the complete array items of a tool input cut off at maxTokens,
+        up to the first one that does not match the items schema.
+        """
+        tool_input = None
+        message = response.get("output", {}).get("message") or {}
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                tool_input = block["toolUse"].get("input")
+        if isinstance(tool_input, str):
+            items = salvage_array_items(tool_input)
+        elif isinstance(tool_input, dict) and isinstance(tool_input.get("data"), list):
+            items = tool_input["data"]
+        else:
+            items = []
+
+        valid_items = []
+        for item in items:
+            try:
+                validate_json_schema(item, self._item_schema)
+            except jsonschema.ValidationError:
+                break
+            valid_items.append(item)
+        return valid_items
+
+    def _replay_items(
+        self, request: dict, items: list, instruction: str, tool_use_id: str
+    ) -> dict:
+        """
+        Returns request followed by items replayed as the model's own tool
+        call, whose tool result carries the instruction for the next answer.
+        """
+        tool_name = self.system_config["constants"]["bedrock"]["tool_name"]
+        tool_use = {
+            "toolUseId": tool_use_id,
+            "name": tool_name,
+            "input": {"data": list(items)},
+        }
+        tool_result = {
+            "toolUseId": tool_use_id,
+            "content": [{"text": instruction}],
+            "status": "error",
+        }
+        return {
+            **request,
+            "messages": [
+                *request["messages"],
+                {"role": "assistant", "content": [{"toolUse": tool_use}]},
+                {"role": "user", "content": [{"toolResult": tool_result}]},
+            ],
+        }
+
+    def _continue_truncated(
+        self, request: dict, response: dict, estimated_tokens: int
+    ) -> dict:
+        """
+        Completes an array output cut off at maxTokens. The complete items are
+        kept and replayed as the model's own tool call, whose tool result asks
+        for the remaining items, up to max_continuations times.
+        Returns:
+            dict: A converse response whose tool input holds every item.
+        Raises:
+            PayloadTooLargeError: If the output is still cut off after the
+                last continuation, or a response adds no complete item.
+        """
+        max_tokens = request["inferenceConfig"]["maxTokens"]
+        items = self._truncated_items(response)
+        if not items:
+            # Asking again would repeat the request and hit the limit at the same point
+            raise PayloadTooLargeError(
+                "Response cut off at maxTokens before its first complete item"
+            )
+        for continuation in range(1, self.max_continuations + 1):
+            logger.warning(
+                f"Response cut off at maxTokens after {len(items)} items, requesting "
+                f"the remainder ({continuation}/{self.max_continuations})"
+            )
+            tool_use_id = f"tooluse_continuation_{continuation}"
+            replayed_tokens = estimate_tokens(json.dumps(items, ensure_ascii=False))
+            response = self._converse(
+                self._replay_items(
+                    request,
+                    items,
+                    CONTINUATION_PROMPT.format(count=len(items)),
+                    tool_use_id,
+                ),
+                estimated_tokens + replayed_tokens + max_tokens,
+            )
+            self._record_usage(response.get("usage", {}))
+
+            if response.get("stopReason") != "max_tokens":
+                remainder = json.loads(self._parse_response(response))
+                if not isinstance(remainder, list):
+                    raise jsonschema.ValidationError(
+                        "Continuation did not return an array of items"
+                    )
+                items.extend(remainder)
+                logger.info(
+                    f"Completed truncated output with {continuation} continuation(s): "
+                    f"{len(items)} items"
+                )
+                tool_use = {
+                    "toolUseId": tool_use_id,
+                    "name": self.system_config["constants"]["bedrock"]["tool_name"],
+                    "input": {"data": items},
+                }
+                return {
+                    **response,
+                    "output": {
+                        "message": {
+                            "role": "assistant",
+                            "content": [{"toolUse": tool_use}],
+                        }
+                    },
+                }
+
+            new_items = self._truncated_items(response)
+            if not new_items:
+                break
+            items.extend(new_items)
+
+        raise PayloadTooLargeError(
+            f"Response still cut off at maxTokens after {len(items)} items"
+        )
+
+    def _send(self, request: dict) -> dict:
+        """
+        Sends a converse request, streamed when streaming is enabled.
+        Returns:
+            dict: The converse response.
+        """
+        if self.streaming:
+            return self._converse_stream(request)
+        return self.bedrock_client.converse(**request)
+
+    def _converse(self, request: dict, estimated_tokens: int) -> dict:
+        """
+        Calls the converse API within the client-side rate limits, if configured.
+        Throttles that outlast botocore's retries lower the concurrency limit
+        and are retried here up to rate_limit.throttle_retries times.
+        """
+        if self.rate_limiter is None:
+            return self._send(request)
+
+        attempt = 0
+        while True:
+            with self.rate_limiter.slot(estimated_tokens):
+                try:
+                    response = self._send(request)
+                except ClientError as e:
                     if (
-                        self._schema_wrapped
-                        and isinstance(result, dict)
-                        and "data" in result
+                        e.response.get("Error", {}).get("Code")
+                        not in THROTTLING_ERROR_CODES
                     ):
-                        result = result["data"]
-                        logger.debug("Unwrapping array data from object wrapper")
-                    return json.dumps(result, ensure_ascii=False)
+                        raise
+                    self.rate_limiter.on_throttle()
+                    if attempt >= self.rate_limiter.throttle_retries:
+                        raise
+                    attempt += 1
+                    logger.warning(
+                        f"Bedrock throttled the request, retrying ({attempt}/{self.rate_limiter.throttle_retries})"
+                    )
+                else:
+                    self.rate_limiter.on_success()
+                    return response
+            # Back off outside the concurrency slot before retrying
+            time.sleep(THROTTLE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    def _is_cache_worthy(self, *texts: str) -> bool:
+        """
+        Whether a prompt prefix, given as its consecutive parts, reaches the
+        minimum size of a cache checkpoint.
+        """
+        min_tokens = self.system_config["constants"]["bedrock"].get(
+            "cache_min_tokens", 0
+        )
+        return sum(estimate_tokens(text) for text in texts) >= min_tokens
+
+    def build_request(
+        self, prompt: str, modules_data: str | None, cache_prefix: str | None = None
+    ) -> dict:
+        """
+        Builds the converse API request for a prompt without sending it.
+        With prompt_caching enabled, a cache checkpoint follows the system
+        prompt (which carries the modules) and cache_prefix, so that tools,
+        system prompt and shared locals form a byte-stable cached prefix.
+        Returns:
+            dict: Keyword arguments of bedrock_client.converse.
+        """
+        final_system_prompt, system = self._system_for(modules_data)
+        logger.debug(f"Prompt: {prompt}")
+        content = [{"text": prompt}]
+        if (
+            self.prompt_caching
+            and cache_prefix
+            and cache_prefix.strip()
+            and len(cache_prefix) < len(prompt)
+            and prompt.startswith(cache_prefix)
+            and self._is_cache_worthy(final_system_prompt, cache_prefix)
+        ):
+            content = [
+                {"text": cache_prefix},
+                CACHE_POINT,
+                {"text": prompt[len(cache_prefix) :]},
+            ]
+        messages = [{"role": "user", "content": content}]
+
+        return {
+            **self._request_template,
+            "messages": messages,
+            "system": system,
+        }
+
+    def _estimate_request(self, request: dict) -> int:
+        """
+        Estimates the input tokens of a converse request: its messages, system
+        prompt and tool definition.
+        """
+        parts = []
+        for message in request["messages"]:
+            for block in message["content"]:
+                if "text" in block:
+                    parts.append(block["text"])
+                elif "toolUse" in block:
+                    # Items replayed by a continuation or a re-request
+                    parts.append(
+                        json.dumps(block["toolUse"]["input"], ensure_ascii=False)
+                    )
+                elif "toolResult" in block:
+                    parts.extend(
+                        content["text"]
+                        for content in block["toolResult"]["content"]
+                        if "text" in content
+                    )
+        # Joining a single text block returns it without copying
+        prompt = "".join(parts)
+        system_prompt = "".join(
+            block["text"] for block in request["system"] if "text" in block
+        )
+        return estimate_request_tokens(prompt, system_prompt) + self._tool_config_tokens
 
-            if "text" in content:
-                # Fallback to plain text if toolUse is not present
-                return content.get("text", "")
+    def estimate_request_tokens(self, prompt: str, modules_data: str | None) -> int:
+        """
+        Estimates the input tokens of the request built for a prompt, including
+        the system prompt with the modules data and the tool definition.
+        """
+        return self._estimate_request(self.build_request(prompt, modules_data))
 
-            raise json.JSONDecodeError(
-                "Invalid response format: missing text or toolUse", "", 0
+    @property
+    def input_token_limit(self) -> int | None:
+        """
+        Returns the input token limit used by the pre-flight check.
+        """
+        return self._input_token_limit
+
+    def _check_payload_size(self, request: dict) -> int:
+        """
+        Pre-flight: rejects a request that Bedrock is certain to refuse for its size.
+        Returns:
+            int: The estimated input tokens of the request.
+        Raises:
+            PayloadTooLargeError: If the estimate exceeds the model's input token limit.
+        """
+        estimated_tokens = self._estimate_request(request)
+        model_id = request["modelId"]
+        token_limit = self._input_token_limit
+        if token_limit is not None and estimated_tokens > token_limit:
+            logger.warning(
+                f"Estimated {estimated_tokens} input tokens exceeds the {token_limit} token limit of {model_id}"
             )
+            raise PayloadTooLargeError(
+                f"Estimated payload of {estimated_tokens} tokens exceeds limit {token_limit}"
+            )
+        return estimated_tokens
 
+    def build_batch_model_input(self, prompt: str, modules_data: str | None) -> dict:
+        """
+        Builds the modelInput of a batch inference record. Batch inference takes
+        InvokeModel bodies, so the converse request is translated to the
+        Anthropic Messages format.
+        Returns:
+            dict: The model-native request body.
+        Raises:
+            PayloadTooLargeError: If the prompt is too large for the model.
+        """
+        request = self.build_request(prompt, modules_data)
+        self._check_payload_size(request)
+        tool_spec = request["toolConfig"]["tools"][0]["toolSpec"]
+        inference_config = request["inferenceConfig"]
+        return {
+            "anthropic_version": self.provider_settings["payload"].get(
+                "anthropic_version",
+                self.system_config["default_bedrock"]["payload"]["anthropic_version"],
+            ),
+            "max_tokens": inference_config["maxTokens"],
+            "temperature": inference_config["temperature"],
+            "top_p": inference_config["topP"],
+            "system": "".join(
+                block["text"] for block in request["system"] if "text" in block
+            ),
+            "messages": [
+                {
+                    "role": message["role"],
+                    "content": [
+                        {"type": "text", "text": block["text"]}
+                        for block in message["content"]
+                        if "text" in block
+                    ],
+                }
+                for message in request["messages"]
+            ],
+            "tools": [
+                {
+                    "name": tool_spec["name"],
+                    "description": tool_spec["description"],
+                    "input_schema": tool_spec["inputSchema"]["json"],
+                }
+            ],
+            "tool_choice": {"type": "tool", "name": tool_spec["name"]},
+        }
+
+    def parse_batch_output(self, model_output: dict) -> str:
+        """
+        Extracts the structured output from a batch inference modelOutput
+        (Anthropic Messages response body).
+        Returns:
+            str: The JSON string produced by the tool call (or plain text fallback).
+        """
+        tool_name = self.system_config["constants"]["bedrock"]["tool_name"]
+        for block in model_output.get("content", []):
+            if block.get("type") == "tool_use" and block.get("name") == tool_name:
+                result = block["input"]
+                if (
+                    self._schema_wrapped
+                    and isinstance(result, dict)
+                    and "data" in result
+                ):
+                    result = result["data"]
+                return json.dumps(result, ensure_ascii=False)
+        for block in model_output.get("content", []):
+            if block.get("type") == "text":
+                return block.get("text", "")
+        raise json.JSONDecodeError(
+            "Invalid batch output format: missing text or tool_use", "", 0
+        )
+
+    def _record_usage(self, usage: dict) -> None:
+        """
+        Adds the token usage of a converse response to the run totals.
+        """
+        logger.debug(
+            "Bedrock usage: "
+            + ", ".join(f"{key}={usage.get(key, 0)}" for key in USAGE_KEYS)
+        )
+        with self._usage_lock:
+            for key in USAGE_KEYS:
+                self.usage[key] += usage.get(key, 0)
+
+    def close(self) -> None:
+        """
+        Logs the token usage of the run, including prompt cache reads and writes.
+        """
+        logger.info(
+            f"Bedrock token usage: {self.usage['inputTokens']} input, "
+            f"{self.usage['outputTokens']} output, "
+            f"{self.usage['cacheReadInputTokens']} cache read, "
+            f"{self.usage['cacheWriteInputTokens']} cache write"
+        )
+
+    def invoke_remaining(
+        self,
+        prompt: str,
+        modules_data: str | None,
+        items: list,
+        issues: list,
+        cache_prefix: str | None = None,
+    ) -> str:
+        """
+        Requests only the items missing from a rejected partial output. The
+        valid items are replayed as the model's own tool call and the issues
+        are its tool result, so the original prompt, and its cached prefix,
+        is sent unchanged. Responses are not cached.
+        """
+        if self._item_schema is None:
+            return super().invoke_remaining(
+                prompt, modules_data, items, issues, cache_prefix
+            )
+
+        request = self._replay_items(
+            self.build_request(prompt, modules_data, cache_prefix),
+            items,
+            REMAINING_ITEMS_INSTRUCTION.format(
+                issues="\n".join(f"- {issue}" for issue in issues)
+            ),
+            "tooluse_remaining",
+        )
+        estimated_tokens = self._check_payload_size(request)
+
+        with self._translated_errors():
+            with measure_time(f"AWS Bedrock API call: {request['modelId']}", logger):
+                response = self._converse(
+                    request, estimated_tokens + request["inferenceConfig"]["maxTokens"]
+                )
+            self._record_usage(response.get("usage", {}))
+            if response.get("stopReason") == "max_tokens" and self.max_continuations:
+                response = self._continue_truncated(request, response, estimated_tokens)
+            return self._parse_response(response)
+
+    @contextmanager
+    def _translated_errors(self) -> Generator[None, None, None]:
+        """
+        Translates size-related ClientErrors into PayloadTooLargeError and
+        logs unexpected errors of a Bedrock call before re-raising them.
+        """
+        try:
+            yield
         except ClientError as e:
             # ★ Translate Bedrock-specific ClientError to common PayloadTooLargeError
             if "Input token size exceeds limit" in str(e):
@@ -262,6 +881,9 @@ class BedrockProvider(LLMProvider):
             else:
                 log_exception(logger, e, "Bedrock client error")
                 raise
+        except (PayloadTooLargeError, PartialOutputError):
+            # Handled by the caller's failback
+            raise
         except EndpointConnectionError as e:
             log_exception(logger, e, "Bedrock endpoint connection failed")
             raise
@@ -271,3 +893,43 @@ class BedrockProvider(LLMProvider):
         except Exception as e:
             log_exception(logger, e, "Unexpected error during Bedrock invocation")
             raise
+
+    def invoke_single(
+        self, prompt: str, modules_data: str | None, cache_prefix: str | None = None
+    ) -> str:
+        """
+        Performs a single API call to the AWS Bedrock converse API.
+        Translates size-related ClientErrors into PayloadTooLargeError.
+        """
+        request = self.build_request(prompt, modules_data, cache_prefix)
+        model_id = request["modelId"]
+        inference_config = request["inferenceConfig"]
+        estimated_tokens = self._check_payload_size(request)
+
+        with self._translated_errors():
+            cache_key = None
+            if self.response_cache is not None:
+                cache_key = self.response_cache.make_key(request)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Using cached Bedrock response: {cache_key[:12]}")
+                    return cached
+
+            with measure_time(f"AWS Bedrock API call: {model_id}", logger):
+                # Token quotas count the input and the reserved output tokens
+                response = self._converse(
+                    request, estimated_tokens + inference_config["maxTokens"]
+                )
+            logger.debug(f"Bedrock response:\n {response}")
+            self._record_usage(response.get("usage", {}))
+            if (
+                response.get("stopReason") == "max_tokens"
+                and self._item_schema is not None
+                and self.max_continuations
+            ):
+                response = self._continue_truncated(request, response, estimated_tokens)
+
+            result = self._parse_response(response)
+            if cache_key is not None and self._is_cacheable(result):
+                self.response_cache.put(cache_key, result)
+            return result
@@ -1,6 +1,16 @@
 import argparse
 
 
+def _positive_int(value: str) -> int:
+    """
+    Argparse type for options that require an integer of at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+    return number
+
+
 def parse_args() -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -21,4 +31,42 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Enable debug logging (default: INFO level)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of files to process concurrently (overrides input.concurrency, default: 1)",
+    )
+    parser.add_argument(
+        "--parse-jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of processes parsing HCL ahead of processing (overrides input.parse_workers, default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the LLM response cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached LLM responses but store fresh ones",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files unchanged since the last incremental run and reuse their Markdown",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Drive file processing from an asyncio event loop (uses --jobs as the number of files in flight)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all files as one batch inference job; files without a usable result are processed interactively",
+    )
     return parser.parse_args()
@@ -47,11 +47,54 @@ def get_system_config() -> dict:
                 "tool_name": "json_validator",
                 "tool_description": "Validates and formats JSON output",
                 "target_json_key": "monitors",
+                # Smallest prefix worth a prompt cache checkpoint; Bedrock
+                # does not cache shorter prefixes
+                "cache_min_tokens": 1024,
             },
             "file_processing": {
                 "terraform_extension": ".tf",
                 "default_search_resource": "monitors",
             },
+            # Input token limits per Bedrock model id, used to split oversized
+            # prompts before sending them. Ids are matched exactly, with or
+            # without their ":N" version suffix; unknown models are sent as is
+            "token_limits": {
+                "models": {
+                    "anthropic.claude-instant-v1": 100000,
+                    "anthropic.claude-v2": 100000,
+                    "anthropic.claude-v2:1": 200000,
+                    "anthropic.claude-3-haiku-20240307-v1": 200000,
+                    "anthropic.claude-3-sonnet-20240229-v1": 200000,
+                    "anthropic.claude-3-opus-20240229-v1": 200000,
+                    "anthropic.claude-3-5-haiku-20241022-v1": 200000,
+                    "anthropic.claude-3-5-sonnet-20240620-v1": 200000,
+                    "anthropic.claude-3-5-sonnet-20241022-v2": 200000,
+                    "anthropic.claude-3-7-sonnet-20250219-v1": 200000,
+                    "anthropic.claude-sonnet-4-20250514-v1": 200000,
+                    "anthropic.claude-opus-4-20250514-v1": 200000,
+                    "amazon.nova-micro-v1": 128000,
+                    "amazon.nova-lite-v1": 300000,
+                    "amazon.nova-pro-v1": 300000,
+                    "amazon.titan-text-lite-v1": 4000,
+                    "amazon.titan-text-express-v1": 8000,
+                    "amazon.titan-text-premier-v1": 32000,
+                    "meta.llama3-8b-instruct-v1": 8000,
+                    "meta.llama3-70b-instruct-v1": 8000,
+                    "meta.llama3-1-8b-instruct-v1": 128000,
+                    "meta.llama3-1-70b-instruct-v1": 128000,
+                    "meta.llama3-1-405b-instruct-v1": 128000,
+                    "meta.llama3-2-1b-instruct-v1": 128000,
+                    "meta.llama3-2-3b-instruct-v1": 128000,
+                    "meta.llama3-2-11b-instruct-v1": 128000,
+                    "meta.llama3-2-90b-instruct-v1": 128000,
+                    "meta.llama3-3-70b-instruct-v1": 128000,
+                    "mistral.mistral-7b-instruct-v0": 32000,
+                    "mistral.mixtral-8x7b-instruct-v0": 32000,
+                    "mistral.mistral-small-2402-v1": 32000,
+                    "mistral.mistral-large-2402-v1": 32000,
+                    "mistral.mistral-large-2407-v1": 128000,
+                },
+            },
         },
     }
     return system_config
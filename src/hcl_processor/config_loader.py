@@ -6,7 +6,8 @@ import yaml
 
 from .config.system_config import get_system_config
 from .logger_config import get_logger
-from .utils import measure_time
+from .prompt_serializer import PROMPT_FORMATS
+from .utils import measure_time, validate_json_schema
 
 logger = get_logger("config_loader")
 
@@ -39,6 +40,32 @@ BEDROCK_PROVIDER_SCHEMA = {
         "aws_profile": {"type": "string"},
         "aws_region": {"type": "string"},
         "model_id": {"type": "string"},
+        "input_token_limit": {"type": "integer", "minimum": 1},
+        "prompt_caching": {"type": "boolean"},
+        "streaming": {"type": "boolean"},
+        "max_continuations": {"type": "integer", "minimum": 0},
+        "batch": {
+            "type": "object",
+            "properties": {
+                "backend": {"type": "string", "enum": ["bedrock", "local"]},
+                "role_arn": {"type": "string"},
+                "s3_input_uri": {"type": "string"},
+                "s3_output_uri": {"type": "string"},
+                "local_path": {"type": "string"},
+                "poll_interval_seconds": {"type": "number", "minimum": 0},
+                "timeout_hours": {"type": "number", "exclusiveMinimum": 0},
+            },
+            "additionalProperties": False,
+        },
+        "rate_limit": {
+            "type": "object",
+            "properties": {
+                "requests_per_minute": {"type": "integer", "minimum": 1},
+                "tokens_per_minute": {"type": "integer", "minimum": 1},
+                "throttle_retries": {"type": "integer", "minimum": 0},
+            },
+            "additionalProperties": False,
+        },
     },
     "required": ["system_prompt", "payload", "output_json"],
     "additionalProperties": False,
@@ -93,6 +120,10 @@ CONFIG_SCHEMA_BASE = {
                         "additionalProperties": {"type": "string"},
                     },
                 },
+                "concurrency": {"type": "integer", "minimum": 1},
+                "parse_workers": {"type": "integer", "minimum": 1},
+                "prompt_format": {"type": "string", "enum": PROMPT_FORMATS},
+                "prune_locals": {"type": "boolean"},
                 "failback": {
                     "type": "object",
                     "properties": {
@@ -100,7 +131,14 @@ CONFIG_SCHEMA_BASE = {
                         "type": {"type": "string", "enum": ["resource", "modules"]},
                         "options": {
                             "type": "object",
-                            "properties": {"target": {"type": "string"}},
+                            "properties": {
+                                "target": {"type": "string"},
+                                "max_concurrency": {"type": "integer", "minimum": 1},
+                                "batch_token_budget": {
+                                    "type": "integer",
+                                    "minimum": 1,
+                                },
+                            },
                             "required": ["target"],
                         },
                     },
@@ -114,7 +152,15 @@ CONFIG_SCHEMA_BASE = {
             "type": "object",
             "properties": {
                 "json_path": {"type": "string"},
+                "keep_json": {"type": "boolean"},
+                "json_compact": {"type": "boolean"},
                 "markdown_path": {"type": "string"},
+                "shard_by": {
+                    "type": "string",
+                    "enum": ["none", "directory", "module"],
+                },
+                "shard_dir": {"type": "string"},
+                "manifest_path": {"type": "string"},
                 "template": {
                     "oneOf": [
                         {"type": "string"},
@@ -128,12 +174,50 @@ CONFIG_SCHEMA_BASE = {
             },
             "required": ["json_path", "markdown_path"],
         },
+        "cache": {
+            "type": "object",
+            "properties": {
+                "enabled": {"type": "boolean"},
+                "path": {"type": "string"},
+                "ttl_seconds": {"type": "integer", "minimum": 0},
+                "max_size_mb": {"type": "number", "minimum": 0},
+            },
+            "additionalProperties": False,
+        },
     },
     "required": ["provider_config", "input", "output"],
     "additionalProperties": False,
 }
 
 
+PROVIDER_SCHEMAS = {"bedrock": BEDROCK_PROVIDER_SCHEMA}
+
+# Full config schemas by provider name, built on first use
+_config_schemas = {}
+
+
+def get_config_schema(provider_name: str) -> dict:
+    """
+    Returns the configuration schema with the provider's settings schema filled in.
+    The schema is built once per provider and must not be modified.
+    Args:
+        provider_name (str): Name of the active provider
+    Returns:
+        dict: The configuration schema
+    Raises:
+        ValueError: If the provider is not supported
+    """
+    if provider_name not in PROVIDER_SCHEMAS:
+        raise ValueError(f"Unsupported provider: {provider_name}")
+    if provider_name not in _config_schemas:
+        schema = deepcopy(CONFIG_SCHEMA_BASE)
+        schema["properties"]["provider_config"]["properties"]["settings"] = (
+            PROVIDER_SCHEMAS[provider_name]
+        )
+        _config_schemas[provider_name] = schema
+    return _config_schemas[provider_name]
+
+
 def get_default_config() -> dict:
     """
     Returns the default configuration for the HCL processor.
@@ -156,6 +240,12 @@ def get_default_config() -> dict:
             "threshold",
             "evaluation_period",
         ],
+        "cache": {
+            "enabled": True,
+            "path": ".hcl_processor_cache",
+            "ttl_seconds": 7 * 24 * 60 * 60,
+            "max_size_mb": 512,
+        },
     }
 
 
@@ -254,7 +344,7 @@ def load_config(config_path: str) -> dict:
             }
         }
         # Copy other allowed top-level keys from raw_config
-        allowed_top_level_keys = ["input", "output", "schema_columns"]
+        allowed_top_level_keys = ["input", "output", "schema_columns", "cache"]
         for key in allowed_top_level_keys:
             if key in raw_config:
                 config_for_internal_use[key] = raw_config[key]
@@ -279,15 +369,8 @@ def load_config(config_path: str) -> dict:
         # Load default configuration
         default_config = get_default_config()
 
-        # --- 3. Dynamically construct the schema based on the active provider ---
-        current_schema = deepcopy(CONFIG_SCHEMA_BASE)
-
-        if active_provider_name == "bedrock":
-            current_schema["properties"]["provider_config"]["properties"][
-                "settings"
-            ] = BEDROCK_PROVIDER_SCHEMA
-        else:
-            raise ValueError(f"Unsupported provider: {active_provider_name}")
+        # --- 3. Look up the schema of the active provider ---
+        current_schema = get_config_schema(active_provider_name)
 
         # Handle output_json conversion before validation
         if "output_json" in config["provider_config"]["settings"] and isinstance(
@@ -303,7 +386,7 @@ def load_config(config_path: str) -> dict:
                 )
 
         try:
-            jsonschema.validate(instance=config, schema=current_schema)
+            validate_json_schema(config, current_schema)
             logger.debug("Configuration schema validation passed")
 
             config = merge_defaults(config, default_config)
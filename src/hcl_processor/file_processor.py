@@ -1,21 +1,305 @@
+import asyncio
 import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
 import hcl2
 import jsonschema
 
-from .llm_provider import LLMProvider, PayloadTooLargeError
+from .hcl_cache import HclParseCache
+from .llm_provider import LLMProvider, PartialOutputError, PayloadTooLargeError
+from .locals_pruner import prune_local_files
 from .logger_config import get_logger, log_exception
-from .output_writer import output_md, validate_output_json
+from .output_writer import (
+    MarkdownSink,
+    output_md,
+    render_md,
+    salvage_output_items,
+    validate_output_json,
+    write_json_output,
+)
+from .prompt_serializer import DEFAULT_PROMPT_FORMAT, serialize_hcl
 from .provider_factory import (  # Import create_llm_provider from main.py
     create_llm_provider,
 )
-from .utils import ensure_directory_exists, measure_time
+from .token_estimator import TokenCounter, estimate_tokens
+from .utils import measure_time, validate_json_schema
+
+if TYPE_CHECKING:
+    from .run_context import RunContext
 
 logger = get_logger("file_processor")
 
 
+class SharedInputs:
+    """
+    Inputs shared by every file of a run: the serialized local files and the
+    raw modules file. They are read and parsed once, and reloaded only when
+    the modification time of one of the underlying files changes, so a
+    long-lived process picks up edits.
+    """
+
+    def __init__(self, config: dict, hcl_cache: HclParseCache | None = None):
+        self.local_files = config["input"]["local_files"]
+        self.hcl_cache = hcl_cache
+        self.prompt_format = config["input"].get("prompt_format", DEFAULT_PROMPT_FORMAT)
+        self.prune_locals = config["input"].get("prune_locals", False)
+        modules = config["input"]["modules"]
+        self.modules_path = modules["path"] if modules.get("enabled", True) else None
+        self._lock = threading.Lock()
+        self._locals = None  # (mtimes, entries, locals_str)
+        self._modules = None  # (mtime, modules_raw)
+        self._preparsed = None  # (mtimes, {path: parsed})
+
+    def _local_paths(self) -> list:
+        return [path for entry in self.local_files for path in entry.values()]
+
+    @staticmethod
+    def _mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def local_paths(self) -> list:
+        """
+        Returns the paths of all local files.
+        """
+        return self._local_paths()
+
+    def prime_locals(self, parsed_by_path: dict) -> None:
+        """
+        Seed parse results computed elsewhere (e.g. in a process pool).
+        They are ignored if a local file changes afterwards.
+        """
+        mtimes = tuple(self._mtime(path) for path in self._local_paths())
+        with self._lock:
+            self._preparsed = (mtimes, parsed_by_path)
+
+    def locals_str(self, resource_dict: dict | None = None) -> str:
+        """
+        Returns the serialized local files, reloading them if any file changed.
+        With prune_locals enabled and a resource_dict given, only the locals
+        referenced by that file are included.
+        """
+        mtimes = tuple(self._mtime(path) for path in self._local_paths())
+        with self._lock:
+            if self._locals is None or self._locals[0] != mtimes:
+                if self._locals is not None:
+                    logger.info("Local files changed on disk, reloading")
+                preparsed = None
+                if self._preparsed is not None and self._preparsed[0] == mtimes:
+                    preparsed = self._preparsed[1]
+                entries = load_local_files(self.local_files, self.hcl_cache, preparsed)
+                self._locals = (
+                    mtimes,
+                    entries,
+                    format_local_files(entries, self.prompt_format),
+                )
+            _, entries, locals_str = self._locals
+        if self.prune_locals and resource_dict is not None:
+            return format_local_files(entries, self.prompt_format, resource_dict)
+        return locals_str
+
+    def modules_raw(self) -> str | None:
+        """
+        Returns the raw modules file (None when modules are disabled),
+        reloading it if it changed.
+        """
+        if self.modules_path is None:
+            return None
+        mtime = self._mtime(self.modules_path)
+        with self._lock:
+            if self._modules is None or self._modules[0] != mtime:
+                if self._modules is not None:
+                    logger.info("Modules file changed on disk, reloading")
+                modules_raw, _ = read_tf_file(self.modules_path)
+                self._modules = (mtime, modules_raw)
+            return self._modules[1]
+
+
+def _run_chunks(
+    chunks: list,
+    locals_str: str,
+    modules_raw: str,
+    max_concurrency: int,
+    provider: LLMProvider,
+) -> list:
+    """
+    Invoke the provider once per serialized resource chunk (internal function)
+
+    Returns:
+        list: Validated outputs of the successful chunks, in chunk order
+    """
+    # Process chunks with failback strategy
+    total_chunks = len(chunks)
+
+    def process_chunk(i: int) -> tuple[bool, dict | list | None]:
+        try:
+            combined_str = f"{locals_str}\n{chunks[i]}\n"
+            partial_output = provider.invoke_single(
+                combined_str, modules_raw, cache_prefix=f"{locals_str}\n"
+            )
+            validated_partial = validate_output_json(
+                partial_output, provider.output_schema
+            )
+            logger.debug(f"Chunk {i + 1}/{total_chunks} processed successfully")
+            return True, validated_partial
+        except Exception as e:
+            # Failback core philosophy: pass processing for continuity
+            log_exception(
+                logger, e, f"Error processing resource chunk {i + 1}/{total_chunks}"
+            )
+            logger.warning(f"Skipping chunk {i + 1} and continuing with next chunk")
+            # Individual chunk failure should not stop overall processing
+            return False, None
+
+    chunk_results = []
+    try:
+        if max_concurrency > 1 and total_chunks > 1:
+            logger.info(
+                f"Processing {total_chunks} chunks with up to {max_concurrency} concurrent requests"
+            )
+            with ThreadPoolExecutor(
+                max_workers=min(max_concurrency, total_chunks)
+            ) as executor:
+                # map() yields results in chunk order regardless of completion order
+                chunk_results = list(executor.map(process_chunk, range(total_chunks)))
+        else:
+            chunk_results = [process_chunk(i) for i in range(total_chunks)]
+    except Exception as e:
+        log_exception(logger, e, "Error processing resource chunk")
+        pass  # Continue even if chunk processing fails
+
+    hcl_output = [result for succeeded, result in chunk_results if succeeded]
+    successful_chunks = len(hcl_output)
+
+    logger.info(
+        f"Failback completed: {successful_chunks}/{total_chunks} chunks processed successfully"
+    )
+    return hcl_output
+
+
+def _run_adaptive_batches(
+    chunks: list,
+    locals_str: str,
+    modules_raw: str,
+    token_budget: int,
+    max_concurrency: int,
+    provider: LLMProvider,
+    token_counter: TokenCounter,
+) -> list:
+    """
+    Invoke the provider with batches of serialized resources packed under a token budget (internal function)
+    The budget covers the whole request, including the system prompt, modules
+    and locals sent with every batch, and is capped at the model's input limit.
+    A batch is halved when the request is too large or the response is unusable,
+    and the batch size is allowed to double again after each successful request.
+    With max_concurrency above 1, the packed batches are sent concurrently and
+    share the learned batch size.
+
+    Returns:
+        list: Validated outputs of the successful batches, in resource order
+    """
+    total = len(chunks)
+    token_limit = provider.input_token_limit
+    if token_limit is not None and token_limit < token_budget:
+        logger.debug(f"Capping the batch token budget at the {token_limit} token limit")
+        token_budget = token_limit
+    # Sent with every batch: system prompt, modules, tool definition and locals
+    base_tokens = provider.estimate_request_tokens(f"{locals_str}\n\n", modules_raw)
+    resource_tokens = [token_counter(chunk) for chunk in chunks]
+
+    batches = []
+    start = 0
+    while start < total:
+        # Always send at least one resource, even if it alone exceeds the budget
+        end = start + 1
+        used = base_tokens + resource_tokens[start]
+        while end < total and used + resource_tokens[end] <= token_budget:
+            used += resource_tokens[end]
+            end += 1
+        batches.append((start, end))
+        start = end
+
+    lock = threading.Lock()
+    max_items = total
+    requests = 0
+
+    def process_batch(bounds: tuple[int, int]) -> list:
+        nonlocal max_items, requests
+        start, end = bounds
+        # Halved on this batch's own failures, so a retry is always smaller
+        batch_max_items = end - start
+        outputs = []
+        while start < end:
+            with lock:
+                stop = min(end, start + min(max_items, batch_max_items))
+                requests += 1
+            batch = chunks[start:stop]
+            payload = "\n".join(batch)
+            label = f"resources {start + 1}-{stop}/{total}"
+            try:
+                partial_output = provider.invoke_single(
+                    f"{locals_str}\n{payload}\n",
+                    modules_raw,
+                    cache_prefix=f"{locals_str}\n",
+                )
+                outputs.append(
+                    validate_output_json(partial_output, provider.output_schema)
+                )
+                used = base_tokens + sum(resource_tokens[start:stop])
+                logger.debug(
+                    f"Batch of {label} processed successfully (~{used} tokens)"
+                )
+                start = stop
+                batch_max_items *= 2
+                with lock:
+                    max_items = min(max_items * 2, total)
+            except (
+                PayloadTooLargeError,
+                json.JSONDecodeError,
+                jsonschema.ValidationError,
+            ) as e:
+                if len(batch) > 1:
+                    batch_max_items = len(batch) // 2
+                    with lock:
+                        max_items = min(max_items, batch_max_items)
+                    logger.info(
+                        f"Batch of {label} failed ({type(e).__name__}), retrying with {batch_max_items} resources"
+                    )
+                    continue
+                log_exception(logger, e, f"Error processing {label}")
+                logger.warning(f"Skipping {label} and continuing with next batch")
+                start = stop
+            except Exception as e:
+                # Failback core philosophy: pass processing for continuity
+                log_exception(logger, e, f"Error processing {label}")
+                logger.warning(f"Skipping {label} and continuing with next batch")
+                start = stop
+        return outputs
+
+    if max_concurrency > 1 and len(batches) > 1:
+        logger.info(
+            f"Processing {len(batches)} batches with up to {max_concurrency} concurrent requests"
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(batches))
+        ) as executor:
+            # map() yields results in batch order regardless of completion order
+            batch_outputs = list(executor.map(process_batch, batches))
+    else:
+        batch_outputs = [process_batch(bounds) for bounds in batches]
+
+    logger.info(
+        f"Adaptive failback completed: {total} resources sent in {requests} requests"
+    )
+    return [output for outputs in batch_outputs for output in outputs]
+
+
 def _execute_failback_strategy(
     resource_dict: dict,
     locals_str: str,
@@ -23,6 +307,7 @@ def _execute_failback_strategy(
     config: dict,
     system_config: dict,
     provider: LLMProvider,
+    token_counter: TokenCounter = estimate_tokens,
 ) -> list:
     """
     Execute failback strategy with chunk processing (internal function)
@@ -45,36 +330,26 @@ def _execute_failback_strategy(
             config["input"]["failback"]["options"]["target"]
         ]
 
-    # Process chunks with failback strategy
-    hcl_output = []
-    successful_chunks = 0
-    total_chunks = len(resources)
+    prompt_format = config["input"].get("prompt_format", DEFAULT_PROMPT_FORMAT)
+    chunks = [serialize_hcl(resource, prompt_format) for resource in resources]
 
-    try:
-        for i, resource in enumerate(resources):
-            try:
-                combined_str = f"{locals_str}\n{resource}\n"
-                partial_output = provider.invoke_single(combined_str, modules_raw)
-                validated_partial = validate_output_json(
-                    partial_output, provider.output_schema
-                )
-                hcl_output.append(validated_partial)
-                successful_chunks += 1
-                logger.debug(f"Chunk {i + 1}/{total_chunks} processed successfully")
-            except Exception as e:
-                # Failback core philosophy: pass processing for continuity
-                log_exception(
-                    logger, e, f"Error processing resource chunk {i + 1}/{total_chunks}"
-                )
-                logger.warning(f"Skipping chunk {i + 1} and continuing with next chunk")
-                pass  # Individual chunk failure should not stop overall processing
-    except Exception as e:
-        log_exception(logger, e, "Error processing resource chunk")
-        pass  # Continue even if chunk processing fails
-
-    logger.info(
-        f"Failback completed: {successful_chunks}/{total_chunks} chunks processed successfully"
-    )
+    failback_options = config["input"]["failback"].get("options", {})
+    token_budget = failback_options.get("batch_token_budget")
+    max_concurrency = failback_options.get("max_concurrency", 1)
+    if token_budget:
+        hcl_output = _run_adaptive_batches(
+            chunks,
+            locals_str,
+            modules_raw,
+            token_budget,
+            max_concurrency,
+            provider,
+            token_counter,
+        )
+    else:
+        hcl_output = _run_chunks(
+            chunks, locals_str, modules_raw, max_concurrency, provider
+        )
 
     # Flatten results (with pass strategy for integration errors)
     flattened_list = []
@@ -92,134 +367,493 @@ def _execute_failback_strategy(
 
 
 def _write_output_files(
-    output_data: dict | list, file_path: str, config: dict, system_config: dict
-) -> None:
+    output_data: dict | list,
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    buffer_output: bool = False,
+    sink: MarkdownSink | None = None,
+) -> str | None:
     """
-    Write JSON and Markdown output files (internal function)
+    Render the validated output to Markdown, writing its JSON only when
+    output.keep_json is set (internal function)
 
     Args:
         output_data: Data to output (dict or list)
+        buffer_output: Return the rendered Markdown section instead of writing it.
+        sink: Run-scoped Markdown writer used instead of appending to the file.
+
+    Returns:
+        str | None: The rendered Markdown section when buffer_output is set
     """
-    # Create output directory
-    ensure_directory_exists(config["output"]["json_path"])
+    tf_extension = system_config["constants"]["file_processing"]["terraform_extension"]
+    md_title = os.path.basename(file_path).replace(tf_extension, "")
+    if config["output"].get("keep_json", False):
+        write_json_output(file_path, output_data, config)
+    if buffer_output:
+        return render_md(md_title, output_data, config)
 
-    # Write JSON output
-    try:
-        # TODO: Need to consider creating a temporary file.
-        with open(config["output"]["json_path"], "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=4)
-            logger.info(
-                f"Successfully wrote JSON output to {config['output']['json_path']}"
-            )
-    except Exception as e:
-        log_exception(logger, e, "Error writing JSON output")
-        raise
+    output_md(md_title, output_data, config, sink)
+    return None
 
-    # Write Markdown output
-    tf_extension = system_config["constants"]["file_processing"]["terraform_extension"]
-    output_md(os.path.basename(file_path).replace(tf_extension, ""), config)
+
+def _parse_hcl(content: str, hcl_cache: HclParseCache | None = None) -> dict:
+    """
+    Parse HCL text, consulting the persistent parse cache when available (internal function)
+    """
+    if hcl_cache is not None:
+        return hcl_cache.load(content, hcl2.loads)
+    return hcl2.loads(content)
 
 
 def _load_and_prepare_hcl_data(
-    file_path: str, config: dict
+    file_path: str,
+    config: dict,
+    shared_inputs: SharedInputs | None = None,
+    hcl_cache: HclParseCache | None = None,
+    resource_dict: dict | None = None,
 ) -> tuple[dict, str, str, str]:
     """
     Load and prepare HCL data from the specified file and local files.
 
+    Args:
+        shared_inputs: Run-scoped preloaded local files and modules file.
+            They are read from disk for this file when omitted.
+        hcl_cache: Persistent cache of parsed HCL consulted before parsing.
+        resource_dict: The file's already parsed HCL (e.g. from the parse
+            stage); the file is read and parsed when omitted.
+
     Returns:
         tuple: (resource_dict, combined_str, modules_raw, locals_str)
     """
-    # Read HCL file and local files, prepare data for processing.
-    locals_str = read_local_files(config["input"]["local_files"])
+    prompt_format = config["input"].get("prompt_format", DEFAULT_PROMPT_FORMAT)
 
-    # read HCL file
-    hcl_raw, _ = read_tf_file(file_path)
-    if hcl_raw is None:
-        logger.warning(f"File not found or empty: {file_path}")
-        raise FileNotFoundError(f"File not found or empty: {file_path}")
+    # read HCL file unless it was already parsed (the source format needs the text)
+    hcl_raw = None
+    if resource_dict is None or prompt_format == "source":
+        hcl_raw, _ = read_tf_file(file_path)
+        if hcl_raw is None:
+            logger.warning(f"File not found or empty: {file_path}")
+            raise FileNotFoundError(f"File not found or empty: {file_path}")
 
     # read modules if enabled
     modules_raw = None
-    if config["input"]["modules"].get("enabled", True):
+    if shared_inputs is not None:
+        modules_raw = shared_inputs.modules_raw()
+    elif config["input"]["modules"].get("enabled", True):
         modules_raw, _ = read_tf_file(config["input"]["modules"]["path"])
 
     # Parse HCL content
-    try:
-        resource_dict = hcl2.loads(hcl_raw)
-    except Exception as e:
-        log_exception(logger, e, f"Error parsing HCL file {file_path}")
-        raise
+    if resource_dict is None:
+        try:
+            resource_dict = _parse_hcl(hcl_raw, hcl_cache)
+        except Exception as e:
+            log_exception(logger, e, f"Error parsing HCL file {file_path}")
+            raise
+    else:
+        logger.debug(f"Using pre-parsed HCL for {file_path}")
+
+    # Read local files, keeping only the locals this file references if enabled
+    if shared_inputs is not None:
+        locals_str = shared_inputs.locals_str(resource_dict)
+    else:
+        prune_for = (
+            resource_dict if config["input"].get("prune_locals", False) else None
+        )
+        locals_str = read_local_files(
+            config["input"]["local_files"],
+            hcl_cache,
+            prompt_format=prompt_format,
+            resource_dict=prune_for,
+        )
 
     # Create combined string
-    combined_str = f"{locals_str}\n ---resource hcl \n {resource_dict}\n"
+    resource_str = serialize_hcl(resource_dict, prompt_format, hcl_raw)
+    combined_str = f"{locals_str}\n ---resource hcl \n {resource_str}\n"
     logger.debug(f"Combined string:\n {combined_str}")
 
     return resource_dict, combined_str, modules_raw, locals_str
 
 
-def run_hcl_file_workflow(file_path: str, config: dict, system_config: dict) -> None:
+def _prepare_workflow(
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    context: "RunContext | None",
+) -> tuple[dict, str, str, str, LLMProvider]:
+    """
+    Load the file's inputs and obtain the provider (internal function)
+
+    Returns:
+        tuple: (resource_dict, combined_str, modules_raw, locals_str, provider)
+    """
+    shared_inputs = None
+    hcl_cache = None
+    parsed = None
+    if context is not None:
+        shared_inputs = context.shared_inputs
+        hcl_cache = context.hcl_cache
+        parsed = context.parsed_resources.pop(file_path, None)
+    resource_dict, combined_str, modules_raw, locals_str = _load_and_prepare_hcl_data(
+        file_path, config, shared_inputs, hcl_cache, parsed
+    )
+    shard_by = config["output"].get("shard_by", "none")
+    if context is not None and shard_by != "none":
+        # Recorded while the parsed file is at hand, for the sharded output
+        context.shard_keys[file_path] = get_shard_key(
+            file_path,
+            shard_by,
+            system_config,
+            config["input"]["resource_data"].get("folder"),
+            resource_dict,
+        )
+
+    # Obtain provider instance (shared across the run when a context is given)
+    if context is not None:
+        provider = context.provider
+    else:
+        provider = create_llm_provider(config, system_config)
+    return resource_dict, combined_str, modules_raw, locals_str, provider
+
+
+def _validate_main_output(output_str: str, provider: LLMProvider) -> dict | list:
+    """
+    Validate the response to the whole-file request (internal function)
+
+    Raises:
+        PayloadTooLargeError: If the response is empty, to trigger failback.
+    """
+    validated_output = validate_output_json(output_str, provider.output_schema)
+
+    # Check if result is empty or insufficient, which indicates need for failback
+    if isinstance(validated_output, list) and len(validated_output) == 0:
+        logger.warning("API returned empty result, triggering failback strategy...")
+        # Use PayloadTooLargeError for consistent trigger
+        raise PayloadTooLargeError(
+            "Empty result or insufficient response, treating as payload issue for failback."
+        )
+    return validated_output
+
+
+def _salvage_main_output(
+    error: Exception,
+    output_str: str | None,
+    combined_str: str,
+    modules_raw: str,
+    locals_str: str,
+    provider: LLMProvider,
+) -> list:
+    """
+    Keep the valid items of a rejected whole-file response and request only
+    the missing or invalid ones, instead of reprocessing every chunk (internal function)
+
+    Args:
+        error (Exception): Why the response was rejected. A PartialOutputError
+            carries the items received before the response was abandoned.
+        output_str (str | None): The rejected response, None when none was returned.
+    Returns:
+        list: The salvaged items followed by the requested ones, validated.
+    Raises:
+        Exception: The original error when no item can be salvaged or the
+            re-request fails, to trigger failback.
+    """
+    if isinstance(error, PartialOutputError):
+        items, issues = error.items, error.issues
+    elif output_str is not None:
+        items, issues = salvage_output_items(output_str, provider.output_schema)
+    else:
+        items, issues = [], []
+    if not items:
+        raise error
+    logger.warning(
+        f"Salvaged {len(items)} valid items ({len(issues)} issues), "
+        "requesting only the missing items"
+    )
+    try:
+        remaining_str = provider.invoke_remaining(
+            combined_str, modules_raw, items, issues, cache_prefix=f"{locals_str}\n"
+        )
+        remaining = json.loads(remaining_str)
+        if not isinstance(remaining, list):
+            raise jsonschema.ValidationError(
+                "Re-request did not return an array of items"
+            )
+        validated_output = items + remaining
+        validate_json_schema(validated_output, provider.output_schema)
+    except Exception as e:
+        logger.warning(f"Re-request of the missing items failed: {e}")
+        raise error from e
+    logger.info(f"Recovered output with {len(remaining)} re-requested items")
+    return validated_output
+
+
+def _recover_with_failback(
+    error: Exception,
+    resource_dict: dict,
+    locals_str: str,
+    modules_raw: str,
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    provider: LLMProvider,
+    buffer_output: bool,
+    sink: MarkdownSink | None = None,
+) -> str | None:
+    """
+    Handle a failed whole-file request by processing the file in chunks (internal function)
+
+    Raises:
+        Exception: The original error when failback is disabled in debug mode.
+    """
+    logger.error(
+        f"Error (payload size, malformed JSON, or schema validation) - retrying in chunks: {error}"
+    )
+
+    if config["input"]["failback"]["enabled"]:
+        # 4. Execute failback strategy
+        flattened_list = _execute_failback_strategy(
+            resource_dict,
+            locals_str,
+            modules_raw,
+            config,
+            system_config,
+            provider,
+        )  # Pass provider
+        return _write_output_files(
+            flattened_list, file_path, config, system_config, buffer_output, sink
+        )
+    else:
+        logger.error("Failback is not enabled, skipping chunk processing.")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return None
+        else:
+            raise error
+
+
+def run_hcl_file_workflow(
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    buffer_output: bool = False,
+    context: "RunContext | None" = None,
+) -> str | None:
     """
     Process a hcl file and generate a JSON output.
     Args:
         file_path (str): Path to the hcl file.
         config (dict): Configuration for processing.
         system_config (dict): System configuration.
+        buffer_output (bool): Return the rendered Markdown section instead of
+            appending it to the Markdown file (used for concurrent processing).
+            Sections are appended through the context's markdown_sink when set.
+        context (RunContext | None): Run-scoped context providing the shared
+            LLM provider and preloaded inputs. A provider is created and the
+            inputs are read for this file when omitted.
+    Returns:
+        str | None: The rendered Markdown section when buffer_output is set.
     Raises:
         FileNotFoundError: If the hcl file does not exist or is empty.
         ValueError: If the hcl file cannot be parsed.
     """
     with measure_time(f"HCL file processing: {os.path.basename(file_path)}", logger):
-        resource_dict, combined_str, modules_raw, locals_str = (
-            _load_and_prepare_hcl_data(file_path, config)
+        resource_dict, combined_str, modules_raw, locals_str, provider = (
+            _prepare_workflow(file_path, config, system_config, context)
         )
-
-        # Obtain provider instance
-        provider = create_llm_provider(config, system_config)
+        sink = context.markdown_sink if context is not None else None
 
         try:
             # 2. Main API processing using provider
-            output_str = provider.invoke_single(combined_str, modules_raw)
-            validated_output = validate_output_json(output_str, provider.output_schema)
-
-            # Check if result is empty or insufficient, which indicates need for failback
-            if isinstance(validated_output, list) and len(validated_output) == 0:
-                logger.warning(
-                    "API returned empty result, triggering failback strategy..."
+            output_str = None
+            try:
+                output_str = provider.invoke_single(
+                    combined_str, modules_raw, cache_prefix=f"{locals_str}\n"
                 )
-                # Use PayloadTooLargeError for consistent trigger
-                raise PayloadTooLargeError(
-                    "Empty result or insufficient response, treating as payload issue for failback."
+                validated_output = _validate_main_output(output_str, provider)
+            except (json.decoder.JSONDecodeError, jsonschema.ValidationError) as e:
+                validated_output = _salvage_main_output(
+                    e, output_str, combined_str, modules_raw, locals_str, provider
                 )
 
             # 3. Output processing
-            _write_output_files(validated_output, file_path, config, system_config)
+            section = _write_output_files(
+                validated_output,
+                file_path,
+                config,
+                system_config,
+                buffer_output,
+                sink,
+            )
             logger.info(f"Successfully processed file: {file_path}")
+            return section
         except (
             PayloadTooLargeError,
             json.decoder.JSONDecodeError,
             jsonschema.ValidationError,
         ) as e:
-            logger.error(
-                f"Error (payload size, malformed JSON, or schema validation) - retrying in chunks: {e}"
+            return _recover_with_failback(
+                e,
+                resource_dict,
+                locals_str,
+                modules_raw,
+                file_path,
+                config,
+                system_config,
+                provider,
+                buffer_output,
+                sink,
             )
 
-            if config["input"]["failback"]["enabled"]:
-                # 4. Execute failback strategy
-                flattened_list = _execute_failback_strategy(
-                    resource_dict,
-                    locals_str,
+
+async def arun_hcl_file_workflow(
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    buffer_output: bool = True,
+    context: "RunContext | None" = None,
+) -> str | None:
+    """
+    Asynchronous variant of run_hcl_file_workflow for the asyncio pipeline.
+    The whole-file request is awaited through the provider's ainvoke_single;
+    reading and parsing the file, writing the output and the failback path,
+    which issues many dependent requests, run in worker threads with the
+    synchronous implementation so that the event loop is never blocked.
+    Args:
+        file_path (str): Path to the hcl file.
+        config (dict): Configuration for processing.
+        system_config (dict): System configuration.
+        buffer_output (bool): Return the rendered Markdown section instead of
+            appending it to the Markdown file.
+        context (RunContext | None): Run-scoped context (see run_hcl_file_workflow).
+    Returns:
+        str | None: The rendered Markdown section when buffer_output is set.
+    """
+    with measure_time(f"HCL file processing: {os.path.basename(file_path)}", logger):
+        prepared = await asyncio.to_thread(
+            _prepare_workflow, file_path, config, system_config, context
+        )
+        resource_dict, combined_str, modules_raw, locals_str, provider = prepared
+        sink = context.markdown_sink if context is not None else None
+
+        try:
+            output_str = None
+            try:
+                output_str = await provider.ainvoke_single(
+                    combined_str, modules_raw, cache_prefix=f"{locals_str}\n"
+                )
+                validated_output = _validate_main_output(output_str, provider)
+            except (json.decoder.JSONDecodeError, jsonschema.ValidationError) as e:
+                validated_output = await asyncio.to_thread(
+                    _salvage_main_output,
+                    e,
+                    output_str,
+                    combined_str,
                     modules_raw,
-                    config,
-                    system_config,
+                    locals_str,
                     provider,
-                )  # Pass provider
-                _write_output_files(flattened_list, file_path, config, system_config)
-            else:
-                logger.error("Failback is not enabled, skipping chunk processing.")
-                if not logger.isEnabledFor(logging.DEBUG):
-                    return
-                else:
-                    raise
+                )
+            section = await asyncio.to_thread(
+                _write_output_files,
+                validated_output,
+                file_path,
+                config,
+                system_config,
+                buffer_output,
+                sink,
+            )
+            logger.info(f"Successfully processed file: {file_path}")
+            return section
+        except (
+            PayloadTooLargeError,
+            json.decoder.JSONDecodeError,
+            jsonschema.ValidationError,
+        ) as e:
+            return await asyncio.to_thread(
+                _recover_with_failback,
+                e,
+                resource_dict,
+                locals_str,
+                modules_raw,
+                file_path,
+                config,
+                system_config,
+                provider,
+                buffer_output,
+                sink,
+            )
+
+
+def prepare_batch_record(
+    file_path: str,
+    config: dict,
+    system_config: dict,
+    context: "RunContext | None" = None,
+) -> dict:
+    """
+    Build the batch inference modelInput of a file's whole-file request.
+    Args:
+        file_path (str): Path to the hcl file.
+        config (dict): Configuration for processing.
+        system_config (dict): System configuration.
+        context (RunContext | None): Run-scoped context (see run_hcl_file_workflow).
+    Returns:
+        dict: The modelInput of the batch record.
+    Raises:
+        PayloadTooLargeError: If the request is too large to send in one piece.
+    """
+    _, combined_str, modules_raw, _, provider = _prepare_workflow(
+        file_path, config, system_config, context
+    )
+    return provider.build_batch_model_input(combined_str, modules_raw)
+
+
+def complete_batch_record(
+    file_path: str,
+    model_output: dict,
+    config: dict,
+    system_config: dict,
+    context: "RunContext | None" = None,
+) -> str | None:
+    """
+    Validate a batch inference result and render the file's Markdown section.
+    Args:
+        file_path (str): Path to the hcl file.
+        model_output (dict): The modelOutput of the file's batch record.
+        config (dict): Configuration for processing.
+        system_config (dict): System configuration.
+        context (RunContext | None): Run-scoped context (see run_hcl_file_workflow).
+    Returns:
+        str | None: The rendered Markdown section.
+    Raises:
+        PayloadTooLargeError: If the result is empty.
+        json.JSONDecodeError: If the result is not valid JSON.
+        jsonschema.ValidationError: If the result does not match the output schema.
+    """
+    if context is not None:
+        provider = context.provider
+    else:
+        provider = create_llm_provider(config, system_config)
+    output_str = provider.parse_batch_output(model_output)
+    validated_output = _validate_main_output(output_str, provider)
+    section = _write_output_files(
+        validated_output, file_path, config, system_config, buffer_output=True
+    )
+    logger.info(f"Successfully processed file from batch output: {file_path}")
+    return section
+
+
+def parse_hcl_file(file_path: str, cache_dir: str | None = None) -> dict:
+    """
+    Read and parse a HCL file.
+    Defined at module level so it can run in a process pool worker.
+    Args:
+        file_path (str): Path to the HCL file.
+        cache_dir (str | None): Cache directory of the persistent parse cache.
+    Returns:
+        dict: The parsed HCL.
+    """
+    content, _ = read_tf_file(file_path)
+    hcl_cache = HclParseCache(cache_dir) if cache_dir else None
+    return _parse_hcl(content, hcl_cache)
 
 
 def read_tf_file(file_path: str) -> tuple[str, str]:
@@ -245,19 +879,25 @@ def read_tf_file(file_path: str) -> tuple[str, str]:
     raise FileNotFoundError(f"File not found: {file_path}")
 
 
-def read_local_files(local_files: list) -> str:
+def load_local_files(
+    local_files: list,
+    hcl_cache: HclParseCache | None = None,
+    preparsed: dict | None = None,
+) -> list:
     """
-    Read local files and return their content.
+    Read and parse local files.
     Args:
         local_files (list): List of local files to read.
+        hcl_cache (HclParseCache | None): Persistent cache of parsed HCL.
+        preparsed (dict | None): Already parsed local files keyed by path.
     Returns:
-        str: Content of the local files.
+        list: (env, parsed, content) tuples in configuration order.
     Raises:
         FileNotFoundError: If any local file does not exist.
     """
     if not local_files:
         logger.debug("No local files to read")
-        return ""
+        return []
 
     with measure_time(f"reading {len(local_files)} local files", logger):
         result = []
@@ -273,14 +913,73 @@ def read_local_files(local_files: list) -> str:
                             logger.debug(
                                 f"Local file {os.path.basename(path)}: {file_size_kb:.2f} KB"
                             )
-                            result.append(f"{env}\n---\n{hcl2.loads(content)}\n")
+                            if preparsed is not None and path in preparsed:
+                                parsed = preparsed[path]
+                            else:
+                                parsed = _parse_hcl(content, hcl_cache)
+                            result.append((env, parsed, content))
                     except Exception as e:
                         log_exception(logger, e, f"Error reading local file {path}")
                         raise
                 else:
                     raise FileNotFoundError(f"Local file not found: {path}")
         logger.debug(f"Total local files size: {total_size_kb:.2f} KB")
-        return "\n".join(result)
+        return result
+
+
+def format_local_files(
+    entries: list,
+    prompt_format: str = DEFAULT_PROMPT_FORMAT,
+    resource_dict: dict | None = None,
+) -> str:
+    """
+    Serialize loaded local files for the prompt.
+    Args:
+        entries (list): (env, parsed, content) tuples from load_local_files.
+        prompt_format (str): Serialization of the parsed files (see prompt_serializer).
+        resource_dict (dict | None): Parsed target file. When given, only the
+            locals it references are kept, falling back to all locals if a
+            reference cannot be resolved.
+    Returns:
+        str: Content of the local files.
+    """
+    parsed_files = [parsed for _, parsed, _ in entries]
+    sources = [content for _, _, content in entries]
+    if resource_dict is not None:
+        pruned = prune_local_files(parsed_files, resource_dict)
+        if pruned is not None:
+            parsed_files = pruned
+            # The original text no longer matches the pruned locals
+            sources = [None] * len(entries)
+
+    return "\n".join(
+        f"{env}\n---\n{serialize_hcl(parsed, prompt_format, source)}\n"
+        for (env, _, _), parsed, source in zip(entries, parsed_files, sources)
+    )
+
+
+def read_local_files(
+    local_files: list,
+    hcl_cache: HclParseCache | None = None,
+    preparsed: dict | None = None,
+    prompt_format: str = DEFAULT_PROMPT_FORMAT,
+    resource_dict: dict | None = None,
+) -> str:
+    """
+    Read local files and return their content.
+    Args:
+        local_files (list): List of local files to read.
+        hcl_cache (HclParseCache | None): Persistent cache of parsed HCL.
+        preparsed (dict | None): Already parsed local files keyed by path.
+        prompt_format (str): Serialization of the parsed files (see prompt_serializer).
+        resource_dict (dict | None): Parsed target file used to prune unreferenced locals.
+    Returns:
+        str: Content of the local files.
+    Raises:
+        FileNotFoundError: If any local file does not exist.
+    """
+    entries = load_local_files(local_files, hcl_cache, preparsed)
+    return format_local_files(entries, prompt_format, resource_dict)
 
 
 def get_modules_name(resource_dict: dict, search_resource: str = None) -> str:
@@ -298,3 +997,38 @@ def get_modules_name(resource_dict: dict, search_resource: str = None) -> str:
             logger.info(f"resource_name: {resource_name}")
             return resource_name
     raise ValueError("No module name found in hcl_dict")
+
+
+def get_shard_key(
+    file_path: str,
+    shard_by: str,
+    system_config: dict,
+    base_dir: str | None = None,
+    resource_dict: dict | None = None,
+) -> str:
+    """
+    Name of the Markdown shard (output.shard_by) a file's section belongs to.
+    Files without a module name are sharded by directory.
+    Args:
+        file_path (str): Path to the HCL file.
+        shard_by (str): "module" or "directory".
+        system_config (dict): System configuration.
+        base_dir (str | None): Directory that directory shards are named relative to.
+        resource_dict (dict | None): The file's parsed HCL, needed to shard by
+            module. The file is not parsed again when it is omitted.
+    Returns:
+        str: The module name, or the file's directory.
+    """
+    if shard_by == "module" and resource_dict is not None:
+        search_resource = system_config["constants"]["file_processing"][
+            "default_search_resource"
+        ]
+        try:
+            return get_modules_name(resource_dict, search_resource).strip('"')
+        except ValueError as e:
+            logger.debug(f"Sharding {file_path} by directory: {e}")
+
+    directory = os.path.dirname(file_path) or "."
+    if base_dir:
+        directory = os.path.relpath(directory, base_dir)
+    return os.path.normpath(directory).replace(os.sep, "/")
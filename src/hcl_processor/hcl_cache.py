@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from importlib.metadata import PackageNotFoundError, version
+
+from .logger_config import get_logger
+
+logger = get_logger("hcl_cache")
+
+
+def get_hcl2_version() -> str:
+    """
+    Returns the installed python-hcl2 version, used to namespace cached parse results.
+    """
+    try:
+        return version("python-hcl2")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class HclParseCache:
+    """
+    Persistent cache mapping the SHA-256 of HCL source text to the dict
+    produced by python-hcl2. Results are stored as compact JSON files under
+    a directory versioned by the python-hcl2 version, so upgrading the parser
+    never serves stale results.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.directory = os.path.join(
+            cache_dir, "hcl", f"python-hcl2-{get_hcl2_version()}"
+        )
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def load(self, content: str, parser: Callable[[str], dict]) -> dict:
+        """
+        Return the parsed form of content, calling parser only on a cache miss.
+        Args:
+            content (str): HCL source text.
+            parser (Callable[[str], dict]): Parser used on a miss (e.g. hcl2.loads).
+        Returns:
+            dict: The parsed HCL.
+        """
+        key = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                parsed = json.load(f)
+            logger.debug(f"Parsed HCL cache hit: {key[:12]}")
+            return parsed
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(
+                f"Ignoring unreadable parsed HCL cache entry {key[:12]}: {e}"
+            )
+
+        parsed = parser(content)
+        self._store(entry_path, parsed)
+        return parsed
+
+    def _store(self, entry_path: str, parsed: dict) -> None:
+        """
+        Atomically write a cache entry (internal function)
+        Failures are logged and ignored: the cache is an optimization only.
+        """
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(entry_path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(parsed, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not store parsed HCL cache entry: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,105 @@
+import json
+
+from .logger_config import get_logger
+
+logger = get_logger("json_stream")
+
+_OPENING = {"{": "}", "[": "]"}
+_WHITESPACE = " \t\r\n"
+
+
+class ArrayItemStream:
+    """
+    Incremental scanner of a JSON document arriving in chunks, yielding the
+    text of each element of its outermost array as soon as the element is
+    complete, e.g. the items of {"data": [...]} while the tool input is
+    still being streamed. The scanner only tracks nesting and strings; the
+    yielded elements are left to json.loads.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        # Nesting depth of the outermost array, once it has been opened
+        self._array_depth = None
+        self._item_start = None
+        self.finished = False
+
+    @property
+    def text(self) -> str:
+        """
+        The document received so far.
+        """
+        return self._text
+
+    def feed(self, chunk: str) -> list:
+        """
+        Scan the next chunk of the document.
+
+        Args:
+            chunk (str): Next part of the document
+
+        Returns:
+            list: Text of the array elements completed by this chunk
+        """
+        self._text += chunk
+        items = []
+        text = self._text
+        for position in range(self._position, len(text)):
+            char = text[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            at_item_level = (
+                self._array_depth is not None
+                and not self.finished
+                and len(self._stack) == self._array_depth
+            )
+            if at_item_level and char in ",]":
+                if self._item_start is not None:
+                    items.append(text[self._item_start : position].strip())
+                    self._item_start = None
+            elif at_item_level and self._item_start is None and char not in _WHITESPACE:
+                self._item_start = position
+
+            if char == '"':
+                self._in_string = True
+            elif char in _OPENING:
+                self._stack.append(_OPENING[char])
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack)
+            elif self._stack and char == self._stack[-1]:
+                if char == "]" and len(self._stack) == self._array_depth:
+                    self.finished = True
+                self._stack.pop()
+        self._position = len(text)
+        return items
+
+
+def salvage_array_items(text: str) -> list:
+    """
+    Parse the complete elements of the outermost array of a JSON document
+    that may be truncated or malformed after them.
+
+    Args:
+        text (str): The JSON document
+
+    Returns:
+        list: The elements preceding the first incomplete or unparsable one
+    """
+    items = []
+    for item in ArrayItemStream().feed(text):
+        try:
+            items.append(json.loads(item))
+        except json.JSONDecodeError:
+            break
+    return items
@@ -1,13 +1,44 @@
+import asyncio
+import json
 import logging
 from abc import ABC, abstractmethod
 
+import jsonschema
+
+from .token_estimator import estimate_tokens
+
 logger = logging.getLogger(__name__)
 
+# Appended to the prompt to request only the items missing from a partial answer
+REMAINING_ITEMS_PROMPT = """
+
+A previous answer to this request produced these valid items:
+{items}
+It was rejected because of:
+{issues}
+Return only the items that are missing from the valid items above, with the
+invalid ones corrected. Do not repeat the valid items."""
+
 
 class PayloadTooLargeError(Exception):
     """Custom exception for when the payload to the LLM is too large."""
 
-    pass
+
+class PartialOutputError(jsonschema.ValidationError):
+    """
+    Raised when a response is abandoned part way, e.g. at the first invalid
+    item of a streamed output. Being a ValidationError, it triggers failback
+    wherever an invalid response does.
+
+    Attributes:
+        items (list): The valid items received before the response was abandoned.
+        issues (list): Why it was abandoned, one message per problem.
+    """
+
+    def __init__(self, message: str, items: list, issues: list):
+        super().__init__(message)
+        self.items = items
+        self.issues = issues
 
 
 class LLMProvider(ABC):
@@ -20,16 +51,90 @@ class LLMProvider(ABC):
         self.system_config = system_config
 
     @abstractmethod
-    def invoke_single(self, prompt: str, modules_data: str | None) -> str:
+    def invoke_single(
+        self, prompt: str, modules_data: str | None, cache_prefix: str | None = None
+    ) -> str:
         """
         Performs a single API call to the specific LLM provider.
         This method must be implemented by concrete provider classes.
         It should raise PayloadTooLargeError if the input size is the cause of failure.
+        cache_prefix, when given, is the leading part of prompt that other
+        requests of the run share; providers supporting prompt caching may
+        cache it.
 
         Returns:
             str: The raw JSON string response from the LLM.
         """
-        pass
+
+    async def ainvoke_single(
+        self, prompt: str, modules_data: str | None, cache_prefix: str | None = None
+    ) -> str:
+        """
+        Asynchronous variant of invoke_single.
+        The default implementation runs invoke_single in a worker thread of
+        the event loop's default executor; providers with a native async
+        client can override it.
+
+        Returns:
+            str: The raw JSON string response from the LLM.
+        """
+        return await asyncio.to_thread(
+            self.invoke_single, prompt, modules_data, cache_prefix
+        )
+
+    def invoke_remaining(
+        self,
+        prompt: str,
+        modules_data: str | None,
+        items: list,
+        issues: list,
+        cache_prefix: str | None = None,
+    ) -> str:
+        """
+        Requests only the items missing from a partial answer to prompt: the
+        valid items already salvaged are sent along with the issues of the
+        rejected answer. The default implementation appends them to the prompt;
+        providers may present them as part of the conversation instead.
+
+        Args:
+            items (list): The valid items of the rejected answer.
+            issues (list): Why the answer was rejected, one message per problem.
+
+        Returns:
+            str: The raw JSON string of the remaining items.
+        """
+        return self.invoke_single(
+            prompt
+            + REMAINING_ITEMS_PROMPT.format(
+                items=json.dumps(items, ensure_ascii=False),
+                issues="\n".join(f"- {issue}" for issue in issues),
+            ),
+            modules_data,
+            cache_prefix,
+        )
+
+    def estimate_request_tokens(self, prompt: str, modules_data: str | None) -> int:
+        """
+        Estimate the input tokens of a request for prompt, including what the
+        provider sends along with it. The default implementation counts the
+        prompt and modules data; providers add their system prompt and tools.
+
+        Returns:
+            int: Estimated input token count.
+        """
+        return estimate_tokens(prompt) + estimate_tokens(modules_data)
+
+    @property
+    def input_token_limit(self) -> int | None:
+        """
+        Returns the input token limit of the model, or None if it is unknown.
+        """
+        return None
+
+    def close(self) -> None:
+        """
+        Release provider resources and report usage at the end of a run.
+        """
 
     @property
     @abstractmethod
@@ -37,4 +142,3 @@ class LLMProvider(ABC):
         """
         Returns the output JSON schema for the provider.
         """
-        pass
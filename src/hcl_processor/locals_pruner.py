@@ -0,0 +1,121 @@
+import re
+
+from .logger_config import get_logger
+
+logger = get_logger("locals_pruner")
+
+_REFERENCE_RE = re.compile(r"\b(local|var)\.([A-Za-z_][A-Za-z0-9_-]*)")
+
+
+def find_references(obj) -> set:
+    """
+    Collect the local.X and var.X references of a parsed HCL fragment.
+
+    Args:
+        obj: python-hcl2 output, or a fragment of it
+
+    Returns:
+        set: (kind, name) tuples, kind being "local" or "var"
+    """
+    references = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str):
+            references.update(_REFERENCE_RE.findall(item))
+    return references
+
+
+def _unquote_label(label: str) -> str:
+    """
+    Block labels are kept quoted by python-hcl2 (internal function)
+    """
+    return label.strip('"')
+
+
+def _definitions(parsed: dict) -> tuple[dict, dict]:
+    """
+    Index the locals and variables defined by a parsed file (internal function)
+
+    Returns:
+        tuple: ({local name: value}, {variable name: (label, body)})
+    """
+    local_values = {}
+    for block in parsed.get("locals", []):
+        for key, value in block.items():
+            if not key.startswith("__"):
+                local_values[key] = value
+    variables = {}
+    for block in parsed.get("variable", []):
+        for label, body in block.items():
+            variables[_unquote_label(label)] = (label, body)
+    return local_values, variables
+
+
+def _prune_file(parsed: dict, references: set) -> dict:
+    """
+    Keep the locals and variables of one file reachable from references (internal function)
+    """
+    local_values, variables = _definitions(parsed)
+
+    reachable = set()
+    pending = list(references)
+    while pending:
+        reference = pending.pop()
+        if reference in reachable:
+            continue
+        reachable.add(reference)
+        kind, name = reference
+        if kind == "local" and name in local_values:
+            pending.extend(find_references(local_values[name]) - reachable)
+
+    pruned = {
+        key: value for key, value in parsed.items() if key not in ("locals", "variable")
+    }
+    kept_locals = {
+        name: value
+        for name, value in local_values.items()
+        if ("local", name) in reachable
+    }
+    if kept_locals:
+        pruned["locals"] = [{**kept_locals, "__is_block__": True}]
+    kept_variables = [
+        {label: body}
+        for name, (label, body) in variables.items()
+        if ("var", name) in reachable
+    ]
+    if kept_variables:
+        pruned["variable"] = kept_variables
+    return pruned
+
+
+def prune_local_files(parsed_files: list, resource) -> list | None:
+    """
+    Reduce each parsed local file to the locals and variables the resource
+    needs, following references between locals.
+
+    Args:
+        parsed_files (list): python-hcl2 output of each local file
+        resource: python-hcl2 output of the target file
+
+    Returns:
+        list | None: The pruned files in the same order, or None when a
+            referenced local is not defined in any file and the full
+            locals should be sent instead
+    """
+    references = find_references(resource)
+    defined = set()
+    for parsed in parsed_files:
+        defined.update(_definitions(parsed)[0])
+    missing = {name for kind, name in references if kind == "local"} - defined
+    if missing:
+        logger.info(
+            f"Locals not found in local files, sending all locals: {sorted(missing)}"
+        )
+        return None
+    return [_prune_file(parsed, references) for parsed in parsed_files]
@@ -1,14 +1,409 @@
+import asyncio
 import logging
 import os
 import sys
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 
 from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
 
+from .batch_backend import BatchJobError, create_batch_backend
 from .cli import parse_args
 from .config_loader import load_config, load_system_config
-from .file_processor import run_hcl_file_workflow
+from .file_processor import (
+    arun_hcl_file_workflow,
+    complete_batch_record,
+    get_shard_key,
+    parse_hcl_file,
+    prepare_batch_record,
+    run_hcl_file_workflow,
+)
 from .logger_config import log_exception, setup_logger
-from .utils import reset_markdown_file
+from .manifest import RunManifest, compute_inputs_hash, get_manifest_path
+from .output_writer import MarkdownSink, ShardedMarkdownSink, get_shard_dir
+from .run_context import RunContext
+
+
+def _isolated(
+    call: Callable[[], object],
+    logger: logging.Logger,
+    message: str,
+    level: int = logging.ERROR,
+) -> tuple[bool, object]:
+    """
+    Run one file's step, logging its failure instead of letting it stop the
+    other files of the run.
+    Returns:
+        tuple: (succeeded, result), with None as the result of a failed step.
+    """
+    try:
+        return True, call()
+    except Exception as e:
+        log_exception(logger, e, message, level)
+        return False, None
+
+
+def _process_files(
+    file_paths: list,
+    config: dict,
+    system_config: dict,
+    jobs: int,
+    logger: logging.Logger,
+    context: RunContext | None = None,
+    buffer_output: bool = False,
+    parse_jobs: int = 1,
+    use_async: bool = False,
+    use_batch: bool = False,
+) -> list:
+    """
+    Run the HCL workflow for every file, isolating per-file failures.
+    With more than one job, files are processed on a thread pool and their
+    Markdown sections are always buffered. With more than one parse job,
+    files are parsed ahead of time in a process pool. With use_async, files
+    are driven from an asyncio event loop instead. With use_batch, the
+    whole-file requests are sent as one batch inference job.
+    Returns:
+        list: The rendered section per file, in the given order (None for
+        failed files or when sections are written directly).
+    """
+    if use_batch and context is not None:
+        return _process_files_batch(
+            file_paths, config, system_config, jobs, logger, context
+        )
+
+    if use_async and context is not None:
+        return asyncio.run(
+            _process_files_async(
+                file_paths, config, system_config, jobs, logger, context
+            )
+        )
+
+    if parse_jobs > 1 and context is not None:
+        return _process_files_pipelined(
+            file_paths, config, system_config, jobs, parse_jobs, logger, context
+        )
+
+    if jobs <= 1:
+        sections = []
+        for file_path in file_paths:
+            _, section = _isolated(
+                partial(
+                    run_hcl_file_workflow,
+                    file_path,
+                    config,
+                    system_config,
+                    buffer_output=buffer_output,
+                    context=context,
+                ),
+                logger,
+                f"Failed processing file {file_path}",
+            )
+            sections.append(section)
+        return sections
+
+    logger.info(f"Processing {len(file_paths)} files with {jobs} workers")
+    sections = [None] * len(file_paths)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                run_hcl_file_workflow,
+                file_path,
+                config,
+                system_config,
+                buffer_output=True,
+                context=context,
+            ): index
+            for index, file_path in enumerate(file_paths)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            _, sections[index] = _isolated(
+                future.result, logger, f"Failed processing file {file_paths[index]}"
+            )
+    return sections
+
+
+def _process_files_pipelined(
+    file_paths: list,
+    config: dict,
+    system_config: dict,
+    jobs: int,
+    parse_jobs: int,
+    logger: logging.Logger,
+    context: RunContext,
+) -> list:
+    """
+    Two-stage pipeline: python-hcl2 parsing is pure Python and bound by the
+    GIL, so files (and local files) are parsed in a process pool, and each
+    file is handed to the LLM stage thread pool as soon as its parse completes.
+    Parse failures are left to the workflow, which parses the file again and
+    reports the error for that file.
+    Returns:
+        list: The rendered section per file, in the given order.
+    """
+    logger.info(
+        f"Parsing {len(file_paths)} files with {parse_jobs} processes, "
+        f"processing with {jobs} workers"
+    )
+    cache_dir = context.hcl_cache.cache_dir if context.hcl_cache is not None else None
+    sections = [None] * len(file_paths)
+    with (
+        ProcessPoolExecutor(max_workers=parse_jobs) as parse_pool,
+        ThreadPoolExecutor(max_workers=jobs) as llm_pool,
+    ):
+        # Local files are submitted first: every file of the LLM stage needs them
+        local_futures = {
+            parse_pool.submit(parse_hcl_file, path, cache_dir): path
+            for path in context.shared_inputs.local_paths()
+        }
+        parse_futures = {
+            parse_pool.submit(parse_hcl_file, file_path, cache_dir): index
+            for index, file_path in enumerate(file_paths)
+        }
+
+        parsed_locals = {}
+        for future in as_completed(local_futures):
+            path = local_futures[future]
+            parsed, result = _isolated(
+                future.result, logger, f"Parse stage failed for {path}", logging.DEBUG
+            )
+            if parsed:
+                parsed_locals[path] = result
+        context.shared_inputs.prime_locals(parsed_locals)
+
+        llm_futures = {}
+        for future in as_completed(parse_futures):
+            index = parse_futures[future]
+            parsed, result = _isolated(
+                future.result,
+                logger,
+                f"Parse stage failed for {file_paths[index]}",
+                logging.DEBUG,
+            )
+            if parsed:
+                context.parsed_resources[file_paths[index]] = result
+            llm_future = llm_pool.submit(
+                run_hcl_file_workflow,
+                file_paths[index],
+                config,
+                system_config,
+                buffer_output=True,
+                context=context,
+            )
+            llm_futures[llm_future] = index
+
+        for future in as_completed(llm_futures):
+            index = llm_futures[future]
+            _, sections[index] = _isolated(
+                future.result, logger, f"Failed processing file {file_paths[index]}"
+            )
+    return sections
+
+
+def _process_files_batch(
+    file_paths: list,
+    config: dict,
+    system_config: dict,
+    jobs: int,
+    logger: logging.Logger,
+    context: RunContext,
+) -> list:
+    """
+    Send every file's whole-file request as one batch inference job.
+    Files whose request cannot be built (e.g. too large), whose record failed
+    or whose result does not validate are processed interactively afterwards,
+    including failback.
+    Returns:
+        list: The rendered section per file, in the given order.
+    """
+    sections = [None] * len(file_paths)
+    interactive = []
+    records = []
+    record_indexes = {}
+    for index, file_path in enumerate(file_paths):
+        prepared, model_input = _isolated(
+            partial(prepare_batch_record, file_path, config, system_config, context),
+            logger,
+            f"Processing {file_path} interactively",
+            logging.INFO,
+        )
+        if not prepared:
+            interactive.append(index)
+            continue
+        record_id = f"{index:08d}"
+        records.append({"recordId": record_id, "modelInput": model_input})
+        record_indexes[record_id] = index
+
+    # Records without a result, e.g. when the job cannot be submitted or
+    # fails, are processed interactively below
+    results = {}
+    if records:
+        try:
+            backend = create_batch_backend(config, context.provider)
+            if len(records) < backend.min_records:
+                logger.info(
+                    f"{len(records)} records are below the batch minimum of "
+                    f"{backend.min_records}, processing interactively"
+                )
+            else:
+                results = backend.run(records)
+        except (
+            BatchJobError,
+            TimeoutError,
+            ValueError,
+            ClientError,
+            EndpointConnectionError,
+        ) as e:
+            log_exception(logger, e, "Batch job did not complete")
+
+    for record_id, index in record_indexes.items():
+        model_output = results.get(record_id)
+        if model_output is None:
+            interactive.append(index)
+            continue
+        completed, section = _isolated(
+            partial(
+                complete_batch_record,
+                file_paths[index],
+                model_output,
+                config,
+                system_config,
+                context,
+            ),
+            logger,
+            f"Batch result for {file_paths[index]} unusable, processing interactively",
+            logging.WARNING,
+        )
+        if completed:
+            sections[index] = section
+        else:
+            interactive.append(index)
+
+    if interactive:
+        interactive.sort()
+        logger.info(f"{len(interactive)} files fall back to interactive processing")
+        fallback_sections = _process_files(
+            [file_paths[index] for index in interactive],
+            config,
+            system_config,
+            jobs,
+            logger,
+            context,
+            buffer_output=True,
+        )
+        for index, section in zip(interactive, fallback_sections):
+            sections[index] = section
+    return sections
+
+
+async def _process_files_async(
+    file_paths: list,
+    config: dict,
+    system_config: dict,
+    jobs: int,
+    logger: logging.Logger,
+    context: RunContext,
+) -> list:
+    """
+    Process files as coroutines, with at most `jobs` files in flight.
+    Blocking provider calls run on the loop's default executor, sized to the
+    requests the run may have in flight (files x failback chunks).
+    Returns:
+        list: The rendered section per file, in the given order.
+    """
+    logger.info(f"Processing {len(file_paths)} files asynchronously, {jobs} in flight")
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=context.max_in_flight))
+    semaphore = asyncio.Semaphore(jobs)
+
+    async def process(file_path: str) -> str | None:
+        async with semaphore:
+            try:
+                return await arun_hcl_file_workflow(
+                    file_path,
+                    config,
+                    system_config,
+                    buffer_output=True,
+                    context=context,
+                )
+            except Exception as e:
+                log_exception(logger, e, f"Failed processing file {file_path}")
+                return None
+
+    # gather() returns results in submission order
+    return list(await asyncio.gather(*(process(fp) for fp in file_paths)))
+
+
+def _reuse_unchanged_sections(
+    file_paths: list, manifest: RunManifest, logger: logging.Logger
+) -> tuple[list, list]:
+    """
+    Look up previously rendered sections for files unchanged since the last run.
+    Returns:
+        tuple: (sections, pending_indexes) where sections holds reused sections
+        (None for files that must be processed) and pending_indexes lists the
+        indexes of files to process.
+    """
+    sections = [manifest.lookup(file_path) for file_path in file_paths]
+    pending = [index for index, section in enumerate(sections) if section is None]
+    logger.info(
+        f"Incremental mode: reusing {len(file_paths) - len(pending)} unchanged files, "
+        f"{len(pending)} files to process."
+    )
+    return sections, pending
+
+
+def _shard_keys(
+    file_paths: list,
+    sections: list,
+    system_config: dict,
+    context: RunContext,
+    manifest: RunManifest | None,
+    base_dir: str | None,
+) -> list:
+    """
+    Shard of every file with a section, for output.shard_by (None otherwise).
+    Shards are recorded by the workflow of processed files and by the manifest
+    for reused sections, so no file is parsed again here. A file without a
+    recorded shard falls back to its directory.
+    """
+    shard_keys = []
+    for file_path, section in zip(file_paths, sections):
+        shard = None
+        if section is not None:
+            shard = context.shard_keys.get(file_path)
+            if shard is None and manifest is not None:
+                shard = manifest.lookup_shard(file_path)
+            if shard is None:
+                shard = get_shard_key(file_path, "directory", system_config, base_dir)
+        shard_keys.append(shard)
+    return shard_keys
+
+
+def _emit_sections(
+    file_paths: list,
+    sections: list,
+    sink: MarkdownSink | ShardedMarkdownSink,
+    manifest: RunManifest | None,
+    shard_keys: list | None = None,
+) -> None:
+    """
+    Write buffered sections in file order and record them in the manifest.
+    With shard_keys, each section goes to the shard of its file.
+    """
+    for index, (file_path, section) in enumerate(zip(file_paths, sections)):
+        shard = shard_keys[index] if shard_keys is not None else None
+        if shard_keys is not None:
+            sink.put(index, section, shard)
+        else:
+            sink.put(index, section)
+        if section is None:
+            continue
+        if manifest is not None:
+            manifest.record(file_path, section, shard)
+    if manifest is not None:
+        manifest.save()
 
 
 def main() -> int:
@@ -43,26 +438,26 @@ def main() -> int:
         return system_config["system_call"]["exit_config_error"]
 
     resource = config["input"]["resource_data"]
-
-    # Reset markdown file once at the start of command execution
-    reset_markdown_file(config["output"]["markdown_path"])
+    jobs = args.jobs or config["input"].get("concurrency", 1)
+    parse_jobs = args.parse_jobs or config["input"].get("parse_workers", 1)
+    if args.use_async and parse_jobs > 1:
+        # The asyncio pipeline parses each file in its own workflow
+        logger.warning(
+            f"--async does not use a parse stage, ignoring {parse_jobs} parse jobs"
+        )
+        parse_jobs = 1
 
     try:
+        file_paths = []
         if resource.get("files"):
             logger.info("Processing files...")
-            logger.info(f"{len(resource['files'])} files found to process.")
-            for file_path in resource["files"]:
-                try:
-                    run_hcl_file_workflow(file_path, config, system_config)
-                except Exception as e:
-                    log_exception(logger, e, f"Failed processing file {file_path}")
-                    continue
+            file_paths = resource["files"]
+            logger.info(f"{len(file_paths)} files found to process.")
         elif resource.get("folder"):
             logger.info("Processing folder...")
             logger.info(f"Processing all .tf files in folder: {resource['folder']}")
 
             # Collect all .tf files in deterministic order
-            tf_files = []
             tf_extension = system_config["constants"]["file_processing"][
                 "terraform_extension"
             ]
@@ -70,20 +465,91 @@ def main() -> int:
             for root, _, files in os.walk(resource["folder"]):
                 for file_name in sorted(files):  # Sort within directory
                     if file_name.endswith(tf_extension):
-                        tf_files.append(os.path.join(root, file_name))
+                        file_paths.append(os.path.join(root, file_name))
 
             # Sort all collected files for consistent processing order
-            tf_files.sort()
+            file_paths.sort()
+
+            logger.info(f"{len(file_paths)} files found to process.")
+
+        # Share one provider (and its client) across all files in this run
+        context = RunContext(
+            config,
+            system_config,
+            concurrency=jobs,
+            use_cache=not args.no_cache,
+            refresh_cache=args.refresh_cache,
+        )
+
+        # Sections are buffered when files complete out of order, when they
+        # have to be merged with sections reused from the manifest or when
+        # they are split into shards
+        sharded = config["output"].get("shard_by", "none") != "none"
+        buffer_output = (
+            jobs > 1
+            or parse_jobs > 1
+            or args.incremental
+            or args.use_async
+            or args.batch
+            or sharded
+        )
+        sections = [None] * len(file_paths)
+        pending = list(range(len(file_paths)))
+        manifest = None
+        if args.incremental:
+            manifest = RunManifest(
+                get_manifest_path(config),
+                compute_inputs_hash(config, system_config, config_path),
+            )
+            manifest.load()
+            sections, pending = _reuse_unchanged_sections(file_paths, manifest, logger)
+
+        # The previous document stays in place until the run completes
+        if sharded:
+            sink = ShardedMarkdownSink(
+                config["output"]["markdown_path"], get_shard_dir(config)
+            )
+        else:
+            sink = MarkdownSink(config["output"]["markdown_path"])
+            context.markdown_sink = sink
+
+        # Process files in deterministic order
+        try:
+            processed = _process_files(
+                [file_paths[index] for index in pending],
+                config,
+                system_config,
+                jobs,
+                logger,
+                context,
+                buffer_output=buffer_output,
+                parse_jobs=parse_jobs,
+                use_async=args.use_async,
+                use_batch=args.batch,
+            )
 
-            logger.info(f"{len(tf_files)} files found to process.")
+            if buffer_output:
+                for index, section in zip(pending, processed):
+                    sections[index] = section
+                shard_keys = (
+                    _shard_keys(
+                        file_paths,
+                        sections,
+                        system_config,
+                        context,
+                        manifest,
+                        resource.get("folder"),
+                    )
+                    if sharded
+                    else None
+                )
+                # Emit sections in deterministic order regardless of completion order
+                _emit_sections(file_paths, sections, sink, manifest, shard_keys)
+            sink.commit()
+        finally:
+            sink.close()
+            context.close()
 
-            # Process files in deterministic order
-            for file_path in tf_files:
-                try:
-                    run_hcl_file_workflow(file_path, config, system_config)
-                except Exception as e:
-                    log_exception(logger, e, f"Failed processing file {file_path}")
-                    continue
         if system_config["system_call"]["exit_success"] == 0:
             logger.info("All files processed successfully.")
         else:
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+
+from .logger_config import get_logger, log_exception
+from .utils import ensure_directory_exists
+
+logger = get_logger("manifest")
+
+MANIFEST_VERSION = 2
+
+
+def hash_file(file_path: str) -> str | None:
+    """
+    Compute the SHA-256 digest of a file's content.
+    Args:
+        file_path (str): Path to the file.
+    Returns:
+        str | None: Hex digest, or None if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return None
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_inputs_hash(config: dict, system_config: dict, config_path: str) -> str:
+    """
+    Hash every input shared by all files of a run: the config file, the system
+    config, the local files, the modules file and the Markdown template file.
+    A change to any of them invalidates every manifest entry.
+    Args:
+        config (dict): Loaded configuration.
+        system_config (dict): System configuration.
+        config_path (str): Path to the configuration YAML file.
+    Returns:
+        str: Hex digest combining all shared inputs.
+    """
+    parts = {
+        "config_file": hash_file(config_path),
+        "system_config": hashlib.sha256(
+            json.dumps(system_config, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest(),
+        "local_files": [
+            {env: hash_file(path) for env, path in entry.items()}
+            for entry in config["input"].get("local_files", [])
+        ],
+    }
+    modules = config["input"].get("modules", {})
+    if modules.get("enabled", True) and modules.get("path"):
+        parts["modules"] = hash_file(modules["path"])
+    template = config["output"].get("template")
+    if isinstance(template, dict) and template.get("path"):
+        parts["template"] = hash_file(template["path"])
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_manifest_path(config: dict) -> str:
+    """
+    Returns the configured manifest path, defaulting to a file next to the Markdown output.
+    """
+    manifest_path = config["output"].get("manifest_path")
+    if manifest_path:
+        return manifest_path
+    return os.path.splitext(config["output"]["markdown_path"])[0] + ".manifest.json"
+
+
+class RunManifest:
+    """
+    Records, per processed file, the hash of its content and the Markdown
+    section rendered from it (and its shard, for output.shard_by), so that
+    unchanged files can be skipped by the next incremental run.
+    """
+
+    def __init__(self, path: str, inputs_hash: str):
+        self.path = path
+        self.inputs_hash = inputs_hash
+        self._previous = {}
+        self._entries = {}
+        self._file_hashes = {}
+
+    def load(self) -> None:
+        """
+        Load the previous manifest. Entries are discarded when the shared
+        inputs changed or the manifest cannot be read.
+        """
+        if not os.path.exists(self.path):
+            logger.info(f"No previous manifest found: {self.path}")
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log_exception(logger, e, f"Ignoring unreadable manifest {self.path}")
+            return
+
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("Manifest version changed, reprocessing all files")
+            return
+        if data.get("inputs_hash") != self.inputs_hash:
+            logger.info("Shared inputs changed since last run, reprocessing all files")
+            return
+        self._previous = data.get("files", {})
+        logger.debug(f"Loaded {len(self._previous)} manifest entries")
+
+    def _file_hash(self, file_path: str) -> str | None:
+        if file_path not in self._file_hashes:
+            self._file_hashes[file_path] = hash_file(file_path)
+        return self._file_hashes[file_path]
+
+    def lookup(self, file_path: str) -> str | None:
+        """
+        Returns the previously rendered section if the file is unchanged.
+        """
+        entry = self._previous.get(file_path)
+        if entry is None:
+            return None
+        if entry.get("hash") != self._file_hash(file_path):
+            return None
+        return entry.get("section")
+
+    def lookup_shard(self, file_path: str) -> str | None:
+        """
+        Returns the shard previously recorded for an unchanged file.
+        """
+        if self.lookup(file_path) is None:
+            return None
+        return self._previous[file_path].get("shard")
+
+    def record(self, file_path: str, section: str, shard: str | None = None) -> None:
+        """
+        Record the rendered section (and its shard) for a file processed
+        (or reused) in this run.
+        """
+        entry = {
+            "hash": self._file_hash(file_path),
+            "section": section,
+        }
+        if shard is not None:
+            entry["shard"] = shard
+        self._entries[file_path] = entry
+
+    def save(self) -> None:
+        """
+        Atomically write the entries recorded in this run.
+        Files that failed or no longer exist are dropped, so they are
+        processed again next time.
+        """
+        ensure_directory_exists(self.path)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "inputs_hash": self.inputs_hash,
+                    "files": self._entries,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(temp_path, self.path)
+        logger.info(f"Saved manifest with {len(self._entries)} entries: {self.path}")
@@ -1,37 +1,188 @@
+import filecmp
+import itertools
 import json
-import logging
 import os
 import re
+import shutil
+import tempfile
+import threading
 
 import jsonschema
 from jinja2 import (
     BaseLoader,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     TemplateNotFound,
     TemplateSyntaxError,
 )
 
+from .config_loader import get_default_config
+from .json_stream import salvage_array_items
 from .logger_config import get_logger, log_exception
-from .utils import ensure_directory_exists, measure_time
+from .utils import ensure_directory_exists, measure_time, validate_json_schema
 
 logger = get_logger("output_writer")
 
+# Renderers shared by every file of a run, keyed by their template settings
+_renderers = {}
+_renderers_lock = threading.Lock()
 
-def output_md(md_title: str, config: dict) -> None:
+
+def output_md(
+    md_title: str,
+    data: dict | list,
+    config: dict,
+    sink: "MarkdownSink | None" = None,
+) -> None:
     """
-    Generate a Markdown file from the JSON output using Jinja2 templates.
+    Render the validated output with Jinja2 templates and append it to the Markdown file.
     Args:
         md_title (str): The title for the Markdown file.
+        data (dict | list): Validated output data.
         config (dict): Configuration for the Markdown output.
+        sink (MarkdownSink | None): Run-scoped writer to append to instead of
+            opening the Markdown file.
     Raises:
-        FileNotFoundError: If the JSON file or template file does not exist.
+        FileNotFoundError: If the template file does not exist.
         ValueError: If the template configuration is invalid.
     """
     with measure_time(f"Markdown generation: {md_title}", logger):
-        # Load and validate JSON data
-        with open(config["output"]["json_path"], "r", encoding="utf-8") as file:
-            data = json.load(file)
+        rendered = render_md(md_title, data, config)
+        try:
+            if sink is not None:
+                sink.append(rendered)
+            else:
+                append_md(rendered, config)
+        except Exception as e:
+            log_exception(logger, e, "Error writing Markdown output")
+            raise
+
+
+def get_json_output_path(file_path: str, config: dict) -> str:
+    """
+    Returns the path of the JSON artifact of one file: json_path with the
+    file's path inserted before the extension, so files never share it.
+    The file's path is taken relative to input.resource_data.folder (or to
+    the working directory), without extension and with "." for separators,
+    e.g. dev/main.tf is saved as <json_path stem>.dev.main.json.
+    Args:
+        file_path (str): Path to the HCL file.
+        config (dict): Configuration.
+    Returns:
+        str: Path of the JSON file.
+    """
+    path = os.path.abspath(file_path)
+    base = os.path.abspath(
+        config.get("input", {}).get("resource_data", {}).get("folder") or "."
+    )
+    if os.path.commonpath([path, base]) == base:
+        name = os.path.relpath(path, base)
+    else:
+        name = os.path.splitdrive(path)[1].lstrip(os.sep)
+    name = os.path.splitext(name)[0].replace(os.sep, ".")
+    root, ext = os.path.splitext(config["output"]["json_path"])
+    return f"{root}.{name}{ext or '.json'}"
+
+
+def write_json_output(file_path: str, data: dict | list, config: dict) -> str:
+    """
+    Write the validated output of one file as JSON (output.keep_json).
+    Args:
+        file_path (str): Path to the HCL file.
+        data (dict | list): Validated output data.
+        config (dict): Configuration for the output; output.json_compact
+            writes minified JSON instead of indented JSON.
+    Returns:
+        str: Path of the written JSON file.
+    """
+    json_path = get_json_output_path(file_path, config)
+    ensure_directory_exists(json_path)
+    try:
+        with open(json_path, "w", encoding="utf-8") as f:
+            if config["output"].get("json_compact", False):
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+    except Exception as e:
+        log_exception(logger, e, "Error writing JSON output")
+        raise
+    logger.info(f"Successfully wrote JSON output to {json_path}")
+    return json_path
+
+
+class MarkdownRenderer:
+    """
+    Renders Markdown sections with the configured template, which is compiled
+    once and reused for every file. File templates use Jinja2's bytecode cache
+    when a cache directory is given, and the built-in table templates are
+    rendered directly without Jinja2.
+    """
+
+    def __init__(self, config: dict, bytecode_cache_dir: str | None = None):
+        """
+        Args:
+            config (dict): Configuration for the Markdown output.
+            bytecode_cache_dir (str | None): Directory for compiled file templates.
+        Raises:
+            ValueError: If the template file is missing or invalid.
+        """
+        self.schema_columns = config.get("schema_columns", [])
+        self._table_format = None
+        self._template = None
+
+        template_config = config["output"].get("template")
+        if isinstance(template_config, dict) and template_config.get("path"):
+            self._template_path = template_config["path"]
+            bytecode_cache = None
+            if bytecode_cache_dir is not None:
+                os.makedirs(bytecode_cache_dir, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+            self._env = Environment(
+                loader=FileSystemLoader(os.path.dirname(self._template_path)),
+                autoescape=False,
+                bytecode_cache=bytecode_cache,
+            )
+            self._template = self._load_file_template()
+        else:
+            # Use template string from config or default template
+            template_str = (
+                template_config
+                if isinstance(template_config, str)
+                else get_default_template()
+            )
+            self._table_format = _get_table_format(template_str)
+            if self._table_format is None:
+                env = Environment(loader=BaseLoader(), autoescape=False)
+                self._template = env.from_string(template_str)
+            logger.debug("Using default template or config template string")
+
+    def _load_file_template(self):
+        """
+        Load and compile the template file (internal function)
+        """
+        try:
+            template = self._env.get_template(os.path.basename(self._template_path))
+            logger.debug(f"Loaded template from file: {self._template_path}")
+            return template
+        except TemplateNotFound as e:
+            logger.error(f"Template file not found: {e}")
+            raise ValueError(f"Template file not found: {str(e)}")
+        except TemplateSyntaxError as e:
+            logger.error(f"Syntax error in template file: {e}")
+            raise ValueError(f"Syntax error in template file: {str(e)}")
+
+    def render(self, md_title: str, data: dict | list | str) -> str:
+        """
+        Render a Markdown section for the given data.
+        Args:
+            md_title (str): The title for the Markdown section.
+            data (dict | list | str): Validated output data (a JSON string is decoded).
+        Returns:
+            str: The rendered Markdown section.
+        Raises:
+            ValueError: If a changed template file can no longer be loaded.
+        """
         if isinstance(data, str):
             data = json.loads(data)
 
@@ -40,7 +191,7 @@ def output_md(md_title: str, config: dict) -> None:
             data = [data]
 
         # Filter data to include only schema columns
-        schema_columns = config.get("schema_columns", [])
+        schema_columns = self.schema_columns
         filtered_data = []
         for item in data:
             filtered_item = {
@@ -52,56 +203,343 @@ def output_md(md_title: str, config: dict) -> None:
             f"Processing {len(filtered_data)} data items with {len(schema_columns)} columns"
         )
 
-        # Setup template environment
-        env = Environment(loader=BaseLoader(), autoescape=False)
-
-        # Get template content
-        template_config = config["output"].get("template")
-        if isinstance(template_config, dict) and template_config.get("path"):
-            # Load template from file
-            template_dir = os.path.dirname(template_config["path"])
-            template_file = os.path.basename(template_config["path"])
-            env = Environment(loader=FileSystemLoader(template_dir), autoescape=False)
-            try:
-                template = env.get_template(template_file)
-                logger.debug(f"Loaded template from file: {template_config['path']}")
-            except TemplateNotFound as e:
-                logger.error(f"Template file not found: {e}")
-                raise ValueError(f"Template file not found: {str(e)}")
-            except TemplateSyntaxError as e:
-                logger.error(f"Syntax error in template file: {e}")
-                raise ValueError(f"Syntax error in template file: {str(e)}")
-        else:
-            # Use template string from config or default template
-            template_str = (
-                template_config
-                if isinstance(template_config, str)
-                else get_default_template()
+        if self._table_format is not None:
+            rendered = _render_table(
+                md_title, filtered_data, schema_columns, *self._table_format
             )
-            template = env.from_string(template_str)
-            logger.debug("Using default template or config template string")
-
-        # Render template
-        ensure_directory_exists(config["output"]["markdown_path"])
-        try:
-            rendered = template.render(
+        else:
+            if not self._template.is_up_to_date:
+                self._template = self._load_file_template()
+            rendered = self._template.render(
                 title=md_title, data=filtered_data, columns=schema_columns
             )
-            rendered_size_kb = len(rendered) / 1024
-            logger.debug(f"Rendered Markdown size: {rendered_size_kb:.2f} KB")
-
-            with open(
-                config["output"]["markdown_path"], "a", encoding="utf-8"
-            ) as md_file:
-                logger.debug(f"Rendered Markdown:\n {rendered}")
-                md_file.write(rendered + "\n")
-            logger.info(f"Saved to Markdown file: {config['output']['markdown_path']}")
-            logger.info(f"Deleting JSON file: {config['output']['json_path']}")
-            if not logger.isEnabledFor(logging.DEBUG):
-                os.remove(config["output"]["json_path"])
-        except Exception as e:
-            log_exception(logger, e, "Error writing Markdown output")
-            raise
+        rendered_size_kb = len(rendered) / 1024
+        logger.debug(f"Rendered Markdown size: {rendered_size_kb:.2f} KB")
+        return rendered
+
+
+def get_renderer(config: dict) -> MarkdownRenderer:
+    """
+    Returns the shared renderer for the configured template, creating it on first use.
+    Args:
+        config (dict): Configuration for the Markdown output.
+    Returns:
+        MarkdownRenderer: The renderer.
+    Raises:
+        ValueError: If the template configuration is invalid.
+    """
+    bytecode_cache_dir = None
+    cache_config = config.get("cache", {})
+    if cache_config.get("enabled", False) and cache_config.get("path"):
+        bytecode_cache_dir = os.path.join(cache_config["path"], "templates")
+    key = (
+        json.dumps(config["output"].get("template"), sort_keys=True),
+        tuple(config.get("schema_columns", [])),
+        bytecode_cache_dir,
+    )
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = MarkdownRenderer(config, bytecode_cache_dir)
+        with _renderers_lock:
+            renderer = _renderers.setdefault(key, renderer)
+    return renderer
+
+
+def render_md(md_title: str, data: dict | list | str, config: dict) -> str:
+    """
+    Render a Markdown section for the given data using the configured template.
+    Args:
+        md_title (str): The title for the Markdown section.
+        data (dict | list | str): Validated output data (a JSON string is decoded).
+        config (dict): Configuration for the Markdown output.
+    Returns:
+        str: The rendered Markdown section.
+    Raises:
+        FileNotFoundError: If the template file does not exist.
+        ValueError: If the template configuration is invalid.
+    """
+    return get_renderer(config).render(md_title, data)
+
+
+def append_md(rendered: str, config: dict) -> None:
+    """
+    Append a rendered Markdown section to the configured Markdown file.
+    Args:
+        rendered (str): The rendered Markdown section.
+        config (dict): Configuration for the Markdown output.
+    """
+    ensure_directory_exists(config["output"]["markdown_path"])
+    with open(config["output"]["markdown_path"], "a", encoding="utf-8") as md_file:
+        logger.debug(f"Rendered Markdown:\n {rendered}")
+        md_file.write(rendered + "\n")
+    logger.info(f"Saved to Markdown file: {config['output']['markdown_path']}")
+
+
+class MarkdownSink:
+    """
+    Run-scoped writer of the Markdown document. Sections are written through
+    one buffered handle to a temporary file next to markdown_path, which
+    atomically replaces the document on commit, so readers only ever see the
+    previous or the complete new document.
+    Sections are placed in numbered slots and written in slot order, so
+    workers may finish out of order.
+    """
+
+    def __init__(self, markdown_path: str):
+        """
+        Args:
+            markdown_path (str): Path of the Markdown document.
+        """
+        self.markdown_path = markdown_path
+        ensure_directory_exists(markdown_path)
+        fd, self._temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(markdown_path)}.",
+            suffix=".tmp",
+            dir=os.path.dirname(markdown_path) or ".",
+        )
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self._slots = {}
+        self._next_slot = 0
+        self._append_slots = itertools.count()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _write_ready_slots(self) -> None:
+        """
+        Write the filled slots that follow the last written one (internal function)
+        """
+        while self._next_slot in self._slots:
+            rendered = self._slots.pop(self._next_slot)
+            if rendered is not None:
+                self._file.write(rendered + "\n")
+            self._next_slot += 1
+
+    def put(self, slot: int, rendered: str | None) -> None:
+        """
+        Place a section in its slot. It is written once every earlier slot is filled.
+        Args:
+            slot (int): Position of the section in the document.
+            rendered (str | None): The rendered section, or None for a slot without one.
+        """
+        with self._lock:
+            self._slots[slot] = rendered
+            self._write_ready_slots()
+
+    def append(self, rendered: str) -> None:
+        """
+        Place a section in the next slot. Not to be mixed with put().
+        Args:
+            rendered (str): The rendered section.
+        """
+        self.put(next(self._append_slots), rendered)
+
+    def commit(self) -> None:
+        """
+        Write the remaining sections and atomically replace the Markdown document.
+        """
+        with self._lock:
+            if self._slots:
+                logger.warning(
+                    f"Markdown slots before {min(self._slots)} were never filled"
+                )
+                for slot in sorted(self._slots):
+                    if self._slots[slot] is not None:
+                        self._file.write(self._slots[slot] + "\n")
+                self._slots.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self.closed = True
+            if os.path.exists(self.markdown_path) and filecmp.cmp(
+                self._temp_path, self.markdown_path, shallow=False
+            ):
+                # Leave an unchanged document (and its mtime) untouched
+                os.remove(self._temp_path)
+                logger.info(f"Markdown file unchanged: {self.markdown_path}")
+                return
+            if os.path.exists(self.markdown_path):
+                shutil.copymode(self.markdown_path, self._temp_path)
+            else:
+                # mkstemp creates the file readable by the owner only
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(self._temp_path, 0o666 & ~umask)
+            os.replace(self._temp_path, self.markdown_path)
+        logger.info(f"Saved to Markdown file: {self.markdown_path}")
+
+    def close(self) -> None:
+        """
+        Discard the temporary file unless the sink was committed.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self._file.close()
+            os.remove(self._temp_path)
+            self.closed = True
+        logger.info(
+            f"Markdown output discarded, keeping the existing {self.markdown_path}"
+        )
+
+
+def get_shard_dir(config: dict) -> str:
+    """
+    Returns the directory of the Markdown shards: output.shard_dir, or a
+    directory named after markdown_path next to it.
+    Args:
+        config (dict): Configuration for the output.
+    Returns:
+        str: Path of the shard directory.
+    """
+    output_config = config["output"]
+    return (
+        output_config.get("shard_dir")
+        or os.path.splitext(output_config["markdown_path"])[0]
+    )
+
+
+# Line of the index page rendered by ShardedMarkdownSink: "- [shard](link) (count)"
+_INDEX_ENTRY = re.compile(r"^- \[.*\]\(([^()]+\.md)\) \(\d+\)$")
+
+
+def _shard_file_name(shard: str) -> str:
+    """
+    File name of a shard, safe for any module name or directory (internal function)
+    """
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", shard).strip("._")
+    return f"{name or 'root'}.md"
+
+
+class ShardedMarkdownSink:
+    """
+    Run-scoped writer of a sharded Markdown output (output.shard_by): one
+    document per shard in shard_dir, plus an index page at markdown_path
+    linking to every shard. Each document is written through its own
+    MarkdownSink, so shards whose content did not change are left untouched,
+    and shards listed by the previous index but no longer produced by the run
+    are removed from shard_dir.
+    """
+
+    def __init__(self, markdown_path: str, shard_dir: str):
+        """
+        Args:
+            markdown_path (str): Path of the index page.
+            shard_dir (str): Directory holding the shard documents.
+        """
+        self.markdown_path = markdown_path
+        self.shard_dir = shard_dir
+        self._sections = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def put(self, slot: int, rendered: str | None, shard: str) -> None:
+        """
+        Place a section in a shard. Sections of a shard are written in slot order.
+        Args:
+            slot (int): Position of the section in the whole output.
+            rendered (str | None): The rendered section, or None for a slot without one.
+            shard (str): Module name or directory the section belongs to.
+        """
+        if rendered is None:
+            return
+        with self._lock:
+            self._sections.setdefault(shard, []).append((slot, rendered))
+
+    def _shard_paths(self) -> dict:
+        """
+        Assign a distinct file in shard_dir to every shard (internal function)
+        """
+        paths = {}
+        used = set()
+        for shard in sorted(self._sections):
+            file_name = _shard_file_name(shard)
+            stem = file_name[: -len(".md")]
+            suffix = 2
+            while file_name in used:
+                file_name = f"{stem}-{suffix}.md"
+                suffix += 1
+            used.add(file_name)
+            paths[shard] = os.path.join(self.shard_dir, file_name)
+        return paths
+
+    def _render_index(self, shard_paths: dict) -> str:
+        """
+        Render the index page linking to every shard (internal function)
+        """
+        index_dir = os.path.dirname(self.markdown_path) or "."
+        lines = ["# Index", ""]
+        for shard, shard_path in shard_paths.items():
+            link = os.path.relpath(shard_path, index_dir).replace(os.sep, "/")
+            lines.append(f"- [{shard}]({link}) ({len(self._sections[shard])})")
+        return "\n".join(lines)
+
+    def _previous_shard_paths(self) -> set:
+        """
+        Shard documents in shard_dir linked from the previous index page (internal function)
+        """
+        if not os.path.exists(self.markdown_path):
+            return set()
+        index_dir = os.path.dirname(self.markdown_path) or "."
+        shard_dir = os.path.abspath(self.shard_dir)
+        paths = set()
+        with open(self.markdown_path, "r", encoding="utf-8") as f:
+            for line in f:
+                match = _INDEX_ENTRY.match(line.rstrip("\n"))
+                if match is None:
+                    continue
+                path = os.path.abspath(os.path.join(index_dir, match.group(1)))
+                if os.path.dirname(path) == shard_dir:
+                    paths.add(path)
+        return paths
+
+    def _remove_stale_shards(self, shard_paths: dict) -> None:
+        """
+        Remove shard documents written by an earlier run that this run did
+        not produce. Other files in shard_dir are left alone (internal function)
+        """
+        current = {os.path.abspath(path) for path in shard_paths.values()}
+        for path in sorted(self._previous_shard_paths() - current):
+            if os.path.exists(path):
+                os.remove(path)
+                logger.info(f"Removed stale Markdown shard: {os.path.basename(path)}")
+
+    def commit(self) -> None:
+        """
+        Write every shard and the index page, each replaced atomically.
+        """
+        with self._lock:
+            shard_paths = self._shard_paths()
+            os.makedirs(self.shard_dir, exist_ok=True)
+            for shard, shard_path in shard_paths.items():
+                sink = MarkdownSink(shard_path)
+                try:
+                    for _, rendered in sorted(self._sections[shard]):
+                        sink.append(rendered)
+                    sink.commit()
+                finally:
+                    sink.close()
+            self._remove_stale_shards(shard_paths)
+
+            index = MarkdownSink(self.markdown_path)
+            try:
+                index.append(self._render_index(shard_paths))
+                index.commit()
+            finally:
+                index.close()
+            self.closed = True
+
+    def close(self) -> None:
+        """
+        Discard the buffered sections unless the sink was committed.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self._sections.clear()
+            self.closed = True
+        logger.info(
+            f"Markdown output discarded, keeping the existing {self.markdown_path}"
+        )
 
 
 def get_default_template() -> str:
@@ -116,6 +554,38 @@ def get_default_template() -> str:
 {% endfor %}"""
 
 
+def _get_table_format(template_str: str) -> tuple[str, str] | None:
+    """
+    Recognize the built-in table templates (internal function)
+
+    Returns:
+        tuple | None: (text after the title line, cell separator) of the
+            template, or None for any other template
+    """
+    if template_str == get_default_template():
+        return "\n\n", " | "
+    if template_str == get_default_config()["output"]["template"]:
+        # Its optional description is never passed to the template
+        return "\n\n\n\n", " |"
+    return None
+
+
+def _render_table(
+    md_title: str, data: list, columns: list, title_suffix: str, separator: str
+) -> str:
+    """
+    Render a built-in table template without Jinja2, producing the same text (internal function)
+    """
+    lines = [
+        f"#### {md_title}{title_suffix}| "
+        + "".join(f"{col}{separator}" for col in columns),
+        "|" + ":---|" * len(columns),
+    ]
+    for row in data:
+        lines.append("| " + "".join(f"{row[col]}{separator}" for col in columns))
+    return "\n".join(lines) + "\n"
+
+
 def clean_cell(cell) -> str:
     """
     Clean the cell content for Markdown formatting.
@@ -157,7 +627,7 @@ def validate_output_json(output_str: str, schema: dict) -> dict | list:
             logger.debug(
                 f"JSON parsed successfully: {len(parsed) if isinstance(parsed, list) else 1} items"
             )
-            jsonschema.validate(instance=parsed, schema=schema)
+            validate_json_schema(parsed, schema)
             logger.debug("JSON schema validation passed")
             return parsed
         except json.JSONDecodeError as e:
@@ -166,3 +636,43 @@ def validate_output_json(output_str: str, schema: dict) -> dict | list:
         except jsonschema.ValidationError as e:
             log_exception(logger, e, "Output JSON does not match schema")
             raise
+
+
+def salvage_output_items(output_str: str, schema: dict) -> tuple[list, list]:
+    """
+    Tolerant counterpart of validate_output_json for array schemas: recovers
+    the parseable prefix of the array and validates every item on its own.
+    Args:
+        output_str (str): The rejected output JSON string.
+        schema (dict): The JSON schema of the output.
+    Returns:
+        tuple: (valid items, messages describing the invalid items and JSON errors);
+            no items for non-array schemas or outputs that are not arrays.
+    """
+    if schema.get("type") != "array":
+        return [], []
+    issues = []
+    text = output_str
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, str):
+            # A truncated tool input passed through as text
+            text = parsed
+            parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        parsed = salvage_array_items(text)
+        issues.append(f"invalid JSON after {len(parsed)} items: {e.msg}")
+    if not isinstance(parsed, list):
+        return [], []
+
+    item_schema = schema.get("items")
+    items = []
+    for index, item in enumerate(parsed):
+        try:
+            if item_schema is not None:
+                validate_json_schema(item, item_schema)
+        except jsonschema.ValidationError as e:
+            issues.append(f"item {index} does not match the schema: {e.message}")
+            continue
+        items.append(item)
+    return items, issues
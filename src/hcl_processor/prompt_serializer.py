@@ -0,0 +1,93 @@
+import json
+import re
+
+from .logger_config import get_logger
+
+logger = get_logger("prompt_serializer")
+
+# python: repr of the python-hcl2 output (historical format)
+# json: minified JSON of the python-hcl2 output
+# compact: minified JSON with python-hcl2 artifacts (block markers, quoting,
+#          "${...}" wrappers, block nesting lists) removed
+# source: the original HCL text, falling back to compact for fragments
+PROMPT_FORMATS = ["python", "json", "compact", "source"]
+DEFAULT_PROMPT_FORMAT = "python"
+
+_INTERPOLATION_RE = re.compile(r"^\$\{([^{}]*)\}$")
+
+
+def _unquote(value: str) -> str:
+    """
+    Strip the quotes python-hcl2 keeps around string literals and a
+    "${...}" wrapper spanning the whole string (internal function)
+    """
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        value = value[1:-1]
+    match = _INTERPOLATION_RE.match(value)
+    if match:
+        return match.group(1)
+    return value
+
+
+def _is_block(obj) -> bool:
+    """
+    Whether obj is a python-hcl2 block body, or a labelled block wrapping one (internal function)
+    """
+    if not isinstance(obj, dict):
+        return False
+    if obj.get("__is_block__"):
+        return True
+    return bool(obj) and all(
+        isinstance(value, dict) and value.get("__is_block__") for value in obj.values()
+    )
+
+
+def _compact(obj):
+    """
+    Recursively simplify python-hcl2 output (internal function)
+    """
+    if isinstance(obj, dict):
+        return {
+            _unquote(key): _compact(value)
+            for key, value in obj.items()
+            if not (key.startswith("__") and key.endswith("__"))
+        }
+    if isinstance(obj, list):
+        if len(obj) == 1 and _is_block(obj[0]):
+            return _compact(obj[0])
+        return [_compact(item) for item in obj]
+    if isinstance(obj, str):
+        return _unquote(obj)
+    return obj
+
+
+def serialize_hcl(
+    parsed, prompt_format: str = DEFAULT_PROMPT_FORMAT, source: str | None = None
+) -> str:
+    """
+    Serialize parsed HCL for inclusion in a prompt.
+
+    Args:
+        parsed: python-hcl2 output, or a fragment of it
+        prompt_format (str): One of PROMPT_FORMATS
+        source (str | None): Original HCL text, used by the "source" format
+
+    Returns:
+        str: The serialized HCL
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if prompt_format == "python":
+        return f"{parsed}"
+    if prompt_format == "json":
+        return json.dumps(
+            parsed, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+    if prompt_format == "source" and source is not None:
+        return source
+    if prompt_format in ("compact", "source"):
+        return json.dumps(
+            _compact(parsed), ensure_ascii=False, separators=(",", ":"), default=str
+        )
+    raise ValueError(f"Unsupported prompt format: {prompt_format}")
@@ -1,18 +1,32 @@
 from .bedrock_client import BedrockProvider  # Import BedrockProvider concrete class
 from .llm_provider import LLMProvider  # Import LLMProvider abstract class
+from .response_cache import ResponseCache
 
 
-def create_llm_provider(config: dict, system_config: dict) -> LLMProvider:
+def create_llm_provider(
+    config: dict,
+    system_config: dict,
+    concurrency: int = 1,
+    response_cache: ResponseCache | None = None,
+) -> LLMProvider:
     """
     Factory function to create an LLMProvider instance based on configuration.
     It expects a normalized config with a 'provider_config' key.
     Currently only supports BedrockProvider.
+    concurrency is the number of requests expected to be in flight at once,
+    used to size the provider's connection pool.
+    response_cache, when given, is consulted before every API call.
     """
     provider_name = config["provider_config"]["name"]
     # The provider constructor might need the full config for non-provider-specific settings
     # (e.g., 'modules'), so we pass the full config object.
 
     if provider_name == "bedrock":
-        return BedrockProvider(config, system_config)
+        return BedrockProvider(
+            config,
+            system_config,
+            concurrency=concurrency,
+            response_cache=response_cache,
+        )
     else:
         raise ValueError(f"Unsupported LLM provider: {provider_name}")
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+
+from .logger_config import get_logger
+
+logger = get_logger("rate_limiter")
+
+DEFAULT_THROTTLE_RETRIES = 3
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+    The bucket starts full, so a burst of up to one minute's worth of
+    capacity is allowed.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # per second
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(
+            self.capacity, self._available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Take amount from the bucket, waiting until enough has been refilled.
+        Amounts above the capacity are capped so a single large request can
+        still proceed once the bucket is full.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available >= amount:
+                    self._available -= amount
+                    return waited
+                delay = (amount - self._available) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit adjusted with AIMD: the limit grows by one after a full
+    window of successful requests and is halved on every throttle.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = max(maximum, minimum)
+        self.minimum = minimum
+        self.limit = self.maximum
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                logger.debug(f"Concurrency limit raised to {self.limit}")
+                self._condition.notify()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            self._successes = 0
+            new_limit = max(self.minimum, self.limit // 2)
+            if new_limit != self.limit:
+                logger.warning(
+                    f"Throttled, lowering concurrency limit {self.limit} -> {new_limit}"
+                )
+            self.limit = new_limit
+
+
+class RateLimiter:
+    """
+    Client-side limits shared by every call of a provider: requests per
+    minute, tokens per minute and an adaptive concurrency limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_concurrency: int = 1,
+        throttle_retries: int = DEFAULT_THROTTLE_RETRIES,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.throttle_retries = throttle_retries
+
+    @classmethod
+    def from_settings(
+        cls, settings: dict | None, max_concurrency: int
+    ) -> "RateLimiter | None":
+        """
+        Build a limiter from the provider's rate_limit settings.
+
+        Args:
+            settings (dict | None): rate_limit provider settings
+            max_concurrency (int): Upper bound of the adaptive concurrency limit
+
+        Returns:
+            RateLimiter | None: None when rate limiting is not configured
+        """
+        if not settings:
+            return None
+        return cls(
+            requests_per_minute=settings.get("requests_per_minute"),
+            tokens_per_minute=settings.get("tokens_per_minute"),
+            max_concurrency=max_concurrency,
+            throttle_retries=settings.get("throttle_retries", DEFAULT_THROTTLE_RETRIES),
+        )
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Generator[None, None, None]:
+        """
+        Wait for a concurrency slot and for request and token budget.
+
+        Args:
+            tokens (int): Tokens the request is expected to consume
+        """
+        self.concurrency.acquire()
+        try:
+            waited = 0.0
+            if self.requests is not None:
+                waited += self.requests.acquire()
+            if self.tokens is not None and tokens:
+                waited += self.tokens.acquire(tokens)
+            if waited:
+                logger.debug(f"Rate limiter delayed request by {waited:.2f}s")
+            yield
+        finally:
+            self.concurrency.release()
+
+    def on_success(self) -> None:
+        self.concurrency.on_success()
+
+    def on_throttle(self) -> None:
+        self.concurrency.on_throttle()
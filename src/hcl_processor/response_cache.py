@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .logger_config import get_logger
+
+logger = get_logger("response_cache")
+
+
+class ResponseCache:
+    """
+    On-disk cache of LLM responses, keyed by a hash of the complete request
+    (model, system prompt, messages, tool config and inference config).
+    Entries expire after ttl_seconds and the least recently used entries are
+    evicted once the stored responses exceed max_size_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: int,
+        max_size_bytes: int,
+        refresh: bool = False,
+    ):
+        """
+        Args:
+            cache_dir (str): Directory holding the SQLite database.
+            ttl_seconds (int): Lifetime of a cached response.
+            max_size_bytes (int): Upper bound for the total size of stored responses.
+            refresh (bool): Ignore existing entries but still store new responses.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+        logger.debug(f"Response cache opened: {self.path}")
+
+    @staticmethod
+    def make_key(request: dict) -> str:
+        """
+        Build a stable cache key for a request payload.
+        Args:
+            request (dict): The full request sent to the provider.
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON form of the request.
+        """
+        canonical = json.dumps(
+            request, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a cached response.
+        Returns:
+            str | None: The cached response, or None on a miss, an expired
+            entry, or when the cache is being refreshed.
+        """
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self.misses += 1
+                logger.debug(f"Cached response expired: {key[:12]}")
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response and evict old entries if the size limit is exceeded.
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used entries until the total size fits (internal function)
+        Must be called with the lock held.
+        """
+        (total_size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total_size <= self.max_size_bytes:
+            return
+
+        evicted = 0
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} cached responses to respect size limit")
+
+    def close(self) -> None:
+        """
+        Close the underlying database and log hit statistics.
+        """
+        with self._lock:
+            self._connection.close()
+        logger.info(f"Response cache: {self.hits} hits, {self.misses} misses")
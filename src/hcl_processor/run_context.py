@@ -0,0 +1,87 @@
+import threading
+
+from .file_processor import SharedInputs
+from .hcl_cache import HclParseCache
+from .llm_provider import LLMProvider
+from .logger_config import get_logger
+from .provider_factory import create_llm_provider
+from .response_cache import ResponseCache
+
+logger = get_logger("run_context")
+
+
+class RunContext:
+    """
+    Run-scoped state shared by every file processed in a single command run.
+    Created once in main() and passed into run_hcl_file_workflow so that
+    expensive resources (e.g. the LLM provider and its client, or the parsed
+    local files) are reused.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        system_config: dict,
+        concurrency: int = 1,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ):
+        self.config = config
+        self.system_config = system_config
+        self.concurrency = concurrency
+        # Failback chunks of each file may be in flight at the same time
+        failback_config = config["input"].get("failback", {})
+        self.max_in_flight = concurrency * failback_config.get("options", {}).get(
+            "max_concurrency", 1
+        )
+        self.response_cache = None
+        self.hcl_cache = None
+        # HCL parsed ahead of time by the parse stage, keyed by file path
+        self.parsed_resources = {}
+        # Markdown shard of each processed file (output.shard_by), keyed by file path
+        self.shard_keys = {}
+        # Run-scoped Markdown writer, set by main() for the duration of the run
+        self.markdown_sink = None
+        self._provider = None
+        self._lock = threading.Lock()
+
+        cache_config = config.get("cache", {})
+        if use_cache and cache_config.get("enabled", False):
+            self.hcl_cache = HclParseCache(cache_config["path"])
+            self.response_cache = ResponseCache(
+                cache_config["path"],
+                ttl_seconds=cache_config["ttl_seconds"],
+                max_size_bytes=int(cache_config["max_size_mb"] * 1024 * 1024),
+                refresh=refresh_cache,
+            )
+        self.shared_inputs = SharedInputs(config, self.hcl_cache)
+
+    @property
+    def provider(self) -> LLMProvider:
+        """
+        Returns the shared LLM provider, creating it on first use.
+        Creation is deferred so that credential errors surface per file,
+        exactly as they did when each file created its own provider.
+        """
+        if self._provider is None:
+            with self._lock:
+                if self._provider is None:
+                    logger.debug(
+                        f"Creating shared LLM provider (max in flight: {self.max_in_flight})"
+                    )
+                    self._provider = create_llm_provider(
+                        self.config,
+                        self.system_config,
+                        concurrency=self.max_in_flight,
+                        response_cache=self.response_cache,
+                    )
+        return self._provider
+
+    def close(self) -> None:
+        """
+        Release run-scoped resources.
+        """
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self._provider is not None:
+            self._provider.close()
@@ -0,0 +1,80 @@
+import json
+import math
+import re
+from collections.abc import Callable
+
+from .logger_config import get_logger
+
+logger = get_logger("token_estimator")
+
+TokenCounter = Callable[[str], int]
+
+# Rough average for English prose and HCL/JSON text on Claude tokenizers
+DEFAULT_CHARS_PER_TOKEN = 4
+
+# Geographic prefix of cross-region inference profile ids, e.g. "us.anthropic..."
+_INFERENCE_PROFILE_PREFIX = re.compile(r"^(?:us|us-gov|eu|apac|ca|jp|au|global)\.")
+
+
+def estimate_tokens(text: str | None) -> int:
+    """
+    Estimate the number of tokens in a text without calling a tokenizer.
+
+    Args:
+        text (str | None): Text to estimate
+
+    Returns:
+        int: Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / DEFAULT_CHARS_PER_TOKEN)
+
+
+def estimate_request_tokens(
+    prompt: str, system_prompt: str, tool_config: dict | None = None
+) -> int:
+    """
+    Estimate the input tokens of a model request.
+
+    Args:
+        prompt (str): User message text
+        system_prompt (str): System prompt text, with modules data already substituted
+        tool_config (dict | None): Tool definition sent with the request
+
+    Returns:
+        int: Estimated input token count
+    """
+    tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt)
+    if tool_config:
+        tokens += estimate_tokens(json.dumps(tool_config, ensure_ascii=False))
+    return tokens
+
+
+def get_input_token_limit(
+    model_id: str, system_config: dict, override: int | None = None
+) -> int | None:
+    """
+    Look up the input token limit of a model.
+    The model id of an ARN and of a cross-region inference profile id
+    (e.g. "us.anthropic...") is looked up. An entry of the limit table matches
+    the exact id, or the id without its ":N" version suffix.
+
+    Args:
+        model_id (str): Model id, inference profile id or ARN
+        system_config (dict): System configuration holding the limit table
+        override (int | None): Explicit limit from the provider settings
+
+    Returns:
+        int | None: The token limit, or None if no limit is known
+    """
+    if override:
+        return override
+    token_limits = system_config.get("constants", {}).get("token_limits", {})
+    models = token_limits.get("models", {})
+    base_id = _INFERENCE_PROFILE_PREFIX.sub("", model_id.rsplit("/", 1)[-1])
+    for candidate in (base_id, base_id.rsplit(":", 1)[0]):
+        if candidate in models:
+            return models[candidate]
+    logger.debug(f"No input token limit known for {model_id}, skipping pre-flight")
+    return token_limits.get("default")
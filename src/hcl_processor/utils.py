@@ -1,8 +1,14 @@
+import json
 import os
+import threading
 import time
 from contextlib import contextmanager
+from copy import deepcopy
 from typing import Generator
 
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
 from .logger_config import (
     get_logger,
     log_operation_failure,
@@ -12,22 +18,12 @@ from .logger_config import (
 
 logger = get_logger("utils")
 
-
-def reset_markdown_file(markdown_path: str) -> bool:
-    """
-    Reset the markdown output file if it exists.
-
-    Args:
-        markdown_path (str): Path to the markdown file to reset
-
-    Returns:
-        bool: True if file was reset, False if file didn't exist
-    """
-    if os.path.exists(markdown_path):
-        logger.info(f"Reset existing markdown file: {markdown_path}")
-        os.remove(markdown_path)
-        return True
-    return False
+# Compiled JSON Schema validators, keyed by the canonical JSON of the schema
+_schema_validators = {}
+# (schema, validator) keyed by id() of every schema object seen; holding the
+# schema keeps its id from being reused by another object
+_schema_validators_by_id = {}
+_schema_validators_lock = threading.Lock()
 
 
 @contextmanager
@@ -78,3 +74,56 @@ def ensure_directory_exists(file_path: str) -> None:
     directory = os.path.dirname(file_path)
     if directory:
         os.makedirs(directory, exist_ok=True)
+
+
+def get_schema_validator(schema: dict):
+    """
+    Return a validator for the schema, built once per distinct schema.
+    The schema is checked against its metaschema only when the validator
+    is first built. Schema objects seen before are looked up by identity
+    without serializing them, so a schema must not be modified once it
+    has been validated against.
+
+    Args:
+        schema (dict): JSON schema
+
+    Returns:
+        jsonschema.protocols.Validator: Validator of the draft the schema declares
+            (the latest draft when it declares none)
+
+    Raises:
+        jsonschema.SchemaError: If the schema itself is invalid
+    """
+    entry = _schema_validators_by_id.get(id(schema))
+    if entry is not None:
+        return entry[1]
+
+    key = json.dumps(schema, sort_keys=True, default=str)
+    validator = _schema_validators.get(key)
+    if validator is None:
+        # Build from a private copy so the validator matches the key
+        private_schema = deepcopy(schema)
+        cls = validator_for(private_schema)
+        cls.check_schema(private_schema)
+        with _schema_validators_lock:
+            validator = _schema_validators.setdefault(key, cls(private_schema))
+    with _schema_validators_lock:
+        _schema_validators_by_id.setdefault(id(schema), (schema, validator))
+    return validator
+
+
+def validate_json_schema(instance, schema: dict) -> None:
+    """
+    Validate an instance like jsonschema.validate, reusing the cached validator.
+
+    Args:
+        instance: Parsed JSON to validate
+        schema (dict): JSON schema
+
+    Raises:
+        jsonschema.ValidationError: If the instance does not match the schema
+        jsonschema.SchemaError: If the schema itself is invalid
+    """
+    error = best_match(get_schema_validator(schema).iter_errors(instance))
+    if error is not None:
+        raise error
@@ -0,0 +1,177 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from hcl_processor.batch_backend import (
+    BatchBackend,
+    BatchJobError,
+    BedrockBatchBackend,
+    LocalBatchBackend,
+    create_batch_backend,
+)
+
+RECORDS = [
+    {"recordId": "00000000", "modelInput": {"prompt": "a"}},
+    {"recordId": "00000001", "modelInput": {"prompt": "fail"}},
+]
+
+
+def responder(model_input):
+    if model_input["prompt"] == "fail":
+        raise ClientError(
+            {"Error": {"Code": "ModelErrorException", "Message": "model error"}},
+            "InvokeModel",
+        )
+    return {"content": [{"type": "text", "text": model_input["prompt"]}]}
+
+
+def test_local_backend_round_trip(tmp_path):
+    backend = LocalBatchBackend(str(tmp_path), responder=responder)
+    results = backend.run(RECORDS)
+    assert results == {
+        "00000000": {"content": [{"type": "text", "text": "a"}]},
+        "00000001": None,
+    }
+    (job_dir,) = tmp_path.iterdir()
+    with open(job_dir / "input.jsonl") as f:
+        assert [json.loads(line) for line in f] == RECORDS
+
+
+def test_local_backend_waits_for_output(tmp_path):
+    backend = LocalBatchBackend(str(tmp_path))
+    job_id = backend.submit(RECORDS)
+    assert backend.status(job_id) == "InProgress"
+    (tmp_path / job_id / "output.jsonl").write_text(
+        json.dumps({"recordId": "00000000", "modelOutput": {"content": []}}) + "\n"
+    )
+    assert backend.status(job_id) == "Completed"
+    assert backend.fetch_results(job_id) == {"00000000": {"content": []}}
+
+
+class StaticBackend(BatchBackend):
+    def __init__(self, statuses, **kwargs):
+        super().__init__(**kwargs)
+        self.statuses = list(statuses)
+
+    def submit(self, records):
+        return "job"
+
+    def status(self, job_id):
+        return self.statuses.pop(0)
+
+    def fetch_results(self, job_id):
+        return {"00000000": {}}
+
+
+@patch("hcl_processor.batch_backend.time.sleep")
+def test_run_polls_until_completed(mock_sleep):
+    backend = StaticBackend(
+        ["Submitted", "InProgress", "Completed"], poll_interval_seconds=5
+    )
+    assert backend.run(RECORDS) == {"00000000": {}}
+    assert mock_sleep.call_count == 2
+
+
+def test_run_raises_on_failed_job():
+    with pytest.raises(BatchJobError):
+        StaticBackend(["Failed"]).run(RECORDS)
+
+
+@patch("hcl_processor.batch_backend.time.sleep")
+def test_run_times_out(mock_sleep):
+    backend = StaticBackend(["InProgress"] * 3, timeout_hours=0)
+    with pytest.raises(TimeoutError):
+        backend.run(RECORDS)
+
+
+def test_bedrock_backend_submit_and_fetch():
+    bedrock = MagicMock()
+    bedrock.create_model_invocation_job.return_value = {
+        "jobArn": "arn:aws:bedrock:us-east-1:123:model-invocation-job/abc123"
+    }
+    s3 = MagicMock()
+    output = "\n".join(
+        json.dumps(line)
+        for line in [
+            {"recordId": "00000000", "modelOutput": {"content": []}},
+            {"recordId": "00000001", "error": {"errorMessage": "bad"}},
+        ]
+    )
+    s3.get_paginator.return_value.paginate.return_value = [
+        {
+            "Contents": [
+                {"Key": "out/abc123/manifest.json.out"},
+                {"Key": "out/abc123/input.jsonl.out"},
+            ]
+        }
+    ]
+    s3.get_object.return_value = {"Body": io.BytesIO(output.encode())}
+    backend = BedrockBatchBackend(
+        bedrock,
+        s3,
+        model_id="anthropic.claude-3-haiku",
+        role_arn="arn:aws:iam::123:role/batch",
+        s3_input_uri="s3://bucket/in",
+        s3_output_uri="s3://bucket/out/",
+    )
+
+    job_id = backend.submit(RECORDS)
+
+    put = s3.put_object.call_args.kwargs
+    assert put["Bucket"] == "bucket" and put["Key"].startswith("in/hcl-processor-")
+    assert [json.loads(line) for line in put["Body"].decode().splitlines()] == RECORDS
+    job = bedrock.create_model_invocation_job.call_args.kwargs
+    assert job["modelId"] == "anthropic.claude-3-haiku"
+    assert job["inputDataConfig"]["s3InputDataConfig"]["s3Uri"] == (
+        f"s3://bucket/{put['Key']}"
+    )
+    assert job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"] == "s3://bucket/out/"
+
+    bedrock.get_model_invocation_job.return_value = {"status": "Completed"}
+    assert backend.status(job_id) == "Completed"
+    assert backend.fetch_results(job_id) == {
+        "00000000": {"content": []},
+        "00000001": None,
+    }
+    s3.get_paginator.return_value.paginate.assert_called_with(
+        Bucket="bucket", Prefix="out/abc123/"
+    )
+    s3.get_object.assert_called_once_with(
+        Bucket="bucket", Key="out/abc123/input.jsonl.out"
+    )
+
+
+def _batch_config(batch):
+    return {"provider_config": {"name": "bedrock", "settings": {"batch": batch}}}
+
+
+def test_create_batch_backend(tmp_path):
+    backend = create_batch_backend(
+        _batch_config({"backend": "local", "local_path": str(tmp_path)}), None
+    )
+    assert isinstance(backend, LocalBatchBackend)
+
+    with pytest.raises(ValueError, match="batch.role_arn"):
+        create_batch_backend(_batch_config({"s3_input_uri": "s3://b/in"}), None)
+
+    provider = MagicMock()
+    provider.model_id = "model"
+    backend = create_batch_backend(
+        _batch_config(
+            {
+                "role_arn": "role",
+                "s3_input_uri": "s3://b/in",
+                "s3_output_uri": "s3://b/out",
+                "poll_interval_seconds": 10,
+            }
+        ),
+        provider,
+    )
+    assert isinstance(backend, BedrockBatchBackend)
+    assert backend.model_id == "model"
+    assert backend.poll_interval_seconds == 10
+    provider.create_aws_client.assert_any_call("bedrock")
+    provider.create_aws_client.assert_any_call("s3")
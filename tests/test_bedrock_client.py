@@ -1,11 +1,13 @@
 import json
 from unittest.mock import MagicMock, patch
 
+import jsonschema
 import pytest
 from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
 
 from hcl_processor.bedrock_client import BedrockProvider
-from hcl_processor.llm_provider import PayloadTooLargeError
+from hcl_processor.llm_provider import PartialOutputError, PayloadTooLargeError
+from hcl_processor.response_cache import ResponseCache
 
 
 def build_config():
@@ -356,3 +358,574 @@ def test_bedrock_provider_object_schema_not_wrapped(mock_session):
     # Verify response is returned as-is
     expected = json.dumps({"monitors": [{"name": "test"}]}, ensure_ascii=False)
     assert result == expected
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_pool_sized_to_concurrency(mock_session):
+    """Test that the client connection pool grows with the configured concurrency."""
+    BedrockProvider(build_config(), build_system_config(), concurrency=32)
+    client_config = mock_session.return_value.client.call_args.kwargs["config"]
+    assert client_config.max_pool_connections == 32
+
+    BedrockProvider(build_config(), build_system_config())
+    client_config = mock_session.return_value.client.call_args.kwargs["config"]
+    assert client_config.max_pool_connections == 10
+
+
+def _tool_use_response(monitors):
+    return {
+        "output": {
+            "message": {
+                "role": "assistant",
+                "content": [
+                    {
+                        "toolUse": {
+                            "toolUseId": "tooluse_test",
+                            "name": "json_validator",
+                            "input": {"monitors": monitors},
+                        }
+                    }
+                ],
+            }
+        }
+    }
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_uses_response_cache(mock_session, tmp_path):
+    """Test that identical requests are served from the response cache."""
+    mock_client = MagicMock()
+    mock_client.converse.return_value = _tool_use_response([{"name": "test"}])
+    mock_session.return_value.client.return_value = mock_client
+
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024 * 1024)
+    provider = BedrockProvider(
+        build_config(), build_system_config(), response_cache=cache
+    )
+
+    first = provider.invoke_single("prompt", "modules_data")
+    second = provider.invoke_single("prompt", "modules_data")
+    assert first == second
+    mock_client.converse.assert_called_once()
+
+    # A different prompt is a different cache key
+    provider.invoke_single("other prompt", "modules_data")
+    assert mock_client.converse.call_count == 2
+    cache.close()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_does_not_cache_invalid_output(mock_session, tmp_path):
+    """Test that responses violating the output schema are not cached."""
+    mock_client = MagicMock()
+    mock_client.converse.return_value = _tool_use_response("not-an-array")
+    mock_session.return_value.client.return_value = mock_client
+
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024 * 1024)
+    provider = BedrockProvider(
+        build_config(), build_system_config(), response_cache=cache
+    )
+
+    provider.invoke_single("prompt", "modules_data")
+    provider.invoke_single("prompt", "modules_data")
+    assert mock_client.converse.call_count == 2
+    cache.close()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_preflight_rejects_oversized_prompt(mock_session):
+    """Test that a prompt over the token limit fails before calling Bedrock."""
+    mock_client = MagicMock()
+    mock_client.converse.return_value = _tool_use_response([{"name": "test"}])
+    mock_session.return_value.client.return_value = mock_client
+
+    config = build_config()
+    config["provider_config"]["settings"]["input_token_limit"] = 500
+    provider = BedrockProvider(config, build_system_config())
+
+    with pytest.raises(PayloadTooLargeError):
+        provider.invoke_single("x" * 4000, "modules_data")
+    mock_client.converse.assert_not_called()
+
+    provider.invoke_single("small prompt", "modules_data")
+    mock_client.converse.assert_called_once()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_ainvoke_single(mock_session):
+    """Test that ainvoke_single runs the request off the event loop."""
+    import asyncio
+    import threading
+
+    mock_client = MagicMock()
+    threads = []
+
+    def converse(**kwargs):
+        threads.append(threading.current_thread())
+        return _tool_use_response([{"name": "test"}])
+
+    mock_client.converse.side_effect = converse
+    mock_session.return_value.client.return_value = mock_client
+    provider = BedrockProvider(build_config(), build_system_config())
+
+    async def run():
+        return await asyncio.gather(
+            provider.ainvoke_single("a", None), provider.ainvoke_single("b", None)
+        )
+
+    results = asyncio.run(run())
+    assert results == [provider.invoke_single("a", None)] * 2
+    assert all(thread is not threading.main_thread() for thread in threads[:2])
+
+
+def _throttling_error():
+    return ClientError(
+        error_response={"Error": {"Code": "ThrottlingException", "Message": "slow"}},
+        operation_name="Converse",
+    )
+
+
+@patch("hcl_processor.bedrock_client.time.sleep")
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_retries_throttles_with_rate_limit(mock_session, mock_sleep):
+    """Test that throttles lower the concurrency limit and are retried."""
+    mock_client = MagicMock()
+    mock_client.converse.side_effect = [
+        _throttling_error(),
+        _tool_use_response([{"name": "test"}]),
+    ]
+    mock_session.return_value.client.return_value = mock_client
+
+    config = build_config()
+    config["provider_config"]["settings"]["rate_limit"] = {"requests_per_minute": 600}
+    provider = BedrockProvider(config, build_system_config(), concurrency=4)
+
+    assert json.loads(provider.invoke_single("prompt", None)) == {
+        "monitors": [{"name": "test"}]
+    }
+    assert mock_client.converse.call_count == 2
+    assert provider.rate_limiter.concurrency.limit == 2
+    mock_sleep.assert_called_once_with(1)
+
+
+@patch("hcl_processor.bedrock_client.time.sleep")
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_throttle_retries_exhausted(mock_session, mock_sleep):
+    """Test that throttles are re-raised once the retries are used up."""
+    mock_client = MagicMock()
+    mock_client.converse.side_effect = _throttling_error()
+    mock_session.return_value.client.return_value = mock_client
+
+    config = build_config()
+    config["provider_config"]["settings"]["rate_limit"] = {"throttle_retries": 1}
+    provider = BedrockProvider(config, build_system_config())
+
+    with pytest.raises(ClientError):
+        provider.invoke_single("prompt", None)
+    assert mock_client.converse.call_count == 2
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_batch_model_input_and_output(mock_session):
+    """Test translation of requests and results for batch inference."""
+    config = build_config()
+    config["provider_config"]["settings"]["output_json"] = {
+        "type": "array",
+        "items": {"type": "object"},
+    }
+    provider = BedrockProvider(config, build_system_config())
+
+    model_input = provider.build_batch_model_input("prompt", "modules")
+    assert model_input["anthropic_version"] == "v1"
+    assert model_input["max_tokens"] == 100
+    assert model_input["messages"] == [
+        {"role": "user", "content": [{"type": "text", "text": "prompt"}]}
+    ]
+    assert model_input["system"].startswith("System default")
+    assert model_input["tools"][0]["name"] == "json_validator"
+    assert model_input["tools"][0]["input_schema"]["properties"]["data"] == {
+        "type": "array",
+        "items": {"type": "object"},
+    }
+    assert model_input["tool_choice"] == {"type": "tool", "name": "json_validator"}
+
+    output = provider.parse_batch_output(
+        {
+            "content": [
+                {
+                    "type": "tool_use",
+                    "name": "json_validator",
+                    "input": {"data": [{"name": "x"}]},
+                }
+            ]
+        }
+    )
+    assert json.loads(output) == [{"name": "x"}]
+    with pytest.raises(json.JSONDecodeError):
+        provider.parse_batch_output({"content": []})
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_prompt_caching(mock_session):
+    """Test cache checkpoints after the system prompt and the shared prefix."""
+    mock_client = MagicMock()
+    response = _tool_use_response([{"name": "test"}])
+    response["usage"] = {
+        "inputTokens": 10,
+        "outputTokens": 5,
+        "cacheReadInputTokens": 300,
+        "cacheWriteInputTokens": 0,
+    }
+    mock_client.converse.return_value = response
+    mock_session.return_value.client.return_value = mock_client
+
+    config = build_config()
+    config["provider_config"]["settings"]["prompt_caching"] = True
+    config["provider_config"]["settings"]["system_prompt"] = "{modules_data}"
+    system_config = build_system_config()
+    system_config["constants"]["bedrock"]["cache_min_tokens"] = 100
+    provider = BedrockProvider(config, system_config)
+
+    modules = "m" * 400
+    request = provider.build_request("locals\nresource", modules, "locals\n")
+    assert request["system"][1] == {"cachePoint": {"type": "default"}}
+    assert request["messages"][0]["content"] == [
+        {"text": "locals\n"},
+        {"cachePoint": {"type": "default"}},
+        {"text": "resource"},
+    ]
+    # The prefix must be byte-identical across requests sharing it
+    other = provider.build_request("locals\nother", modules, "locals\n")
+    assert other["system"] == request["system"]
+    assert other["messages"][0]["content"][:2] == request["messages"][0]["content"][:2]
+
+    # Prefixes below the minimum are not marked
+    small = provider.build_request("locals\nresource", "m", "locals\n")
+    assert small["system"] == [{"text": "System default\nm"}]
+    assert small["messages"][0]["content"] == [{"text": "locals\nresource"}]
+
+    provider.invoke_single("locals\nresource", modules, "locals\n")
+    provider.invoke_single("locals\nother", modules, "locals\n")
+    assert provider.usage == {
+        "inputTokens": 20,
+        "outputTokens": 10,
+        "cacheReadInputTokens": 600,
+        "cacheWriteInputTokens": 0,
+    }
+    # Batch records carry only the text blocks
+    model_input = provider.build_batch_model_input("locals\nresource", modules)
+    assert model_input["system"] == "System default\n" + modules
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_prompt_caching_disabled(mock_session):
+    """Test that requests carry no cache checkpoints by default."""
+    provider = BedrockProvider(build_config(), build_system_config())
+    request = provider.build_request("locals\nresource", "m" * 10000, "locals\n")
+    assert request["system"] == [{"text": "System default\nTest system prompt"}]
+    assert request["messages"][0]["content"] == [{"text": "locals\nresource"}]
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_reuses_request_template(mock_session):
+    """Test that request-invariant parts are built once per provider."""
+    with patch.object(
+        BedrockProvider,
+        "_build_tool_config",
+        autospec=True,
+        side_effect=BedrockProvider._build_tool_config,
+    ) as mock_build_tool_config:
+        provider = BedrockProvider(build_config(), build_system_config())
+        first = provider.build_request("a", "modules")
+        second = provider.build_request("b", "modules")
+    mock_build_tool_config.assert_called_once()
+    assert first["toolConfig"] is second["toolConfig"]
+    assert first["inferenceConfig"] is second["inferenceConfig"]
+    # The modules substitution is reused for the same modules payload
+    assert first["system"] is second["system"]
+    assert first["messages"][0]["content"] == [{"text": "a"}]
+    assert second["messages"][0]["content"] == [{"text": "b"}]
+
+    third = provider.build_request("a", "other modules")
+    assert third["system"] == [{"text": "System default\nTest system prompt"}]
+    assert third["system"] is not first["system"]
+
+
+def _stream_events(tool_input_chunks, stop_reason="tool_use"):
+    events = [
+        {"messageStart": {"role": "assistant"}},
+        {
+            "contentBlockStart": {
+                "start": {
+                    "toolUse": {"toolUseId": "tooluse_test", "name": "json_validator"}
+                }
+            }
+        },
+    ]
+    events.extend(
+        {"contentBlockDelta": {"delta": {"toolUse": {"input": chunk}}}}
+        for chunk in tool_input_chunks
+    )
+    events.extend(
+        [
+            {"contentBlockStop": {}},
+            {"messageStop": {"stopReason": stop_reason}},
+            {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 20}}},
+        ]
+    )
+    return events
+
+
+def _streaming_provider(mock_session, events):
+    stream = MagicMock()
+    stream.__iter__.return_value = iter(events)
+    mock_client = MagicMock()
+    mock_client.converse_stream.return_value = {"stream": stream}
+    mock_session.return_value.client.return_value = mock_client
+
+    config = build_config()
+    config["provider_config"]["settings"]["streaming"] = True
+    config["provider_config"]["settings"]["output_json"] = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"monitor_name": {"type": "string"}},
+            "required": ["monitor_name"],
+        },
+    }
+    return BedrockProvider(config, build_system_config()), mock_client, stream
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_streaming(mock_session):
+    """Test that converse_stream events are assembled into the tool input."""
+    provider, mock_client, _ = _streaming_provider(
+        mock_session,
+        _stream_events(
+            ['{"data": [{"monitor_', 'name": "a"}, {"monitor_name": "b"}]}']
+        ),
+    )
+
+    result = provider.invoke_single("prompt", "modules_data")
+
+    assert json.loads(result) == [{"monitor_name": "a"}, {"monitor_name": "b"}]
+    mock_client.converse.assert_not_called()
+    assert "toolConfig" in mock_client.converse_stream.call_args.kwargs
+    assert provider.usage["outputTokens"] == 20
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_streaming_aborts_on_invalid_item(mock_session):
+    """Test that the stream is abandoned at the first item violating the items schema."""
+    events = _stream_events(
+        [
+            '{"data": [{"monitor_name": "a"}, ',
+            '{"other": 1}, ',
+            '{"monitor_name": "c"}]}',
+        ]
+    )
+    provider, _, stream = _streaming_provider(mock_session, events)
+    consumed = []
+    stream.__iter__.return_value = (consumed.append(event) or event for event in events)
+
+    with pytest.raises(jsonschema.ValidationError) as excinfo:
+        provider.invoke_single("prompt", "modules_data")
+
+    stream.close.assert_called_once()
+    # The remaining deltas are never read
+    assert len(consumed) == 4
+    # The items validated before the abort are kept for the salvage path
+    assert isinstance(excinfo.value, PartialOutputError)
+    assert excinfo.value.items == [{"monitor_name": "a"}]
+    assert len(excinfo.value.issues) == 1
+
+
+def _array_provider(
+    mock_session, responses, max_continuations=None, input_token_limit=None
+):
+    mock_client = MagicMock()
+    mock_client.converse.side_effect = responses
+    mock_session.return_value.client.return_value = mock_client
+    config = build_config()
+    config["provider_config"]["settings"]["output_json"] = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"monitor_name": {"type": "string"}},
+            "required": ["monitor_name"],
+        },
+    }
+    if max_continuations is not None:
+        config["provider_config"]["settings"]["max_continuations"] = max_continuations
+    if input_token_limit is not None:
+        config["provider_config"]["settings"]["input_token_limit"] = input_token_limit
+    return BedrockProvider(config, build_system_config()), mock_client
+
+
+def _tool_response(tool_input, stop_reason="tool_use"):
+    return {
+        "output": {
+            "message": {
+                "role": "assistant",
+                "content": [
+                    {
+                        "toolUse": {
+                            "toolUseId": "tooluse_test",
+                            "name": "json_validator",
+                            "input": tool_input,
+                        }
+                    }
+                ],
+            }
+        },
+        "stopReason": stop_reason,
+        "usage": {"inputTokens": 10, "outputTokens": 100},
+    }
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_continues_output_cut_off_at_max_tokens(mock_session):
+    """Test that a truncated array output is completed by a continuation request."""
+    provider, mock_client = _array_provider(
+        mock_session,
+        [
+            _tool_response(
+                '{"data": [{"monitor_name": "a"}, {"monitor_name": "b"}, {"monit',
+                "max_tokens",
+            ),
+            _tool_response({"data": [{"monitor_name": "c"}]}),
+        ],
+    )
+
+    result = provider.invoke_single("prompt", "modules_data")
+
+    assert json.loads(result) == [
+        {"monitor_name": "a"},
+        {"monitor_name": "b"},
+        {"monitor_name": "c"},
+    ]
+    assert mock_client.converse.call_count == 2
+    messages = mock_client.converse.call_args.kwargs["messages"]
+    assert messages[0] == {"role": "user", "content": [{"text": "prompt"}]}
+    replayed = messages[1]["content"][0]["toolUse"]
+    assert replayed["input"] == {"data": [{"monitor_name": "a"}, {"monitor_name": "b"}]}
+    tool_result = messages[2]["content"][0]["toolResult"]
+    assert tool_result["toolUseId"] == replayed["toolUseId"]
+    assert "after the 2 items" in tool_result["content"][0]["text"]
+    assert provider.usage["outputTokens"] == 200
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_output_still_cut_off_triggers_failback(mock_session):
+    """Test that failback is left to the caller when continuations do not finish."""
+    truncated = '{"data": [{"monitor_name": "a"}, {"monit'
+    provider, mock_client = _array_provider(
+        mock_session,
+        [_tool_response(truncated, "max_tokens")] * 2,
+        max_continuations=1,
+    )
+
+    with pytest.raises(PayloadTooLargeError):
+        provider.invoke_single("prompt", "modules_data")
+    assert mock_client.converse.call_count == 2
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_output_cut_off_without_items_triggers_failback(mock_session):
+    """Test that no continuation is sent when the truncated output has no complete item."""
+    provider, mock_client = _array_provider(
+        mock_session, [_tool_response('{"data": [{"monit', "max_tokens")]
+    )
+
+    with pytest.raises(PayloadTooLargeError):
+        provider.invoke_single("prompt", "modules_data")
+    mock_client.converse.assert_called_once()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_streaming_output_cut_off_at_max_tokens(mock_session):
+    """Test that the complete items of a truncated stream are kept for the continuation."""
+    provider, mock_client, _ = _streaming_provider(
+        mock_session,
+        _stream_events(['{"data": [{"monitor_name": "a"}, {"monitor_na'], "max_tokens"),
+    )
+    continuation = MagicMock()
+    continuation.__iter__.return_value = iter(
+        _stream_events(['{"data": [{"monitor_name": "b"}]}'])
+    )
+    first = mock_client.converse_stream.return_value
+    mock_client.converse_stream.side_effect = [first, {"stream": continuation}]
+
+    result = provider.invoke_single("prompt", "modules_data")
+
+    assert json.loads(result) == [{"monitor_name": "a"}, {"monitor_name": "b"}]
+    mock_client.converse.assert_not_called()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_invoke_remaining(mock_session):
+    """Test that salvaged items are replayed and only the missing ones are requested."""
+    provider, mock_client = _array_provider(
+        mock_session, [_tool_response({"data": [{"monitor_name": "b"}]})]
+    )
+
+    result = provider.invoke_remaining(
+        "prompt", "modules_data", [{"monitor_name": "a"}], ["item 1 is invalid"]
+    )
+
+    assert json.loads(result) == [{"monitor_name": "b"}]
+    messages = mock_client.converse.call_args.kwargs["messages"]
+    assert messages[0] == {"role": "user", "content": [{"text": "prompt"}]}
+    assert messages[1]["content"][0]["toolUse"]["input"] == {
+        "data": [{"monitor_name": "a"}]
+    }
+    tool_result = messages[2]["content"][0]["toolResult"]
+    assert "- item 1 is invalid" in tool_result["content"][0]["text"]
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_invoke_remaining_payload_too_large(mock_session):
+    """Test that size errors of the re-request are translated for failback."""
+    provider, mock_client = _array_provider(mock_session, [])
+    mock_client.converse.side_effect = ClientError(
+        {
+            "Error": {
+                "Code": "ValidationException",
+                "Message": "Input token size exceeds limit",
+            }
+        },
+        "Converse",
+    )
+
+    with pytest.raises(PayloadTooLargeError):
+        provider.invoke_remaining(
+            "prompt", "modules_data", [{"monitor_name": "a"}], ["item 1 is invalid"]
+        )
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_invoke_remaining_counts_replayed_items(mock_session):
+    """Test that the pre-flight size check includes the replayed items."""
+    provider, mock_client = _array_provider(mock_session, [], input_token_limit=500)
+    items = [{"monitor_name": "x" * 40} for _ in range(100)]
+
+    with pytest.raises(PayloadTooLargeError):
+        provider.invoke_remaining("prompt", "modules_data", items, ["issue"])
+    mock_client.converse.assert_not_called()
+
+
+@patch("hcl_processor.bedrock_client.boto3.Session")
+def test_bedrock_provider_estimate_request_tokens(mock_session):
+    """Test that request estimates include the system prompt with the modules."""
+    config = build_config()
+    settings = config["provider_config"]["settings"]
+    settings["system_prompt"] = "Modules:\n{modules_data}"
+    settings["input_token_limit"] = 500
+    provider = BedrockProvider(config, build_system_config())
+
+    prompt_only = provider.estimate_request_tokens("prompt", None)
+    with_modules = provider.estimate_request_tokens("prompt", "m" * 4000)
+
+    assert prompt_only > 2
+    assert with_modules >= prompt_only + 1000
+    assert provider.input_token_limit == 500
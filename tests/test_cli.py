@@ -1,5 +1,7 @@
 import sys
 
+import pytest
+
 from hcl_processor.cli import parse_args
 
 
@@ -19,3 +21,67 @@ def test_parse_args_without_debug(monkeypatch):
     args = parse_args()
     assert args.config_file == "config.yaml"
     assert args.debug is False
+
+
+def test_parse_args_with_jobs(monkeypatch):
+    """Test parse_args with concurrent jobs"""
+    test_args = ["prog", "--config_file", "config.yaml", "--jobs", "4"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    args = parse_args()
+    assert args.jobs == 4
+
+
+def test_parse_args_rejects_non_positive_jobs(monkeypatch):
+    """Test parse_args rejects --jobs values below 1"""
+    test_args = ["prog", "--config_file", "config.yaml", "--jobs", "0"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    with pytest.raises(SystemExit):
+        parse_args()
+
+
+def test_parse_args_cache_flags(monkeypatch):
+    """Test parse_args cache control flags"""
+    test_args = ["prog", "--config_file", "config.yaml"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    args = parse_args()
+    assert args.no_cache is False
+    assert args.refresh_cache is False
+
+    monkeypatch.setattr(sys, "argv", test_args + ["--no-cache", "--refresh-cache"])
+    args = parse_args()
+    assert args.no_cache is True
+    assert args.refresh_cache is True
+
+
+def test_parse_args_incremental(monkeypatch):
+    """Test parse_args incremental flag"""
+    test_args = ["prog", "--config_file", "config.yaml", "--incremental"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    args = parse_args()
+    assert args.incremental is True
+
+
+def test_parse_args_parse_jobs(monkeypatch):
+    """Test parse_args with parse worker processes"""
+    test_args = ["prog", "--config_file", "config.yaml", "--parse-jobs", "8"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    args = parse_args()
+    assert args.parse_jobs == 8
+
+
+def test_parse_args_async(monkeypatch):
+    """Test parse_args async flag"""
+    test_args = ["prog", "--config_file", "config.yaml"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    assert parse_args().use_async is False
+    monkeypatch.setattr(sys, "argv", test_args + ["--async"])
+    assert parse_args().use_async is True
+
+
+def test_parse_args_batch(monkeypatch):
+    """Test parse_args batch flag"""
+    test_args = ["prog", "--config_file", "config.yaml"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    assert parse_args().batch is False
+    monkeypatch.setattr(sys, "argv", test_args + ["--batch"])
+    assert parse_args().batch is True
@@ -149,6 +149,29 @@ class TestConfigLoader(unittest.TestCase):
         # Verify internal normalization still happens
         self.assertEqual(config["provider_config"]["name"], "bedrock")
 
+    def test_cache_config_defaults_and_overrides(self):
+        config_data = self._get_base_bedrock_config()
+        config_data["cache"] = {"path": "/tmp/hcl-cache"}
+        self._write_config(config_data)
+
+        config = load_config(self.config_path)
+
+        # User values are kept and missing keys fall back to defaults
+        self.assertEqual(config["cache"]["path"], "/tmp/hcl-cache")
+        self.assertEqual(
+            config["cache"]["ttl_seconds"],
+            get_default_config()["cache"]["ttl_seconds"],
+        )
+        self.assertTrue(config["cache"]["enabled"])
+
+    def test_cache_config_rejects_unknown_keys(self):
+        config_data = self._get_base_bedrock_config()
+        config_data["cache"] = {"size": 1}
+        self._write_config(config_data)
+
+        with self.assertRaisesRegex(ValueError, "Invalid configuration"):
+            load_config(self.config_path)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,23 @@
+import json
+import threading
+import time
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
 
 from hcl_processor.file_processor import (
+    SharedInputs,
+    _execute_failback_strategy,
+    _write_output_files,
+    arun_hcl_file_workflow,
     get_modules_name,
+    get_shard_key,
+    parse_hcl_file,
     read_local_files,
     read_tf_file,
     run_hcl_file_workflow,
 )
-from hcl_processor.llm_provider import PayloadTooLargeError
+from hcl_processor.llm_provider import PartialOutputError, PayloadTooLargeError
 
 
 def test_read_tf_file_exists(tmp_path):
@@ -60,6 +69,34 @@ def test_get_modules_name_not_found():
         get_modules_name(resource_dict)
 
 
+def test_get_shard_key(tmp_path):
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    file_path = str(tmp_path / "envs" / "prod" / "main.tf")
+    module_dict = {"module": [{'"datadog"': {"monitors": {}}}]}
+
+    assert (
+        get_shard_key(file_path, "module", system_config, str(tmp_path), module_dict)
+        == "datadog"
+    )
+    # Files without a module name, or not parsed, fall back to their directory
+    assert (
+        get_shard_key(
+            file_path, "module", system_config, str(tmp_path), {"locals": [{}]}
+        )
+        == "envs/prod"
+    )
+    assert get_shard_key(file_path, "module", system_config, str(tmp_path)) == (
+        "envs/prod"
+    )
+    assert (
+        get_shard_key(file_path, "directory", system_config, str(tmp_path), module_dict)
+        == "envs/prod"
+    )
+    assert get_shard_key("main.tf", "directory", system_config) == "."
+
+
 @patch("hcl_processor.file_processor.open", new_callable=mock_open)
 @patch("hcl_processor.file_processor.os.makedirs")
 @patch(
@@ -95,10 +132,34 @@ def test_run_hcl_file_workflow_success(
         patch("hcl_processor.file_processor.output_md") as mock_output_md,
     ):
         run_hcl_file_workflow(str(file_path), config, system_config)
-        mock_output_md.assert_called()
+        # The validated result is handed to the renderer in memory
+        mock_output_md.assert_called_once_with(
+            "test", {"validated": True}, config, None
+        )
         mock_provider_instance.invoke_single.assert_called_once()
 
 
+def test_write_output_files_keep_json(tmp_path):
+    config = {
+        "output": {
+            "json_path": str(tmp_path / "out" / "result.json"),
+            "markdown_path": str(tmp_path / "result.md"),
+            "keep_json": True,
+        },
+        "schema_columns": ["name"],
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    section = _write_output_files(
+        [{"name": "a"}], "dir/main.tf", config, system_config, buffer_output=True
+    )
+
+    assert "| a |" in section
+    with open(tmp_path / "out" / "result.dir.main.json") as f:
+        assert json.load(f) == [{"name": "a"}]
+    assert not (tmp_path / "out" / "result.json").exists()
+
+
 @patch("hcl_processor.file_processor.read_tf_file", return_value=(None, None))
 def test_run_hcl_file_workflow_file_not_found(mock_read_tf):
     config = {
@@ -522,3 +583,734 @@ def test_empty_result_triggers_failback(
         run_hcl_file_workflow(str(file_path), config, system_config)
         mock_output_md.assert_called()
         assert mock_provider_instance.invoke_single.call_count > 1
+
+
+@patch("hcl_processor.file_processor.create_llm_provider")
+@patch("hcl_processor.file_processor.hcl2.loads", return_value={"resource": []})
+def test_run_hcl_file_workflow_buffer_output_returns_section(
+    mock_hcl2, mock_create_llm_provider, tmp_path
+):
+    """Test that buffered mode renders in memory without touching output files"""
+    file_path = tmp_path / "sample.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+        },
+        "output": {
+            "json_path": str(tmp_path / "out.json"),
+            "markdown_path": str(tmp_path / "out.md"),
+        },
+        "schema_columns": ["name"],
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    mock_provider_instance = MagicMock()
+    mock_provider_instance.invoke_single.return_value = '[{"name": "alert"}]'
+    mock_provider_instance.output_schema = {"type": "array"}
+    mock_create_llm_provider.return_value = mock_provider_instance
+
+    section = run_hcl_file_workflow(
+        str(file_path), config, system_config, buffer_output=True
+    )
+
+    assert "#### sample" in section
+    assert "| alert |" in section
+    assert not (tmp_path / "out.json").exists()
+    assert not (tmp_path / "out.md").exists()
+
+
+@patch("hcl_processor.file_processor.create_llm_provider")
+@patch("hcl_processor.file_processor.hcl2.loads", return_value={"resource": []})
+@patch("hcl_processor.file_processor.output_md")
+def test_run_hcl_file_workflow_uses_context_provider(
+    mock_output_md, mock_hcl2, mock_create_llm_provider, tmp_path
+):
+    """Test that a run context's provider is reused instead of creating one"""
+    file_path = tmp_path / "test.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.provider.invoke_single.return_value = "[]"
+    with patch(
+        "hcl_processor.file_processor.validate_output_json",
+        return_value=[{"name": "a"}],
+    ):
+        run_hcl_file_workflow(str(file_path), config, system_config, context=context)
+
+    mock_create_llm_provider.assert_not_called()
+    context.provider.invoke_single.assert_called_once()
+
+
+@patch("hcl_processor.file_processor.hcl2.loads", return_value={"resource": []})
+@patch("hcl_processor.file_processor.output_md")
+def test_run_hcl_file_workflow_salvages_valid_items(
+    mock_output_md, mock_hcl2, tmp_path
+):
+    """Test that only the missing items of a rejected response are re-requested"""
+    file_path = tmp_path / "test.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": True},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.provider.output_schema = {
+        "type": "array",
+        "items": {"type": "object", "required": ["name"]},
+    }
+    # One invalid item, and the output ends early
+    context.provider.invoke_single.return_value = '[{"name": "a"}, {"id": 2}, {"name"'
+    context.provider.invoke_remaining.return_value = '[{"name": "b"}, {"name": "c"}]'
+
+    run_hcl_file_workflow(str(file_path), config, system_config, context=context)
+
+    context.provider.invoke_single.assert_called_once()
+    _, _, items, issues = context.provider.invoke_remaining.call_args.args
+    assert items == [{"name": "a"}]
+    assert len(issues) == 2
+    assert mock_output_md.call_args.args[1] == [
+        {"name": "a"},
+        {"name": "b"},
+        {"name": "c"},
+    ]
+
+
+@patch("hcl_processor.file_processor.hcl2.loads", return_value={"resource": []})
+@patch("hcl_processor.file_processor.output_md")
+def test_run_hcl_file_workflow_salvages_abandoned_stream(
+    mock_output_md, mock_hcl2, tmp_path
+):
+    """Test that the items of an abandoned streamed response are salvaged"""
+    file_path = tmp_path / "test.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": True},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.provider.output_schema = {"type": "array"}
+    context.provider.invoke_single.side_effect = PartialOutputError(
+        "abandoned", [{"name": "a"}], ["item 1 is invalid"]
+    )
+    context.provider.invoke_remaining.return_value = '[{"name": "b"}]'
+
+    run_hcl_file_workflow(str(file_path), config, system_config, context=context)
+
+    _, _, items, issues = context.provider.invoke_remaining.call_args.args
+    assert items == [{"name": "a"}]
+    assert issues == ["item 1 is invalid"]
+    assert mock_output_md.call_args.args[1] == [{"name": "a"}, {"name": "b"}]
+
+
+@patch("hcl_processor.file_processor.hcl2.loads", return_value={"resource": []})
+@patch("hcl_processor.file_processor._execute_failback_strategy", return_value=[])
+def test_run_hcl_file_workflow_failed_rerequest_triggers_failback(
+    mock_failback, mock_hcl2, tmp_path
+):
+    """Test that failback still runs when re-requesting the missing items fails"""
+    file_path = tmp_path / "test.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": True, "type": "resource"},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.provider.output_schema = {
+        "type": "array",
+        "items": {"type": "object", "required": ["name"]},
+    }
+    context.provider.invoke_single.return_value = '[{"name": "a"}, {"id": 2}]'
+    context.provider.invoke_remaining.side_effect = RuntimeError("connection reset")
+
+    run_hcl_file_workflow(str(file_path), config, system_config, context=context)
+
+    mock_failback.assert_called_once()
+
+
+@patch(
+    "hcl_processor.file_processor.hcl2.loads",
+    return_value={"module": [{'"datadog"': {"monitors": {}}}]},
+)
+@patch("hcl_processor.file_processor.output_md")
+def test_run_hcl_file_workflow_records_shard_key(mock_output_md, mock_hcl2, tmp_path):
+    """Test that the shard is taken from the HCL the workflow already parsed"""
+    file_path = tmp_path / "test.tf"
+    file_path.write_text("content")
+    config = {
+        "input": {
+            "resource_data": {"folder": str(tmp_path)},
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+        },
+        "output": {"json_path": str(tmp_path / "out.json"), "shard_by": "module"},
+    }
+    system_config = {
+        "constants": {
+            "file_processing": {
+                "terraform_extension": ".tf",
+                "default_search_resource": "monitors",
+            }
+        }
+    }
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.parsed_resources = {}
+    context.shard_keys = {}
+    context.provider.invoke_single.return_value = '[{"name": "a"}]'
+    context.provider.output_schema = {"type": "array"}
+
+    run_hcl_file_workflow(str(file_path), config, system_config, context=context)
+
+    assert context.shard_keys == {str(file_path): "datadog"}
+    mock_hcl2.assert_called_once()
+
+
+def _shared_inputs_config(tmp_path, modules_enabled=True):
+    locals_path = tmp_path / "locals.tf"
+    locals_path.write_text('locals {\n  env = "dev"\n}\n')
+    modules_path = tmp_path / "main.tf"
+    modules_path.write_text("module content")
+    return {
+        "input": {
+            "local_files": [{"dev": str(locals_path)}],
+            "modules": {"enabled": modules_enabled, "path": str(modules_path)},
+        }
+    }
+
+
+def test_shared_inputs_parse_local_files_once(tmp_path):
+    """Test that local files are parsed once however many files use them"""
+    shared = SharedInputs(_shared_inputs_config(tmp_path))
+    with patch(
+        "hcl_processor.file_processor.hcl2.loads", return_value={"locals": []}
+    ) as mock_hcl2:
+        first = shared.locals_str()
+        for _ in range(5):
+            assert shared.locals_str() is first
+    mock_hcl2.assert_called_once()
+    assert shared.modules_raw() == "module content"
+
+
+def test_shared_inputs_reload_on_mtime_change(tmp_path):
+    """Test that edits to the shared files are picked up"""
+    import os
+
+    config = _shared_inputs_config(tmp_path)
+    shared = SharedInputs(config)
+    assert "dev" in shared.locals_str()
+    assert shared.modules_raw() == "module content"
+
+    locals_path = config["input"]["local_files"][0]["dev"]
+    with open(locals_path, "w") as f:
+        f.write('locals {\n  env = "changed"\n}\n')
+    modules_path = config["input"]["modules"]["path"]
+    with open(modules_path, "w") as f:
+        f.write("new module content")
+    stat = os.stat(locals_path)
+    os.utime(locals_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.utime(modules_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert "changed" in shared.locals_str()
+    assert shared.modules_raw() == "new module content"
+
+
+def test_shared_inputs_modules_disabled(tmp_path):
+    """Test that the modules file is not read when modules are disabled"""
+    shared = SharedInputs(_shared_inputs_config(tmp_path, modules_enabled=False))
+    assert shared.modules_raw() is None
+
+
+def test_parse_hcl_file(tmp_path):
+    """Test the process pool parse worker"""
+    import hcl2
+
+    content = 'locals {\n  name = "a"\n}\n'
+    file_path = tmp_path / "a.tf"
+    file_path.write_text(content)
+    assert parse_hcl_file(str(file_path)) == hcl2.loads(content)
+    # With a cache directory the result is persisted for the next run
+    assert parse_hcl_file(str(file_path), str(tmp_path / "cache")) == hcl2.loads(
+        content
+    )
+    assert (tmp_path / "cache" / "hcl").is_dir()
+
+
+@patch("hcl_processor.file_processor.create_llm_provider")
+@patch("hcl_processor.file_processor.hcl2.loads")
+@patch("hcl_processor.file_processor.output_md")
+def test_run_hcl_file_workflow_uses_pre_parsed_hcl(
+    mock_output_md, mock_hcl2, mock_create_llm_provider, tmp_path
+):
+    """Test that HCL parsed by the parse stage is not read or parsed again"""
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+
+    context = MagicMock()
+    context.hcl_cache = None
+    context.shared_inputs.locals_str.return_value = "locals"
+    context.parsed_resources = {"missing.tf": {"resource": [{"pre": "parsed"}]}}
+    context.provider.invoke_single.return_value = "[]"
+    with patch(
+        "hcl_processor.file_processor.validate_output_json",
+        return_value=[{"name": "a"}],
+    ):
+        run_hcl_file_workflow("missing.tf", config, system_config, context=context)
+
+    mock_hcl2.assert_not_called()
+    prompt = context.provider.invoke_single.call_args.args[0]
+    assert "'pre': 'parsed'" in prompt
+    assert context.parsed_resources == {}
+
+
+def test_shared_inputs_use_primed_local_files(tmp_path):
+    """Test that local files parsed elsewhere are not parsed again"""
+    config = _shared_inputs_config(tmp_path)
+    locals_path = config["input"]["local_files"][0]["dev"]
+    shared = SharedInputs(config)
+    shared.prime_locals({locals_path: {"locals": [{"env": "primed"}]}})
+    with patch("hcl_processor.file_processor.hcl2.loads") as mock_hcl2:
+        assert "primed" in shared.locals_str()
+    mock_hcl2.assert_not_called()
+
+
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_failback_concurrent_chunks_keep_order(mock_validate):
+    """Concurrent failback chunks are reassembled in chunk order and failures are skipped"""
+    mock_validate.side_effect = lambda output, schema: json.loads(output)
+    config = {
+        "input": {
+            "failback": {
+                "enabled": True,
+                "type": "module",
+                "options": {"target": "monitors", "max_concurrency": 4},
+            },
+        },
+    }
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    resource_dict = {
+        "module": [{"mod": {"monitors": [{"m": i} for i in range(4)]}}],
+    }
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def invoke(combined_str, modules_raw, cache_prefix=None):
+        nonlocal active, peak
+        index = int(combined_str.split("'m': ")[1][0])
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Later chunks finish first
+        time.sleep(0.02 * (4 - index))
+        with lock:
+            active -= 1
+        if index == 2:
+            raise RuntimeError("chunk failed")
+        return json.dumps([{"chunk": index}])
+
+    provider = MagicMock()
+    provider.invoke_single.side_effect = invoke
+
+    with patch("hcl_processor.file_processor.get_modules_name", return_value="mod"):
+        result = _execute_failback_strategy(
+            resource_dict, "locals", None, config, system_config, provider
+        )
+
+    assert result == [{"chunk": 0}, {"chunk": 1}, {"chunk": 3}]
+    assert provider.invoke_single.call_count == 4
+    assert peak > 1
+
+
+def _adaptive_config(budget):
+    return {
+        "input": {
+            "failback": {
+                "enabled": True,
+                "type": "module",
+                "options": {"target": "monitors", "batch_token_budget": budget},
+            },
+        },
+    }
+
+
+def _adaptive_provider(max_batch):
+    """Provider that rejects prompts holding more than max_batch resources"""
+
+    def invoke(combined_str, modules_raw, cache_prefix=None):
+        indexes = [int(part[0]) for part in combined_str.split("'m': ")[1:]]
+        if len(indexes) > max_batch:
+            raise PayloadTooLargeError("too large")
+        return json.dumps([{"chunk": i} for i in indexes])
+
+    return _budgeted_provider(invoke)
+
+
+def _budgeted_provider(invoke, base_tokens=1, input_token_limit=None):
+    """Provider whose requests cost base_tokens before any resource"""
+    provider = MagicMock()
+    provider.invoke_single.side_effect = invoke
+    provider.estimate_request_tokens.return_value = base_tokens
+    provider.input_token_limit = input_token_limit
+    return provider
+
+
+@patch("hcl_processor.file_processor.get_modules_name", return_value="mod")
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_failback_adaptive_batches_pack_and_bisect(mock_validate, mock_get_module):
+    """Resources are packed under the token budget and batches are halved on PayloadTooLargeError"""
+    mock_validate.side_effect = lambda output, schema: json.loads(output)
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    resource_dict = {
+        "module": [{"mod": {"monitors": [{"m": i} for i in range(8)]}}],
+    }
+    provider = _adaptive_provider(max_batch=4)
+
+    result = _execute_failback_strategy(
+        resource_dict,
+        "locals",
+        None,
+        _adaptive_config(100),
+        system_config,
+        provider,
+        token_counter=lambda text: 1,
+    )
+
+    assert result == [{"chunk": i} for i in range(8)]
+    # 8 resources rejected, then two batches of 4 instead of 8 single calls
+    assert provider.invoke_single.call_count == 3
+
+
+@patch("hcl_processor.file_processor.get_modules_name", return_value="mod")
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_failback_adaptive_batches_respect_budget(mock_validate, mock_get_module):
+    """A batch never exceeds the token budget, and a lone failing resource is skipped"""
+    mock_validate.side_effect = lambda output, schema: json.loads(output)
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    resource_dict = {
+        "module": [{"mod": {"monitors": [{"m": i} for i in range(5)]}}],
+    }
+    prompts = []
+
+    def invoke(combined_str, modules_raw, cache_prefix=None):
+        prompts.append(combined_str)
+        indexes = [int(part[0]) for part in combined_str.split("'m': ")[1:]]
+        if 4 in indexes:
+            raise PayloadTooLargeError("too large")
+        return json.dumps([{"chunk": i} for i in indexes])
+
+    provider = _budgeted_provider(invoke)
+
+    # locals costs 1 token and each resource 1 token: at most 2 resources per batch
+    result = _execute_failback_strategy(
+        resource_dict,
+        "locals",
+        None,
+        _adaptive_config(3),
+        system_config,
+        provider,
+        token_counter=lambda text: 1,
+    )
+
+    assert result == [{"chunk": i} for i in range(4)]
+    assert all(prompt.count("'m': ") <= 2 for prompt in prompts)
+
+
+@patch("hcl_processor.file_processor.get_modules_name", return_value="mod")
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_failback_adaptive_batches_run_concurrently(mock_validate, mock_get_module):
+    """With max_concurrency, packed batches are sent concurrently and keep resource order"""
+    mock_validate.side_effect = lambda output, schema: json.loads(output)
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    resource_dict = {
+        "module": [{"mod": {"monitors": [{"m": i} for i in range(8)]}}],
+    }
+    config = _adaptive_config(3)
+    config["input"]["failback"]["options"]["max_concurrency"] = 4
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def invoke(combined_str, modules_raw, cache_prefix=None):
+        nonlocal active, peak
+        indexes = [int(part[0]) for part in combined_str.split("'m': ")[1:]]
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Later batches finish first
+        time.sleep(0.01 * (8 - indexes[0]))
+        with lock:
+            active -= 1
+        return json.dumps([{"chunk": i} for i in indexes])
+
+    provider = _budgeted_provider(invoke)
+
+    # At most 2 resources per batch: 4 batches
+    result = _execute_failback_strategy(
+        resource_dict,
+        "locals",
+        None,
+        config,
+        system_config,
+        provider,
+        token_counter=lambda text: 1,
+    )
+
+    assert result == [{"chunk": i} for i in range(8)]
+    assert provider.invoke_single.call_count == 4
+    assert peak > 1
+
+
+@patch("hcl_processor.file_processor.get_modules_name", return_value="mod")
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_failback_adaptive_batches_count_the_whole_request(
+    mock_validate, mock_get_module
+):
+    """The system prompt and modules sent with every batch count against the budget"""
+    mock_validate.side_effect = lambda output, schema: json.loads(output)
+    system_config = {
+        "constants": {"file_processing": {"default_search_resource": "monitors"}}
+    }
+    resource_dict = {
+        "module": [{"mod": {"monitors": [{"m": i} for i in range(8)]}}],
+    }
+    prompts = []
+
+    def invoke(combined_str, modules_raw, cache_prefix=None):
+        prompts.append(combined_str)
+        indexes = [int(part[0]) for part in combined_str.split("'m': ")[1:]]
+        return json.dumps([{"chunk": i} for i in indexes])
+
+    # A 90 token system prompt leaves room for 2 resources in a 92 token budget
+    provider = _budgeted_provider(invoke, base_tokens=90)
+    result = _execute_failback_strategy(
+        resource_dict,
+        "locals",
+        "modules",
+        _adaptive_config(92),
+        system_config,
+        provider,
+        token_counter=lambda text: 1,
+    )
+
+    assert result == [{"chunk": i} for i in range(8)]
+    assert [prompt.count("'m': ") for prompt in prompts] == [2, 2, 2, 2]
+    provider.estimate_request_tokens.assert_called_once_with("locals\n\n", "modules")
+
+    # The budget is capped at the model's input token limit
+    prompts.clear()
+    provider = _budgeted_provider(invoke, base_tokens=90, input_token_limit=94)
+    _execute_failback_strategy(
+        resource_dict,
+        "locals",
+        "modules",
+        _adaptive_config(1000),
+        system_config,
+        provider,
+        token_counter=lambda text: 1,
+    )
+    assert [prompt.count("'m': ") for prompt in prompts] == [4, 4]
+
+
+def test_read_local_files_prompt_format(tmp_path):
+    """Local files are serialized with the configured prompt format"""
+    local = tmp_path / "locals.tf"
+    local.write_text('locals {\n  env = "prod"\n}\n')
+
+    result = read_local_files([{"prod": str(local)}], prompt_format="compact")
+    assert result == 'prod\n---\n{"locals":{"env":"prod"}}\n'
+
+    result = read_local_files([{"prod": str(local)}], prompt_format="source")
+    assert result == f"prod\n---\n{local.read_text()}\n"
+
+
+@patch("hcl_processor.file_processor.output_md")
+@patch("hcl_processor.file_processor.validate_output_json")
+@patch("hcl_processor.file_processor.create_llm_provider")
+def test_run_hcl_file_workflow_source_prompt_format(
+    mock_create_provider, mock_validate, mock_output_md, tmp_path
+):
+    """The source prompt format sends the original HCL text, even when pre-parsed"""
+    tf_file = tmp_path / "main.tf"
+    tf_file.write_text('module "m" {\n  source = "./x"\n}\n')
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+            "prompt_format": "source",
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    provider = MagicMock()
+    provider.invoke_single.return_value = "[]"
+    mock_create_provider.return_value = provider
+    mock_validate.return_value = [{"name": "x"}]
+
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+    run_hcl_file_workflow(str(tf_file), config, system_config)
+
+    prompt = provider.invoke_single.call_args[0][0]
+    assert tf_file.read_text() in prompt
+
+
+def test_shared_inputs_prune_locals(tmp_path):
+    """Only locals referenced by the target file are sent when prune_locals is enabled"""
+    locals_path = tmp_path / "locals.tf"
+    locals_path.write_text('locals {\n  used = "keep-me"\n  unused = "drop-me"\n}\n')
+    config = {
+        "input": {
+            "local_files": [{"dev": str(locals_path)}],
+            "modules": {"enabled": False},
+            "prune_locals": True,
+        }
+    }
+    shared = SharedInputs(config)
+
+    pruned = shared.locals_str({"module": [{"m": {"name": "${local.used}"}}]})
+    assert "keep-me" in pruned and "drop-me" not in pruned
+
+    # Unknown references fall back to the full locals
+    full = shared.locals_str({"module": [{"m": {"name": "${local.missing}"}}]})
+    assert "keep-me" in full and "drop-me" in full
+    assert shared.locals_str() == full
+
+
+@patch("hcl_processor.file_processor.output_md")
+@patch("hcl_processor.file_processor.validate_output_json")
+def test_arun_hcl_file_workflow_awaits_provider(
+    mock_validate, mock_output_md, tmp_path
+):
+    """The async workflow awaits ainvoke_single and falls back in a worker thread"""
+    import asyncio
+
+    tf_file = tmp_path / "main.tf"
+    tf_file.write_text('module "m" {\n  source = "./x"\n}\n')
+    config = {
+        "input": {
+            "local_files": [],
+            "modules": {"enabled": False},
+            "failback": {"enabled": False},
+        },
+        "output": {"json_path": str(tmp_path / "out.json")},
+    }
+    system_config = {"constants": {"file_processing": {"terraform_extension": ".tf"}}}
+    context = MagicMock()
+    context.parsed_resources = {}
+    context.shared_inputs.locals_str.return_value = ""
+    context.shared_inputs.modules_raw.return_value = None
+
+    async def ainvoke(prompt, modules_data, cache_prefix=None):
+        return "[]"
+
+    context.provider.ainvoke_single.side_effect = ainvoke
+    mock_validate.return_value = [{"name": "x"}]
+    with patch(
+        "hcl_processor.file_processor.render_md", return_value="section"
+    ) as mock_render:
+        section = asyncio.run(
+            arun_hcl_file_workflow(
+                str(tf_file), config, system_config, buffer_output=True, context=context
+            )
+        )
+    assert section == "section"
+    mock_render.assert_called_once()
+    context.provider.invoke_single.assert_not_called()
+
+    # An empty result goes through the (disabled) failback path
+    mock_validate.return_value = []
+    assert (
+        asyncio.run(
+            arun_hcl_file_workflow(
+                str(tf_file), config, system_config, buffer_output=True, context=context
+            )
+        )
+        is None
+    )
+
+
+def test_arun_hcl_file_workflow_offloads_blocking_steps():
+    """Reading the file and writing the output run outside the event loop thread"""
+    import asyncio
+
+    threads = {}
+    provider = MagicMock()
+
+    async def ainvoke(prompt, modules_data, cache_prefix=None):
+        threads["invoke"] = threading.current_thread()
+        return "[]"
+
+    provider.ainvoke_single.side_effect = ainvoke
+
+    def prepare(*args):
+        threads["prepare"] = threading.current_thread()
+        return {}, "prompt", None, "", provider
+
+    def write(*args):
+        threads["write"] = threading.current_thread()
+        return "section"
+
+    with (
+        patch("hcl_processor.file_processor._prepare_workflow", side_effect=prepare),
+        patch("hcl_processor.file_processor._write_output_files", side_effect=write),
+        patch("hcl_processor.file_processor._validate_main_output", return_value=[]),
+    ):
+        section = asyncio.run(
+            arun_hcl_file_workflow("main.tf", {}, {}, buffer_output=True)
+        )
+
+    assert section == "section"
+    assert threads["prepare"] is not threads["invoke"]
+    assert threads["write"] is not threads["invoke"]
@@ -0,0 +1,65 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import hcl2
+
+from hcl_processor.hcl_cache import HclParseCache, get_hcl2_version
+
+HCL_CONTENT = """
+locals {
+  env     = "dev"
+  monitor = { threshold = 90, tags = ["team:a"] }
+}
+"""
+
+
+def test_miss_parses_and_hit_skips_parser(tmp_path):
+    cache = HclParseCache(str(tmp_path))
+    parser = MagicMock(return_value={"locals": [{"env": "dev"}]})
+
+    assert cache.load(HCL_CONTENT, parser) == {"locals": [{"env": "dev"}]}
+    assert cache.load(HCL_CONTENT, parser) == {"locals": [{"env": "dev"}]}
+    parser.assert_called_once_with(HCL_CONTENT)
+
+    # A new instance (i.e. a new run) still hits the persisted entry
+    HclParseCache(str(tmp_path)).load(HCL_CONTENT, parser)
+    parser.assert_called_once()
+
+
+def test_cached_result_matches_hcl2(tmp_path):
+    cache = HclParseCache(str(tmp_path))
+    expected = hcl2.loads(HCL_CONTENT)
+    assert cache.load(HCL_CONTENT, hcl2.loads) == expected
+    assert cache.load(HCL_CONTENT, MagicMock()) == expected
+
+
+def test_entries_are_versioned_by_hcl2_version(tmp_path):
+    parser = MagicMock(return_value={"a": 1})
+    HclParseCache(str(tmp_path)).load(HCL_CONTENT, parser)
+    assert os.path.isdir(tmp_path / "hcl" / f"python-hcl2-{get_hcl2_version()}")
+
+    with patch("hcl_processor.hcl_cache.get_hcl2_version", return_value="0.0.0"):
+        HclParseCache(str(tmp_path)).load(HCL_CONTENT, parser)
+    assert parser.call_count == 2
+
+
+def test_corrupt_entry_is_reparsed(tmp_path):
+    cache = HclParseCache(str(tmp_path))
+    parser = MagicMock(return_value={"a": 1})
+    cache.load(HCL_CONTENT, parser)
+
+    for root, _, files in os.walk(cache.directory):
+        for name in files:
+            with open(os.path.join(root, name), "w") as f:
+                f.write("{corrupt")
+
+    assert cache.load(HCL_CONTENT, parser) == {"a": 1}
+    assert parser.call_count == 2
+
+
+def test_unserializable_result_leaves_no_temp_file(tmp_path):
+    cache = HclParseCache(str(tmp_path))
+    parsed = {"value": object()}
+
+    assert cache.load(HCL_CONTENT, MagicMock(return_value=parsed)) is parsed
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == []
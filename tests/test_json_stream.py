@@ -0,0 +1,55 @@
+import json
+
+from hcl_processor.json_stream import ArrayItemStream, salvage_array_items
+
+
+def feed_all(stream, document, chunk_size):
+    items = []
+    for start in range(0, len(document), chunk_size):
+        items.extend(stream.feed(document[start : start + chunk_size]))
+    return items
+
+
+def test_array_items_are_yielded_as_they_complete():
+    stream = ArrayItemStream()
+    assert stream.feed('{"data": [{"name": "a"}, {"na') == ['{"name": "a"}']
+    assert stream.feed('me": "b"}') == []
+    assert stream.feed("]}") == ['{"name": "b"}']
+    assert stream.finished
+    assert json.loads(stream.text) == {"data": [{"name": "a"}, {"name": "b"}]}
+
+
+def test_strings_and_nesting_do_not_split_items():
+    document = (
+        '{"data": [{"q": "a, b] } \\" [", "tags": ["x", "y"]},'
+        ' 3 , "s", [4, {"z": []}]], "other": [9]}'
+    )
+    for chunk_size in (1, 2, 7, len(document)):
+        items = feed_all(ArrayItemStream(), document, chunk_size)
+        assert [json.loads(item) for item in items] == json.loads(document)["data"]
+
+
+def test_top_level_array_and_empty_array():
+    assert feed_all(ArrayItemStream(), '[1, {"a": 2}]', 3) == ["1", '{"a": 2}']
+    stream = ArrayItemStream()
+    assert stream.feed('{"data": [ ]}') == []
+    assert stream.finished
+
+
+def test_truncated_document_keeps_completed_items():
+    stream = ArrayItemStream()
+    assert stream.feed('{"data": [{"a": 1}, {"a": 2}, {"a"') == [
+        '{"a": 1}',
+        '{"a": 2}',
+    ]
+    assert not stream.finished
+
+
+def test_salvage_array_items():
+    assert salvage_array_items('{"data": [{"a": 1}, {"a": 2}, {"a": 3') == [
+        {"a": 1},
+        {"a": 2},
+    ]
+    # Items after a malformed one are dropped
+    assert salvage_array_items('[1, {"a": nope}, 3]') == [1]
+    assert salvage_array_items("not json") == []
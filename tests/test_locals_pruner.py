@@ -0,0 +1,61 @@
+import hcl2
+
+from hcl_processor.locals_pruner import find_references, prune_local_files
+
+LOCALS = """
+locals {
+  env       = "prod"
+  prefix    = "${local.env}-app"
+  threshold = 80
+  unused    = "large value"
+}
+variable "team" {
+  default = "sre"
+}
+variable "other" {
+  default = "x"
+}
+"""
+
+RESOURCE = """
+module "m" {
+  monitors = [{ name = "${local.prefix} cpu", threshold = local.threshold, team = var.team }]
+}
+"""
+
+
+def test_find_references():
+    assert find_references(hcl2.loads(RESOURCE)) == {
+        ("local", "prefix"),
+        ("local", "threshold"),
+        ("var", "team"),
+    }
+
+
+def test_prune_keeps_transitive_references():
+    (pruned,) = prune_local_files([hcl2.loads(LOCALS)], hcl2.loads(RESOURCE))
+
+    local_names = {key for key in pruned["locals"][0] if not key.startswith("__")}
+    assert local_names == {"env", "prefix", "threshold"}
+    assert [list(block) for block in pruned["variable"]] == [['"team"']]
+
+
+def test_prune_per_environment():
+    dev = hcl2.loads("locals {\n  threshold = 90\n  extra = 1\n}\n")
+    prd = hcl2.loads("locals {\n  threshold = 80\n}\n")
+    resource = hcl2.loads('module "m" {\n  threshold = local.threshold\n}\n')
+
+    pruned_dev, pruned_prd = prune_local_files([dev, prd], resource)
+    assert "extra" not in pruned_dev["locals"][0]
+    assert pruned_prd == prd
+
+
+def test_prune_drops_locals_block_when_nothing_referenced():
+    resource = hcl2.loads('module "m" {\n  source = "./x"\n}\n')
+    (pruned,) = prune_local_files([hcl2.loads(LOCALS)], resource)
+    assert pruned == {}
+
+
+def test_prune_falls_back_on_unknown_local():
+    resource = hcl2.loads('module "m" {\n  name = local.missing\n}\n')
+    assert prune_local_files([hcl2.loads(LOCALS)], resource) is None
@@ -1,9 +1,11 @@
+import argparse
 import logging
 import os
 import tempfile
 import unittest
-from unittest.mock import Mock, call, patch
+from unittest.mock import ANY, Mock, call, patch
 
+import hcl2
 from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
 
 from src.hcl_processor.main import main
@@ -46,6 +48,28 @@ class TestMain(unittest.TestCase):
             "constants": {"file_processing": {"terraform_extension": ".tf"}},
         }
 
+    def _build_args(
+        self,
+        debug=False,
+        jobs=None,
+        incremental=False,
+        parse_jobs=None,
+        use_async=False,
+        batch=False,
+    ):
+        """Build parsed CLI arguments for main()"""
+        return argparse.Namespace(
+            config_file=self.config_file,
+            debug=debug,
+            jobs=jobs,
+            parse_jobs=parse_jobs,
+            no_cache=False,
+            refresh_cache=False,
+            incremental=incremental,
+            use_async=use_async,
+            batch=batch,
+        )
+
     def tearDown(self):
         """Clean up after tests"""
         import shutil
@@ -57,10 +81,10 @@ class TestMain(unittest.TestCase):
     @patch("src.hcl_processor.main.load_config")
     @patch("src.hcl_processor.main.run_hcl_file_workflow")
     @patch("src.hcl_processor.main.setup_logger")
-    @patch("src.hcl_processor.main.reset_markdown_file")
+    @patch("src.hcl_processor.main.MarkdownSink")
     def test_main_success_with_files(
         self,
-        mock_reset_markdown,
+        mock_sink,
         mock_setup_logger,
         mock_workflow,
         mock_load_config,
@@ -72,10 +96,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
         mock_load_config.return_value = self.sample_config
@@ -86,16 +107,19 @@ class TestMain(unittest.TestCase):
         # Verify
         self.assertEqual(result, 0)
 
-        # Verify reset_markdown_file is called once at the start
-        mock_reset_markdown.assert_called_once_with(
-            self.sample_config["output"]["markdown_path"]
-        )
+        # The document is replaced once, when the run completes
+        mock_sink.assert_called_once_with(self.sample_config["output"]["markdown_path"])
+        mock_sink.return_value.commit.assert_called_once()
 
         self.assertEqual(mock_setup_logger.call_count, 2)
         mock_setup_logger.assert_any_call("hcl_processor", level=logging.INFO)
         mock_setup_logger.assert_any_call("hcl_processor.main", level=logging.INFO)
         mock_workflow.assert_called_once_with(
-            "test.tf", self.sample_config, self.sample_system_config
+            "test.tf",
+            self.sample_config,
+            self.sample_system_config,
+            buffer_output=False,
+            context=ANY,
         )
         mock_logger.info.assert_any_call("Processing files...")
         mock_logger.info.assert_any_call("1 files found to process.")
@@ -107,10 +131,10 @@ class TestMain(unittest.TestCase):
     @patch("src.hcl_processor.main.os.walk")
     @patch("src.hcl_processor.main.run_hcl_file_workflow")
     @patch("src.hcl_processor.main.setup_logger")
-    @patch("src.hcl_processor.main.reset_markdown_file")
+    @patch("src.hcl_processor.main.MarkdownSink")
     def test_main_success_with_folder(
         self,
-        mock_reset_markdown,
+        mock_sink,
         mock_setup_logger,
         mock_workflow,
         mock_walk,
@@ -123,10 +147,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = True  # Test debug mode
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=True)  # Test debug mode
 
         mock_load_system_config.return_value = self.sample_system_config
 
@@ -145,10 +166,9 @@ class TestMain(unittest.TestCase):
         # Verify
         self.assertEqual(result, 0)
 
-        # Verify reset_markdown_file is called once at the start
-        mock_reset_markdown.assert_called_once_with(
-            folder_config["output"]["markdown_path"]
-        )
+        # The document is replaced once, when the run completes
+        mock_sink.assert_called_once_with(folder_config["output"]["markdown_path"])
+        mock_sink.return_value.commit.assert_called_once()
 
         self.assertEqual(mock_setup_logger.call_count, 2)
         mock_setup_logger.assert_any_call("hcl_processor", level=logging.DEBUG)
@@ -160,8 +180,20 @@ class TestMain(unittest.TestCase):
 
         # Verify workflow called for each .tf file
         expected_calls = [
-            call("/test/folder/file1.tf", folder_config, self.sample_system_config),
-            call("/test/folder/file2.tf", folder_config, self.sample_system_config),
+            call(
+                "/test/folder/file1.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/file2.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
         ]
         mock_workflow.assert_has_calls(expected_calls)
 
@@ -171,10 +203,10 @@ class TestMain(unittest.TestCase):
     @patch("src.hcl_processor.main.os.walk")
     @patch("src.hcl_processor.main.run_hcl_file_workflow")
     @patch("src.hcl_processor.main.setup_logger")
-    @patch("src.hcl_processor.main.reset_markdown_file")
+    @patch("src.hcl_processor.main.MarkdownSink")
     def test_main_folder_deterministic_processing_order(
         self,
-        mock_reset_markdown,
+        mock_sink,
         mock_setup_logger,
         mock_workflow,
         mock_walk,
@@ -187,10 +219,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
 
@@ -212,16 +241,48 @@ class TestMain(unittest.TestCase):
 
         # Verify files are processed in alphabetical order (by full path)
         expected_calls = [
-            call("/test/folder/aaa.tf", folder_config, self.sample_system_config),
-            call("/test/folder/bbb.tf", folder_config, self.sample_system_config),
-            call("/test/folder/mmm.tf", folder_config, self.sample_system_config),
             call(
-                "/test/folder/subdir/xxx.tf", folder_config, self.sample_system_config
+                "/test/folder/aaa.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/bbb.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/mmm.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/subdir/xxx.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
             ),
             call(
-                "/test/folder/subdir/yyy.tf", folder_config, self.sample_system_config
+                "/test/folder/subdir/yyy.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/zzz.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
             ),
-            call("/test/folder/zzz.tf", folder_config, self.sample_system_config),
         ]
 
         # Verify calls were made in the expected order
@@ -236,10 +297,10 @@ class TestMain(unittest.TestCase):
     @patch("src.hcl_processor.main.os.walk")
     @patch("src.hcl_processor.main.run_hcl_file_workflow")
     @patch("src.hcl_processor.main.setup_logger")
-    @patch("src.hcl_processor.main.reset_markdown_file")
+    @patch("src.hcl_processor.main.MarkdownSink")
     def test_main_folder_consistent_ordering_multiple_runs(
         self,
-        mock_reset_markdown,
+        mock_sink,
         mock_setup_logger,
         mock_workflow,
         mock_walk,
@@ -252,10 +313,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
 
@@ -271,9 +329,27 @@ class TestMain(unittest.TestCase):
         ]
 
         expected_calls = [
-            call("/test/folder/a.tf", folder_config, self.sample_system_config),
-            call("/test/folder/b.tf", folder_config, self.sample_system_config),
-            call("/test/folder/c.tf", folder_config, self.sample_system_config),
+            call(
+                "/test/folder/a.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/b.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
+            call(
+                "/test/folder/c.tf",
+                folder_config,
+                self.sample_system_config,
+                buffer_output=False,
+                context=ANY,
+            ),
         ]
 
         # Run multiple times with different file orders
@@ -295,10 +371,7 @@ class TestMain(unittest.TestCase):
     @patch("src.hcl_processor.main.load_system_config")
     def test_main_system_config_failure(self, mock_load_system_config, mock_parse_args):
         """Test system config loading failure"""
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.side_effect = Exception("System config error")
 
@@ -313,10 +386,7 @@ class TestMain(unittest.TestCase):
         self, mock_load_config, mock_load_system_config, mock_parse_args
     ):
         """Test config loading failure"""
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
         mock_load_config.side_effect = ValueError("Config error")
@@ -343,10 +413,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
         mock_load_config.return_value = self.sample_config
@@ -381,10 +448,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
         mock_load_config.return_value = self.sample_config
@@ -419,10 +483,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
         mock_load_config.return_value = self.sample_config
@@ -462,10 +523,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
 
@@ -507,10 +565,7 @@ class TestMain(unittest.TestCase):
         mock_logger = Mock()
         mock_setup_logger.return_value = mock_logger
 
-        mock_args = Mock()
-        mock_args.config_file = self.config_file
-        mock_args.debug = False
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = self._build_args(debug=False)
 
         mock_load_system_config.return_value = self.sample_system_config
 
@@ -524,6 +579,497 @@ class TestMain(unittest.TestCase):
         self.assertEqual(result, 0)
         mock_logger.info.assert_called_with("All files processed successfully.")
 
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    @patch("src.hcl_processor.main.MarkdownSink")
+    def test_main_concurrent_jobs_preserve_order(
+        self,
+        mock_sink,
+        mock_setup_logger,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --jobs buffers sections and emits them in file order"""
+        import threading
+        import time
+
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(jobs=3)
+        mock_load_system_config.return_value = self.sample_system_config
+
+        jobs_config = self.sample_config.copy()
+        jobs_config["input"]["resource_data"] = {
+            "files": ["a.tf", "b.tf", "c.tf", "d.tf"]
+        }
+        mock_load_config.return_value = jobs_config
+
+        thread_names = set()
+
+        def fake_workflow(
+            file_path, config, system_config, buffer_output=False, context=None
+        ):
+            thread_names.add(threading.current_thread().name)
+            # Finish earlier files last to force out-of-order completion
+            time.sleep({"a.tf": 0.06, "b.tf": 0.04, "c.tf": 0.02}.get(file_path, 0))
+            if file_path == "c.tf":
+                raise RuntimeError("boom")
+            return f"section {file_path}"
+
+        mock_workflow.side_effect = fake_workflow
+
+        result = main()
+
+        self.assertEqual(result, 0)
+        self.assertEqual(mock_workflow.call_count, 4)
+        for workflow_call in mock_workflow.call_args_list:
+            self.assertTrue(workflow_call.kwargs["buffer_output"])
+        self.assertGreater(len(thread_names), 1)
+        self.assertEqual(
+            [
+                put.args[1]
+                for put in mock_sink.return_value.put.call_args_list
+                if put.args[1] is not None
+            ],
+            [
+                "section a.tf",
+                "section b.tf",
+                "section d.tf",
+            ],
+        )
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    @patch("src.hcl_processor.main.MarkdownSink")
+    def test_main_concurrency_from_config(
+        self,
+        mock_sink,
+        mock_setup_logger,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that input.concurrency enables the worker pool without --jobs"""
+        mock_logger = Mock()
+        mock_setup_logger.return_value = mock_logger
+        mock_parse_args.return_value = self._build_args()
+        mock_load_system_config.return_value = self.sample_system_config
+
+        jobs_config = self.sample_config.copy()
+        jobs_config["input"]["resource_data"] = {"files": ["a.tf", "b.tf"]}
+        jobs_config["input"]["concurrency"] = 2
+        mock_load_config.return_value = jobs_config
+        mock_workflow.return_value = "section"
+
+        result = main()
+
+        self.assertEqual(result, 0)
+        mock_logger.info.assert_any_call("Processing 2 files with 2 workers")
+        self.assertEqual(mock_sink.return_value.put.call_count, 2)
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    def test_main_incremental_skips_unchanged_files(
+        self,
+        mock_setup_logger,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --incremental reuses sections of unchanged files"""
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(incremental=True)
+        mock_load_system_config.return_value = self.sample_system_config
+
+        with open(self.config_file, "w") as f:
+            f.write("bedrock: {}")
+        tf_files = []
+        for name in ["a.tf", "b.tf", "c.tf"]:
+            path = os.path.join(self.test_dir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            tf_files.append(path)
+
+        incremental_config = self.sample_config.copy()
+        incremental_config["input"]["resource_data"] = {"files": tf_files}
+        mock_load_config.return_value = incremental_config
+        mock_workflow.side_effect = lambda file_path, *args, **kwargs: (
+            f"section {os.path.basename(file_path)}\n"
+        )
+
+        # First run processes every file and writes the manifest
+        self.assertEqual(main(), 0)
+        self.assertEqual(mock_workflow.call_count, 3)
+
+        # Second run only processes the modified file
+        with open(tf_files[1], "w") as f:
+            f.write("modified")
+        mock_workflow.reset_mock()
+        mock_workflow.side_effect = lambda file_path, *args, **kwargs: "section b2\n"
+
+        self.assertEqual(main(), 0)
+        mock_workflow.assert_called_once_with(
+            tf_files[1],
+            incremental_config,
+            self.sample_system_config,
+            buffer_output=True,
+            context=ANY,
+        )
+        with open(self.sample_config["output"]["markdown_path"]) as f:
+            self.assertEqual(f.read(), "section a.tf\n\nsection b2\n\nsection c.tf\n\n")
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    def test_main_shard_by_directory_writes_shards_and_index(
+        self,
+        mock_setup_logger,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that output.shard_by writes one document per directory and an index"""
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args()
+        mock_load_system_config.return_value = self.sample_system_config
+
+        folder = os.path.join(self.test_dir, "tf")
+        for directory in ["app", os.path.join("modules", "vpc")]:
+            os.makedirs(os.path.join(folder, directory))
+        tf_files = [
+            os.path.join(folder, "app", "a.tf"),
+            os.path.join(folder, "app", "b.tf"),
+            os.path.join(folder, "modules", "vpc", "c.tf"),
+        ]
+        for path in tf_files:
+            with open(path, "w") as f:
+                f.write("")
+
+        shard_config = self.sample_config.copy()
+        shard_config["input"]["resource_data"] = {"folder": folder}
+        shard_config["output"] = {
+            **self.sample_config["output"],
+            "shard_by": "directory",
+        }
+        mock_load_config.return_value = shard_config
+        mock_workflow.side_effect = lambda file_path, *args, **kwargs: (
+            f"section {os.path.basename(file_path)}\n"
+        )
+
+        self.assertEqual(main(), 0)
+        for workflow_call in mock_workflow.call_args_list:
+            self.assertTrue(workflow_call.kwargs["buffer_output"])
+
+        shard_dir = os.path.join(self.test_dir, "output")
+        self.assertEqual(sorted(os.listdir(shard_dir)), ["app.md", "modules_vpc.md"])
+        with open(os.path.join(shard_dir, "app.md")) as f:
+            self.assertEqual(f.read(), "section a.tf\n\nsection b.tf\n\n")
+        with open(os.path.join(shard_dir, "modules_vpc.md")) as f:
+            self.assertEqual(f.read(), "section c.tf\n\n")
+        with open(shard_config["output"]["markdown_path"]) as f:
+            self.assertEqual(
+                f.read(),
+                "# Index\n\n- [app](output/app.md) (2)\n"
+                "- [modules/vpc](output/modules_vpc.md) (1)\n",
+            )
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    def test_main_parse_jobs_feed_parsed_hcl_to_workflow(
+        self,
+        mock_setup_logger,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --parse-jobs parses files in processes before the LLM stage"""
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(parse_jobs=2)
+        mock_load_system_config.return_value = self.sample_system_config
+
+        locals_path = os.path.join(self.test_dir, "locals.tf")
+        with open(locals_path, "w") as f:
+            f.write('locals {\n  env = "dev"\n}\n')
+        tf_files = []
+        for name in ["a", "b", "broken"]:
+            path = os.path.join(self.test_dir, f"{name}.tf")
+            with open(path, "w") as f:
+                f.write(
+                    "{{{" if name == "broken" else f'locals {{\n  name = "{name}"\n}}\n'
+                )
+            tf_files.append(path)
+
+        pipeline_config = self.sample_config.copy()
+        pipeline_config["input"]["resource_data"] = {"files": tf_files}
+        pipeline_config["input"]["local_files"] = [{"dev": locals_path}]
+        mock_load_config.return_value = pipeline_config
+
+        seen = {}
+
+        def fake_workflow(file_path, config, system_config, buffer_output, context):
+            seen[file_path] = context.parsed_resources.get(file_path)
+            seen["locals"] = context.shared_inputs._preparsed[1]
+            return f"section {os.path.basename(file_path)}\n"
+
+        mock_workflow.side_effect = fake_workflow
+
+        self.assertEqual(main(), 0)
+        with open(tf_files[0]) as f:
+            self.assertEqual(seen[tf_files[0]], hcl2.loads(f.read()))
+        with open(tf_files[1]) as f:
+            self.assertEqual(seen[tf_files[1]], hcl2.loads(f.read()))
+        # Parse failures are left to the workflow to report
+        self.assertIsNone(seen[tf_files[2]])
+        with open(locals_path) as f:
+            self.assertEqual(seen["locals"], {locals_path: hcl2.loads(f.read())})
+        with open(self.sample_config["output"]["markdown_path"]) as f:
+            self.assertEqual(
+                f.read(), "section a.tf\n\nsection b.tf\n\nsection broken.tf\n\n"
+            )
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.arun_hcl_file_workflow")
+    @patch("src.hcl_processor.main.setup_logger")
+    @patch("src.hcl_processor.main.MarkdownSink")
+    def test_main_async_preserves_order_and_bounds_in_flight(
+        self,
+        mock_sink,
+        mock_setup_logger,
+        mock_async_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --async runs files concurrently on one event loop, in file order"""
+        import asyncio
+
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(jobs=2, use_async=True)
+        mock_load_system_config.return_value = self.sample_system_config
+
+        async_config = self.sample_config.copy()
+        async_config["input"]["resource_data"] = {
+            "files": ["a.tf", "b.tf", "c.tf", "d.tf"]
+        }
+        mock_load_config.return_value = async_config
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_workflow(
+            file_path, config, system_config, buffer_output=False, context=None
+        ):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Finish earlier files last to force out-of-order completion
+            await asyncio.sleep({"a.tf": 0.03, "b.tf": 0.02}.get(file_path, 0))
+            in_flight -= 1
+            if file_path == "c.tf":
+                raise RuntimeError("boom")
+            return f"section {file_path}"
+
+        mock_async_workflow.side_effect = fake_workflow
+
+        self.assertEqual(main(), 0)
+        self.assertEqual(peak, 2)
+        self.assertEqual(
+            [
+                put.args[1]
+                for put in mock_sink.return_value.put.call_args_list
+                if put.args[1] is not None
+            ],
+            [
+                "section a.tf",
+                "section b.tf",
+                "section d.tf",
+            ],
+        )
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main._process_files")
+    @patch("src.hcl_processor.main.setup_logger")
+    def test_main_async_ignores_parse_jobs(
+        self,
+        mock_setup_logger,
+        mock_process_files,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --async with parse jobs warns and runs without a parse stage"""
+        mock_logger = Mock()
+        mock_setup_logger.return_value = mock_logger
+        mock_parse_args.return_value = self._build_args(parse_jobs=4, use_async=True)
+        mock_load_system_config.return_value = self.sample_system_config
+        mock_load_config.return_value = self.sample_config
+        mock_process_files.return_value = [None]
+
+        self.assertEqual(main(), 0)
+        self.assertEqual(mock_process_files.call_args.kwargs["parse_jobs"], 1)
+        self.assertTrue(mock_process_files.call_args.kwargs["use_async"])
+        mock_logger.warning.assert_called_once()
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.complete_batch_record")
+    @patch("src.hcl_processor.main.create_batch_backend")
+    @patch("src.hcl_processor.main.prepare_batch_record")
+    @patch("src.hcl_processor.main.RunContext")
+    @patch("src.hcl_processor.main.setup_logger")
+    @patch("src.hcl_processor.main.MarkdownSink")
+    def test_main_batch_falls_back_to_interactive(
+        self,
+        mock_sink,
+        mock_setup_logger,
+        mock_run_context,
+        mock_prepare,
+        mock_create_backend,
+        mock_complete,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that --batch submits one job and retries failed files interactively"""
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(batch=True)
+        mock_load_system_config.return_value = self.sample_system_config
+
+        batch_config = self.sample_config.copy()
+        batch_config["input"]["resource_data"] = {
+            "files": ["a.tf", "b.tf", "c.tf", "d.tf"]
+        }
+        mock_load_config.return_value = batch_config
+
+        def fake_prepare(file_path, config, system_config, context=None):
+            if file_path == "b.tf":
+                raise ValueError("prompt too large")
+            return {"prompt": file_path}
+
+        mock_prepare.side_effect = fake_prepare
+        mock_create_backend.return_value.min_records = 1
+        # c.tf's record failed in the batch job, d.tf's output is invalid
+        mock_create_backend.return_value.run.return_value = {
+            "00000000": {"text": "a.tf"},
+            "00000002": None,
+            "00000003": {"text": "d.tf"},
+        }
+
+        def fake_complete(file_path, model_output, config, system_config, context=None):
+            if file_path == "d.tf":
+                raise ValueError("invalid output")
+            return f"batch {file_path}"
+
+        mock_complete.side_effect = fake_complete
+        mock_workflow.side_effect = lambda file_path, *args, **kwargs: (
+            f"interactive {file_path}"
+        )
+
+        self.assertEqual(main(), 0)
+        mock_create_backend.assert_called_once_with(
+            batch_config, mock_run_context.return_value.provider
+        )
+        records = mock_create_backend.return_value.run.call_args.args[0]
+        self.assertEqual(
+            [record["recordId"] for record in records],
+            ["00000000", "00000002", "00000003"],
+        )
+        self.assertEqual(
+            [c.args[0] for c in mock_workflow.call_args_list], ["b.tf", "c.tf", "d.tf"]
+        )
+        self.assertEqual(
+            [
+                put.args[1]
+                for put in mock_sink.return_value.put.call_args_list
+                if put.args[1] is not None
+            ],
+            [
+                "batch a.tf",
+                "interactive b.tf",
+                "interactive c.tf",
+                "interactive d.tf",
+            ],
+        )
+
+    @patch("src.hcl_processor.main.parse_args")
+    @patch("src.hcl_processor.main.load_system_config")
+    @patch("src.hcl_processor.main.load_config")
+    @patch("src.hcl_processor.main.run_hcl_file_workflow")
+    @patch("src.hcl_processor.main.create_batch_backend")
+    @patch("src.hcl_processor.main.prepare_batch_record")
+    @patch("src.hcl_processor.main.RunContext")
+    @patch("src.hcl_processor.main.setup_logger")
+    @patch("src.hcl_processor.main.MarkdownSink")
+    def test_main_batch_job_errors_fall_back_to_interactive(
+        self,
+        mock_sink,
+        mock_setup_logger,
+        mock_run_context,
+        mock_prepare,
+        mock_create_backend,
+        mock_workflow,
+        mock_load_config,
+        mock_load_system_config,
+        mock_parse_args,
+    ):
+        """Test that AWS errors and undersized jobs leave every file to interactive processing"""
+        mock_setup_logger.return_value = Mock()
+        mock_parse_args.return_value = self._build_args(batch=True)
+        mock_load_system_config.return_value = self.sample_system_config
+        batch_config = self.sample_config.copy()
+        batch_config["input"]["resource_data"] = {"files": ["a.tf", "b.tf"]}
+        mock_load_config.return_value = batch_config
+        mock_prepare.return_value = {"prompt": "p"}
+        mock_workflow.side_effect = lambda file_path, *args, **kwargs: (
+            f"interactive {file_path}"
+        )
+        backend = mock_create_backend.return_value
+
+        backend.min_records = 1
+        backend.run.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "too few records"}},
+            "CreateModelInvocationJob",
+        )
+        self.assertEqual(main(), 0)
+        self.assertEqual(
+            [c.args[0] for c in mock_workflow.call_args_list], ["a.tf", "b.tf"]
+        )
+
+        mock_workflow.reset_mock()
+        backend.run.reset_mock()
+        backend.min_records = 100
+        self.assertEqual(main(), 0)
+        backend.run.assert_not_called()
+        self.assertEqual(
+            [c.args[0] for c in mock_workflow.call_args_list], ["a.tf", "b.tf"]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
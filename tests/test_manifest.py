@@ -0,0 +1,132 @@
+import json
+
+from hcl_processor.manifest import (
+    RunManifest,
+    compute_inputs_hash,
+    get_manifest_path,
+    hash_file,
+)
+
+
+def _config(tmp_path):
+    locals_path = tmp_path / "locals.tf"
+    locals_path.write_text("locals {}")
+    modules_path = tmp_path / "main.tf"
+    modules_path.write_text("module {}")
+    return {
+        "input": {
+            "local_files": [{"dev": str(locals_path)}],
+            "modules": {"enabled": True, "path": str(modules_path)},
+        },
+        "output": {"markdown_path": str(tmp_path / "out" / "docs.md")},
+    }
+
+
+def test_hash_file(tmp_path):
+    file_path = tmp_path / "a.tf"
+    file_path.write_text("content")
+    assert hash_file(str(file_path)) == hash_file(str(file_path))
+    assert hash_file(str(tmp_path / "missing.tf")) is None
+
+
+def test_inputs_hash_changes_with_shared_inputs(tmp_path):
+    config = _config(tmp_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("bedrock: {}")
+
+    baseline = compute_inputs_hash(config, {"system_prompt": "a"}, str(config_path))
+    assert baseline == compute_inputs_hash(
+        config, {"system_prompt": "a"}, str(config_path)
+    )
+
+    (tmp_path / "locals.tf").write_text("locals { changed = true }")
+    changed_locals = compute_inputs_hash(
+        config, {"system_prompt": "a"}, str(config_path)
+    )
+    assert changed_locals != baseline
+
+    assert (
+        compute_inputs_hash(config, {"system_prompt": "b"}, str(config_path))
+        != changed_locals
+    )
+
+
+def test_get_manifest_path(tmp_path):
+    config = _config(tmp_path)
+    assert get_manifest_path(config) == str(tmp_path / "out" / "docs.manifest.json")
+    config["output"]["manifest_path"] = "custom.json"
+    assert get_manifest_path(config) == "custom.json"
+
+
+def test_manifest_roundtrip_reuses_only_unchanged_files(tmp_path):
+    unchanged = tmp_path / "unchanged.tf"
+    unchanged.write_text("a")
+    changed = tmp_path / "changed.tf"
+    changed.write_text("b")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = RunManifest(manifest_path, "inputs")
+    manifest.load()
+    manifest.record(str(unchanged), "section unchanged")
+    manifest.record(str(changed), "section changed")
+    manifest.save()
+
+    changed.write_text("b2")
+    reloaded = RunManifest(manifest_path, "inputs")
+    reloaded.load()
+    assert reloaded.lookup(str(unchanged)) == "section unchanged"
+    assert reloaded.lookup(str(changed)) is None
+    assert reloaded.lookup(str(tmp_path / "new.tf")) is None
+
+
+def test_manifest_records_shard_of_unchanged_files(tmp_path):
+    file_path = tmp_path / "a.tf"
+    file_path.write_text("a")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = RunManifest(manifest_path, "inputs")
+    manifest.record(str(file_path), "section", "datadog")
+    manifest.save()
+
+    reloaded = RunManifest(manifest_path, "inputs")
+    reloaded.load()
+    assert reloaded.lookup_shard(str(file_path)) == "datadog"
+    file_path.write_text("a2")
+    changed = RunManifest(manifest_path, "inputs")
+    changed.load()
+    assert changed.lookup_shard(str(file_path)) is None
+
+
+def test_manifest_discarded_when_inputs_change(tmp_path):
+    file_path = tmp_path / "a.tf"
+    file_path.write_text("a")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = RunManifest(manifest_path, "inputs-v1")
+    manifest.record(str(file_path), "section")
+    manifest.save()
+
+    reloaded = RunManifest(manifest_path, "inputs-v2")
+    reloaded.load()
+    assert reloaded.lookup(str(file_path)) is None
+
+
+def test_manifest_only_keeps_entries_recorded_this_run(tmp_path):
+    file_path = tmp_path / "a.tf"
+    file_path.write_text("a")
+    manifest_path = tmp_path / "manifest.json"
+
+    manifest = RunManifest(str(manifest_path), "inputs")
+    manifest.record(str(file_path), "section")
+    manifest.save()
+
+    RunManifest(str(manifest_path), "inputs").save()
+    assert json.loads(manifest_path.read_text())["files"] == {}
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{not json")
+    manifest = RunManifest(str(manifest_path), "inputs")
+    manifest.load()
+    assert manifest.lookup(str(tmp_path / "a.tf")) is None
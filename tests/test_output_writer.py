@@ -4,7 +4,21 @@ import shutil
 import tempfile
 import unittest
 
-from src.hcl_processor.output_writer import output_md
+from jinja2 import BaseLoader, Environment
+
+from src.hcl_processor.config_loader import get_default_config
+from src.hcl_processor.output_writer import (
+    MarkdownRenderer,
+    MarkdownSink,
+    ShardedMarkdownSink,
+    clean_cell,
+    get_default_template,
+    get_json_output_path,
+    get_renderer,
+    output_md,
+    salvage_output_items,
+    write_json_output,
+)
 
 
 class TestOutputWriter(unittest.TestCase):
@@ -30,10 +44,6 @@ class TestOutputWriter(unittest.TestCase):
             }
         ]
 
-        # Create a JSON file
-        with open(self.json_path, "w") as f:
-            json.dump(test_data, f)
-
         # Minimal configuration
         config = {
             "output": {"json_path": self.json_path, "markdown_path": self.md_path},
@@ -47,7 +57,7 @@ class TestOutputWriter(unittest.TestCase):
         }
 
         # Execute the test
-        output_md("Test Title", config)
+        output_md("Test Title", test_data, config)
 
         # Verify the results
         self.assertTrue(os.path.exists(self.md_path))
@@ -66,14 +76,13 @@ class TestOutputWriter(unittest.TestCase):
         self.assertIn(expected_header, content)
         self.assertIn(expected_row, content)
         self.assertNotIn("extra_field", content)
+        # No JSON intermediate is written
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["test.md"])
 
     def test_custom_template_string(self):
         # Test data
         test_data = [{"name": "test", "value": "123"}]
 
-        with open(self.json_path, "w") as f:
-            json.dump(test_data, f)
-
         # Config using a custom template
         config = {
             "output": {
@@ -84,7 +93,7 @@ class TestOutputWriter(unittest.TestCase):
             "schema_columns": ["name", "value"],
         }
 
-        output_md("Custom Test", config)
+        output_md("Custom Test", test_data, config)
 
         with open(self.md_path, "r") as f:
             content = f.read()
@@ -96,9 +105,6 @@ class TestOutputWriter(unittest.TestCase):
         # Test data
         test_data = [{"name": "test", "value": "123"}]
 
-        with open(self.json_path, "w") as f:
-            json.dump(test_data, f)
-
         # Create the template file
         template_path = os.path.join(self.temp_dir, "test_template.md.j2")
         with open(template_path, "w") as f:
@@ -116,7 +122,7 @@ class TestOutputWriter(unittest.TestCase):
             "schema_columns": ["name", "value"],
         }
 
-        output_md("File Template Test", config)
+        output_md("File Template Test", test_data, config)
 
         with open(self.md_path, "r") as f:
             content = f.read()
@@ -128,9 +134,6 @@ class TestOutputWriter(unittest.TestCase):
         # Test data
         test_data = [{"name": "test"}]
 
-        with open(self.json_path, "w") as f:
-            json.dump(test_data, f)
-
         # Config where no template is specified
         config = {
             "output": {"json_path": self.json_path, "markdown_path": self.md_path},
@@ -138,7 +141,7 @@ class TestOutputWriter(unittest.TestCase):
         }
 
         # Verify that the default template is used
-        output_md("No Template Test", config)
+        output_md("No Template Test", test_data, config)
 
         with open(self.md_path, "r") as f:
             content = f.read()
@@ -147,6 +150,217 @@ class TestOutputWriter(unittest.TestCase):
         self.assertIn("| name |", content)
         self.assertIn("| test |", content)
 
+    def test_write_json_output(self):
+        test_data = [{"name": "test", "value": "123"}]
+        config = {
+            "input": {"resource_data": {"folder": self.temp_dir}},
+            "output": {"json_path": self.json_path},
+        }
+
+        path = write_json_output(
+            os.path.join(self.temp_dir, "main.tf"), test_data, config
+        )
+        self.assertEqual(path, os.path.join(self.temp_dir, "test.main.json"))
+        with open(path) as f:
+            content = f.read()
+        self.assertIn("\n    {", content)
+        self.assertEqual(json.loads(content), test_data)
+
+        config["output"]["json_compact"] = True
+        path = write_json_output(
+            os.path.join(self.temp_dir, "main.tf"), test_data, config
+        )
+        with open(path) as f:
+            self.assertEqual(f.read(), '[{"name":"test","value":"123"}]')
+
+    def test_json_output_paths_are_distinct_per_file(self):
+        config = {
+            "input": {"resource_data": {"folder": "envs"}},
+            "output": {"json_path": os.path.join("out", "result.json")},
+        }
+        self.assertEqual(
+            get_json_output_path(os.path.join("envs", "dev", "main.tf"), config),
+            os.path.join("out", "result.dev.main.json"),
+        )
+        self.assertEqual(
+            get_json_output_path(os.path.join("envs", "prd", "main.tf"), config),
+            os.path.join("out", "result.prd.main.json"),
+        )
+        # Files outside the folder are named after their absolute path
+        outside = os.path.abspath(os.path.join("other", "main.tf"))
+        self.assertEqual(
+            get_json_output_path(outside, config),
+            os.path.join(
+                "out",
+                "result."
+                + os.path.splitext(outside)[0].lstrip(os.sep).replace(os.sep, ".")
+                + ".json",
+            ),
+        )
+
+    def test_builtin_templates_match_jinja(self):
+        test_data = [
+            {"name": "a", "description": "multi\nline | pipe", "severity": None},
+            {"name": "${var.x}", "threshold": 80},
+        ]
+        columns = ["name", "description", "severity", "threshold"]
+        for template in (
+            get_default_template(),
+            get_default_config()["output"]["template"],
+        ):
+            renderer = MarkdownRenderer(
+                {"output": {"template": template}, "schema_columns": columns}
+            )
+            # Built-in templates are rendered without Jinja2
+            self.assertIsNone(renderer._template)
+            expected = (
+                Environment(loader=BaseLoader(), autoescape=False)
+                .from_string(template)
+                .render(
+                    title="Title",
+                    data=[
+                        {col: clean_cell(item.get(col, "")) for col in columns}
+                        for item in test_data
+                    ],
+                    columns=columns,
+                )
+            )
+            self.assertEqual(renderer.render("Title", test_data), expected)
+
+    def test_renderer_is_shared_and_reloads_changed_template_file(self):
+        template_path = os.path.join(self.temp_dir, "template.md.j2")
+        with open(template_path, "w") as f:
+            f.write("v1 {{ title }}")
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        config = {
+            "output": {"template": {"path": template_path}},
+            "schema_columns": ["name"],
+            "cache": {"enabled": True, "path": cache_dir},
+        }
+
+        renderer = get_renderer(config)
+        self.assertIs(get_renderer(dict(config)), renderer)
+        self.assertEqual(renderer.render("T", []), "v1 T")
+        # Compiled template is stored in the bytecode cache
+        self.assertTrue(os.listdir(os.path.join(cache_dir, "templates")))
+
+        with open(template_path, "w") as f:
+            f.write("v2 {{ title }}")
+        os.utime(template_path, (0, os.path.getmtime(template_path) + 10))
+        self.assertEqual(renderer.render("T", []), "v2 T")
+
+    def test_markdown_sink_orders_slots_and_replaces_atomically(self):
+        with open(self.md_path, "w") as f:
+            f.write("previous run\n")
+        os.chmod(self.md_path, 0o644)
+
+        sink = MarkdownSink(self.md_path)
+        sink.put(2, "third")
+        sink.put(0, "first")
+        sink.put(1, None)
+        sink.put(3, "fourth")
+        # Readers keep seeing the previous document until commit
+        with open(self.md_path) as f:
+            self.assertEqual(f.read(), "previous run\n")
+
+        sink.commit()
+        sink.close()
+        with open(self.md_path) as f:
+            self.assertEqual(f.read(), "first\nthird\nfourth\n")
+        self.assertEqual(os.stat(self.md_path).st_mode & 0o777, 0o644)
+        self.assertEqual(os.listdir(self.temp_dir), ["test.md"])
+
+    def test_markdown_sink_close_without_commit_keeps_document(self):
+        with open(self.md_path, "w") as f:
+            f.write("previous run\n")
+
+        sink = MarkdownSink(self.md_path)
+        sink.append("partial")
+        sink.close()
+
+        with open(self.md_path) as f:
+            self.assertEqual(f.read(), "previous run\n")
+        self.assertEqual(os.listdir(self.temp_dir), ["test.md"])
+
+    def test_markdown_sink_creates_document(self):
+        md_path = os.path.join(self.temp_dir, "docs", "new.md")
+        sink = MarkdownSink(md_path)
+        sink.append("first")
+        sink.append("second")
+        sink.commit()
+
+        with open(md_path) as f:
+            self.assertEqual(f.read(), "first\nsecond\n")
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(md_path).st_mode & 0o777, 0o666 & ~umask)
+
+    def test_markdown_sink_leaves_unchanged_document_untouched(self):
+        with open(self.md_path, "w") as f:
+            f.write("same\n")
+        os.utime(self.md_path, (0, 0))
+
+        sink = MarkdownSink(self.md_path)
+        sink.append("same")
+        sink.commit()
+        sink.close()
+
+        self.assertEqual(os.stat(self.md_path).st_mtime, 0)
+        self.assertEqual(os.listdir(self.temp_dir), ["test.md"])
+
+    def test_sharded_markdown_sink(self):
+        shard_dir = os.path.join(self.temp_dir, "test")
+        os.makedirs(shard_dir)
+        with open(os.path.join(shard_dir, "stale.md"), "w") as f:
+            f.write("removed module\n")
+        with open(os.path.join(shard_dir, "notes.md"), "w") as f:
+            f.write("not written by the tool\n")
+        with open(self.md_path, "w") as f:
+            f.write("# Index\n\n- [stale](test/stale.md) (1)\n")
+
+        sink = ShardedMarkdownSink(self.md_path, shard_dir)
+        sink.put(2, "c", "modules/vpc")
+        sink.put(0, "a", "app")
+        sink.put(1, None, "app")
+        sink.put(3, "d", "app")
+        sink.commit()
+        sink.close()
+
+        # Only the shards listed by the previous index are removed
+        self.assertEqual(
+            sorted(os.listdir(shard_dir)), ["app.md", "modules_vpc.md", "notes.md"]
+        )
+        with open(os.path.join(shard_dir, "app.md")) as f:
+            self.assertEqual(f.read(), "a\nd\n")
+        with open(self.md_path) as f:
+            self.assertEqual(
+                f.read(),
+                "# Index\n\n- [app](test/app.md) (2)\n"
+                "- [modules/vpc](test/modules_vpc.md) (1)\n",
+            )
+
+    def test_salvage_output_items(self):
+        schema = {"type": "array", "items": {"type": "object", "required": ["name"]}}
+
+        items, issues = salvage_output_items(
+            '[{"name": "a"}, {"id": 1}, {"name": "b"}, {"na', schema
+        )
+        self.assertEqual(items, [{"name": "a"}, {"name": "b"}])
+        self.assertEqual(len(issues), 2)
+        self.assertTrue(issues[0].startswith("invalid JSON after 3 items"))
+        self.assertTrue(issues[1].startswith("item 1 does not match the schema"))
+
+        # A truncated tool input passed through as a JSON string
+        items, _ = salvage_output_items(
+            json.dumps('{"data": [{"name": "a"}, {'), schema
+        )
+        self.assertEqual(items, [{"name": "a"}])
+
+        self.assertEqual(salvage_output_items("{}", schema), ([], []))
+        self.assertEqual(
+            salvage_output_items('[{"name": "a"}', {"type": "object"}), ([], [])
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import json
+
+import hcl2
+import pytest
+
+from hcl_processor.prompt_serializer import serialize_hcl
+
+SOURCE = """
+locals {
+  env = "prod"
+}
+module "m" {
+  source   = "./x"
+  monitors = [{ name = "cpu ${local.env}", threshold = 80, query = "${var.q}" }]
+}
+"""
+
+
+def test_serialize_python_is_repr():
+    parsed = hcl2.loads(SOURCE)
+    assert serialize_hcl(parsed) == f"{parsed}"
+
+
+def test_serialize_json_is_minified():
+    parsed = hcl2.loads(SOURCE)
+    result = serialize_hcl(parsed, "json")
+    assert json.loads(result) == parsed
+    assert ", " not in result and ": " not in result
+
+
+def test_serialize_compact_removes_hcl2_artifacts():
+    result = json.loads(serialize_hcl(hcl2.loads(SOURCE), "compact"))
+    assert result == {
+        "locals": {"env": "prod"},
+        "module": {
+            "m": {
+                "source": "./x",
+                "monitors": [
+                    {"name": "cpu ${local.env}", "threshold": 80, "query": "var.q"}
+                ],
+            }
+        },
+    }
+
+
+def test_serialize_source_and_fragment_fallback():
+    parsed = hcl2.loads(SOURCE)
+    assert serialize_hcl(parsed, "source", SOURCE) == SOURCE
+    # Fragments have no source text and use the compact rendering
+    assert serialize_hcl(parsed, "source") == serialize_hcl(parsed, "compact")
+
+
+def test_serialize_unknown_format():
+    with pytest.raises(ValueError):
+        serialize_hcl({}, "yaml")
+
+
+def test_compact_is_smaller_than_python():
+    parsed = hcl2.loads(SOURCE)
+    assert len(serialize_hcl(parsed, "compact")) < len(serialize_hcl(parsed, "python"))
@@ -0,0 +1,95 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from hcl_processor.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """Replaces time.monotonic/time.sleep so waits are instantaneous"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("hcl_processor.rate_limiter.time", fake):
+        yield fake
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(60)  # one per second
+    for _ in range(60):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_caps_large_requests(clock):
+    bucket = TokenBucket(600)
+    assert bucket.acquire(10_000) == 0
+    # The oversized request emptied the bucket; the next one waits a full minute
+    assert bucket.acquire(600) == pytest.approx(60.0)
+
+
+def test_concurrency_limiter_aimd():
+    limiter = AdaptiveConcurrencyLimiter(maximum=8)
+    assert limiter.limit == 8
+    limiter.on_throttle()
+    assert limiter.limit == 4
+    limiter.on_throttle()
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 1
+
+    # One full window of successes per step
+    limiter.on_success()
+    assert limiter.limit == 2
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.limit == 3
+
+
+def test_concurrency_limiter_blocks_at_limit():
+    limiter = AdaptiveConcurrencyLimiter(maximum=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        limiter.acquire()
+        acquired.set()
+        limiter.release()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_rate_limiter_from_settings(clock):
+    assert RateLimiter.from_settings(None, 4) is None
+    limiter = RateLimiter.from_settings(
+        {"requests_per_minute": 60, "tokens_per_minute": 1000}, 4
+    )
+    assert limiter.concurrency.maximum == 4
+    with limiter.slot(tokens=1000):
+        pass
+    # The token budget is spent, so the next request waits for refill
+    with limiter.slot(tokens=500):
+        pass
+    assert clock.now == pytest.approx(30.0)
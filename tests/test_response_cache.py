@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from hcl_processor.response_cache import ResponseCache
+
+
+def _request(prompt="prompt"):
+    return {
+        "modelId": "test-model",
+        "messages": [{"role": "user", "content": [{"text": prompt}]}],
+        "system": [{"text": "system"}],
+        "inferenceConfig": {"maxTokens": 100},
+        "toolConfig": {"tools": []},
+    }
+
+
+def test_make_key_is_stable_and_content_addressed():
+    """Test that keys ignore dict ordering but change with any request field"""
+    request = _request()
+    reordered = dict(reversed(list(request.items())))
+    assert ResponseCache.make_key(request) == ResponseCache.make_key(reordered)
+    assert ResponseCache.make_key(request) != ResponseCache.make_key(_request("other"))
+
+    changed = _request()
+    changed["inferenceConfig"]["maxTokens"] = 200
+    assert ResponseCache.make_key(request) != ResponseCache.make_key(changed)
+
+
+def test_put_and_get_roundtrip_across_instances(tmp_path):
+    """Test that responses persist on disk between runs"""
+    key = ResponseCache.make_key(_request())
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024)
+    assert cache.get(key) is None
+    cache.put(key, '[{"name": "a"}]')
+    cache.close()
+
+    reopened = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024)
+    assert reopened.get(key) == '[{"name": "a"}]'
+    assert reopened.hits == 1
+    reopened.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Test that entries older than the TTL are not returned"""
+    cache = ResponseCache(str(tmp_path), ttl_seconds=10, max_size_bytes=1024)
+    with patch("hcl_processor.response_cache.time.time", return_value=1000.0):
+        cache.put("key", "value")
+    with patch("hcl_processor.response_cache.time.time", return_value=1011.0):
+        assert cache.get("key") is None
+    assert cache.misses == 1
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that the size limit evicts the least recently accessed entries"""
+    cache = ResponseCache(str(tmp_path), ttl_seconds=3600, max_size_bytes=10)
+    with patch("hcl_processor.response_cache.time.time", return_value=1000.0):
+        cache.put("old", "aaaa")
+    with patch("hcl_processor.response_cache.time.time", return_value=1001.0):
+        cache.put("recent", "bbbb")
+    with patch("hcl_processor.response_cache.time.time", return_value=1002.0):
+        # Touch "old" so "recent" becomes the least recently used entry
+        assert cache.get("old") == "aaaa"
+    with patch("hcl_processor.response_cache.time.time", return_value=1003.0):
+        cache.put("new", "cccc")
+        assert cache.get("recent") is None
+        assert cache.get("old") == "aaaa"
+        assert cache.get("new") == "cccc"
+    cache.close()
+
+
+def test_refresh_ignores_existing_entries_but_stores_new_ones(tmp_path):
+    """Test --refresh-cache semantics"""
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024)
+    cache.put("key", "stale")
+    cache.close()
+
+    refreshing = ResponseCache(
+        str(tmp_path), ttl_seconds=60, max_size_bytes=1024, refresh=True
+    )
+    assert refreshing.get("key") is None
+    refreshing.put("key", "fresh")
+    refreshing.close()
+
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, max_size_bytes=1024)
+    assert cache.get("key") == "fresh"
+    cache.close()
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from hcl_processor.run_context import RunContext
+
+BASE_CONFIG = {"input": {"local_files": [], "modules": {"enabled": False}}}
+
+
+@patch("hcl_processor.run_context.create_llm_provider")
+def test_provider_is_created_lazily(mock_create_llm_provider):
+    """Test that the provider is not created until first use"""
+    RunContext(BASE_CONFIG, {})
+    mock_create_llm_provider.assert_not_called()
+
+
+@patch("hcl_processor.run_context.create_llm_provider")
+def test_provider_is_shared_across_threads(mock_create_llm_provider):
+    """Test that concurrent workers share a single provider instance"""
+    mock_create_llm_provider.return_value = MagicMock()
+    context = RunContext(BASE_CONFIG, {"system": True}, concurrency=8)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        providers = list(executor.map(lambda _: context.provider, range(32)))
+
+    assert all(provider is providers[0] for provider in providers)
+    mock_create_llm_provider.assert_called_once_with(
+        BASE_CONFIG, {"system": True}, concurrency=8, response_cache=None
+    )
+
+
+@patch("hcl_processor.run_context.create_llm_provider")
+def test_provider_creation_failure_is_retried(mock_create_llm_provider):
+    """Test that a failed provider creation does not poison the context"""
+    provider = MagicMock()
+    mock_create_llm_provider.side_effect = [ValueError("no credentials"), provider]
+    context = RunContext(BASE_CONFIG, {})
+
+    with pytest.raises(ValueError, match="no credentials"):
+        _ = context.provider
+
+    assert context.provider is provider
+
+
+def _cache_config(tmp_path, enabled=True):
+    return {
+        **BASE_CONFIG,
+        "cache": {
+            "enabled": enabled,
+            "path": str(tmp_path / "cache"),
+            "ttl_seconds": 60,
+            "max_size_mb": 1,
+        },
+    }
+
+
+@patch("hcl_processor.run_context.create_llm_provider")
+def test_response_cache_is_passed_to_provider(mock_create_llm_provider, tmp_path):
+    """Test that an enabled cache is created and handed to the provider"""
+    context = RunContext(_cache_config(tmp_path), {}, refresh_cache=True)
+    provider = context.provider
+
+    assert provider is mock_create_llm_provider.return_value
+    assert context.response_cache is not None
+    assert context.response_cache.refresh is True
+    assert (
+        mock_create_llm_provider.call_args.kwargs["response_cache"]
+        is context.response_cache
+    )
+    context.close()
+
+
+def test_response_cache_disabled(tmp_path):
+    """Test that --no-cache and cache.enabled=false both disable the cache"""
+    assert (
+        RunContext(_cache_config(tmp_path), {}, use_cache=False).response_cache is None
+    )
+    assert RunContext(_cache_config(tmp_path, enabled=False), {}).response_cache is None
+    assert not (tmp_path / "cache").exists()
+
+
+@patch("hcl_processor.run_context.create_llm_provider")
+def test_close_closes_provider(mock_create_llm_provider):
+    """Test that closing the context reports the provider's usage"""
+    context = RunContext(BASE_CONFIG, {})
+    context.close()
+    mock_create_llm_provider.return_value.close.assert_not_called()
+
+    provider = context.provider
+    context.close()
+    provider.close.assert_called_once()
@@ -0,0 +1,81 @@
+import pytest
+
+from hcl_processor.config.system_config import get_system_config
+from hcl_processor.token_estimator import (
+    estimate_request_tokens,
+    estimate_tokens,
+    get_input_token_limit,
+)
+
+
+def test_estimate_tokens_empty():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(None) == 0
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_estimate_request_tokens_includes_system_prompt_and_tools():
+    base = estimate_request_tokens("a" * 40, "b" * 40)
+    assert base == 20
+    assert estimate_request_tokens("a" * 40, "b" * 40, {"tools": []}) > base
+
+
+SYSTEM_CONFIG = {
+    "constants": {
+        "token_limits": {
+            "default": 1000,
+            "models": {"anthropic.claude-v2": 100000, "anthropic.claude-v2:1": 200000},
+        }
+    }
+}
+
+
+def test_get_input_token_limit_versioned_match():
+    assert get_input_token_limit("anthropic.claude-v2:1", SYSTEM_CONFIG) == 200000
+    assert get_input_token_limit("anthropic.claude-v2", SYSTEM_CONFIG) == 100000
+    assert get_input_token_limit("anthropic.claude-v2:0", SYSTEM_CONFIG) == 100000
+    # Model ids only match exactly, not as a fragment of a longer id
+    assert get_input_token_limit("anthropic.claude-v2-1", SYSTEM_CONFIG) == 1000
+
+
+def test_get_input_token_limit_default_and_override():
+    assert get_input_token_limit("unknown-model", SYSTEM_CONFIG) == 1000
+    assert get_input_token_limit("anthropic.claude-v2", SYSTEM_CONFIG, 42) == 42
+    assert get_input_token_limit("unknown-model", {"constants": {}}) is None
+
+
+@pytest.mark.parametrize(
+    ("model_id", "limit"),
+    [
+        ("anthropic.claude-3-5-sonnet-20240620-v1:0", 200000),
+        ("anthropic.claude-v2:1", 200000),
+        ("anthropic.claude-instant-v1", 100000),
+        ("meta.llama3-70b-instruct-v1:0", 8000),
+        ("meta.llama3-1-70b-instruct-v1:0", 128000),
+        ("us.meta.llama3-3-70b-instruct-v1:0", 128000),
+        ("mistral.mistral-large-2402-v1:0", 32000),
+        ("mistral.mistral-large-2407-v1:0", 128000),
+        ("amazon.titan-text-premier-v1:0", 32000),
+        ("amazon.nova-micro-v1:0", 128000),
+        ("eu.amazon.nova-pro-v1:0", 300000),
+        (
+            "arn:aws:bedrock:us-east-1::foundation-model/amazon.nova-micro-v1:0",
+            128000,
+        ),
+        (
+            (
+                "arn:aws:bedrock:us-east-1:123456789012:inference-profile/"
+                "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+            ),
+            200000,
+        ),
+        # Unknown models are not checked before sending
+        ("cohere.command-r-plus-v1:0", None),
+    ],
+)
+def test_get_input_token_limit_bedrock_models(model_id, limit):
+    assert get_input_token_limit(model_id, get_system_config()) == limit
@@ -3,7 +3,13 @@ import tempfile
 import unittest
 from unittest.mock import patch
 
-from src.hcl_processor.utils import ensure_directory_exists
+import jsonschema
+
+from src.hcl_processor.utils import (
+    ensure_directory_exists,
+    get_schema_validator,
+    validate_json_schema,
+)
 
 
 class TestUtils(unittest.TestCase):
@@ -111,5 +117,57 @@ class TestUtils(unittest.TestCase):
             pass
 
 
+class TestSchemaValidation(unittest.TestCase):
+    """Test cases for the cached JSON Schema validators"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.schema = {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+        }
+
+    def test_validator_is_built_once_per_schema(self):
+        """Test that equal schemas share one validator, checked once"""
+        with patch(
+            "jsonschema.validators.Draft202012Validator.check_schema"
+        ) as mock_check_schema:
+            first = get_schema_validator({"type": "object", "title": "once"})
+            second = get_schema_validator({"title": "once", "type": "object"})
+        self.assertIs(first, second)
+        mock_check_schema.assert_called_once()
+        self.assertIsNot(get_schema_validator(self.schema), first)
+
+    def test_validate_json_schema_matches_jsonschema_validate(self):
+        """Test that errors are the same as jsonschema.validate reports"""
+        validate_json_schema([{"name": "a"}], self.schema)
+        instance = [{"name": "a"}, {"name": 1}, {}]
+        with self.assertRaises(jsonschema.ValidationError) as expected:
+            jsonschema.validate(instance=instance, schema=self.schema)
+        with self.assertRaises(jsonschema.ValidationError) as actual:
+            validate_json_schema(instance, self.schema)
+        self.assertEqual(actual.exception.message, expected.exception.message)
+
+    def test_known_schema_is_looked_up_without_serializing(self):
+        """Test that a schema object seen before is found by identity"""
+        schema = {"type": "string", "title": "by identity"}
+        validator = get_schema_validator(schema)
+        with patch("src.hcl_processor.utils.json.dumps") as mock_dumps:
+            self.assertIs(get_schema_validator(schema), validator)
+            validate_json_schema("text", schema)
+        mock_dumps.assert_not_called()
+
+    def test_invalid_schema_raises_schema_error(self):
+        """Test that an invalid schema is rejected and not cached"""
+        with self.assertRaises(jsonschema.SchemaError):
+            validate_json_schema({}, {"type": "no-such-type"})
+        with self.assertRaises(jsonschema.SchemaError):
+            validate_json_schema({}, {"type": "no-such-type"})
+
+
 if __name__ == "__main__":
     unittest.main()
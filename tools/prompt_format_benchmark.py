@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Prompt format benchmark for hcl-processor.
+
+Serializes HCL files with every prompt format supported by
+`input.prompt_format` and reports the prompt size of each.
+
+Usage:
+    # Benchmark the e2e test data (default)
+    python tools/prompt_format_benchmark.py
+
+    # Benchmark specific files or directories
+    python tools/prompt_format_benchmark.py path/to/main.tf path/to/modules
+
+    # Output as JSON
+    python tools/prompt_format_benchmark.py --output json
+
+Token counts use the same estimator as the pre-flight payload check
+(hcl_processor.token_estimator); they are estimates, not tokenizer output.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import hcl2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from hcl_processor.prompt_serializer import PROMPT_FORMATS, serialize_hcl
+from hcl_processor.token_estimator import estimate_tokens
+
+DEFAULT_PATHS = [Path(__file__).resolve().parent.parent / "e2e_tests" / "test_data"]
+
+
+def collect_files(paths: list) -> list:
+    """Expand directories into the .tf files they contain."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.tf")))
+        else:
+            files.append(path)
+    return files
+
+
+def benchmark(files: list) -> dict:
+    """Return {file: {format: {"chars": int, "tokens": int}}}."""
+    results = {}
+    for file in files:
+        source = file.read_text(encoding="utf-8")
+        parsed = hcl2.loads(source)
+        results[str(file)] = {}
+        for prompt_format in PROMPT_FORMATS:
+            text = serialize_hcl(parsed, prompt_format, source)
+            results[str(file)][prompt_format] = {
+                "chars": len(text),
+                "tokens": estimate_tokens(text),
+            }
+    return results
+
+
+def print_table(results: dict) -> None:
+    """Print estimated tokens per file and format, with totals."""
+    name_width = max([len("file")] + [len(Path(f).name) for f in results])
+    header = f"{'file':<{name_width}}" + "".join(
+        f"{prompt_format:>10}" for prompt_format in PROMPT_FORMATS
+    )
+    print(header)
+    print("-" * len(header))
+    totals = dict.fromkeys(PROMPT_FORMATS, 0)
+    for file, sizes in results.items():
+        row = f"{Path(file).name:<{name_width}}"
+        for prompt_format in PROMPT_FORMATS:
+            totals[prompt_format] += sizes[prompt_format]["tokens"]
+            row += f"{sizes[prompt_format]['tokens']:>10}"
+        print(row)
+    print("-" * len(header))
+    print(
+        f"{'total':<{name_width}}"
+        + "".join(f"{totals[prompt_format]:>10}" for prompt_format in PROMPT_FORMATS)
+    )
+    baseline = totals["python"] or 1
+    print(
+        f"{'vs python':<{name_width}}"
+        + "".join(
+            f"{totals[prompt_format] / baseline:>10.0%}"
+            for prompt_format in PROMPT_FORMATS
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare prompt sizes of the supported prompt formats"
+    )
+    parser.add_argument(
+        "paths", nargs="*", default=DEFAULT_PATHS, help=".tf files or directories"
+    )
+    parser.add_argument(
+        "--output", choices=["table", "json"], default="table", help="Output format"
+    )
+    args = parser.parse_args()
+
+    files = collect_files(args.paths)
+    if not files:
+        print("No .tf files found", file=sys.stderr)
+        sys.exit(1)
+
+    results = benchmark(files)
+    if args.output == "json":
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()